@@ -0,0 +1,197 @@
+import asyncio
+import math
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Callable, Deque, Optional
+import logging
+from ..config import get_setting
+from ..metrics import ADMISSION_WAIT
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejected(Exception):
+    """
+    Raised when a request is shed instead of admitted
+    """
+
+    def __init__(self, status_code: int, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Limit concurrent queries, queueing the overflow with per-session fairness.
+
+    Up to max_in_flight requests run at once. Further requests wait in a
+    bounded queue grouped by session; freed slots are handed out round-robin
+    across sessions so one chatty client cannot starve the rest. Requests are
+    shed with 429 when the queue (or the session's share of it) is full and
+    with 503 when they wait longer than queue_timeout.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int,
+        max_queue: int,
+        queue_timeout: float,
+        max_queued_per_session: int
+    ):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.max_queued_per_session = max_queued_per_session
+
+        self.in_flight = 0
+        self.queued = 0
+        self._waiters: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+
+        # Exponentially weighted service time, used for Retry-After
+        self._service_time = 1.0
+
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def retry_after(self) -> int:
+        """
+        Seconds until a slot is likely to be free
+        """
+        backlog = (self.queued + 1) / self.max_in_flight
+        return max(1, math.ceil(backlog * self._service_time))
+
+    async def acquire(self, session_id: Optional[str] = None) -> Callable[[], None]:
+        """
+        Wait for a slot and return an idempotent release callable
+        """
+        if self.in_flight < self.max_in_flight and self.queued == 0:
+            return self._admit(0.0, handed_off=False)
+
+        # Anonymous requests each get their own bucket
+        key = session_id or f"anonymous-{uuid.uuid4().hex}"
+        waiters = self._waiters.get(key)
+
+        if self.queued >= self.max_queue:
+            self.rejected_queue_full += 1
+            raise AdmissionRejected(429, "Server busy, query queue is full", self.retry_after())
+        if waiters is not None and len(waiters) >= self.max_queued_per_session:
+            self.rejected_queue_full += 1
+            raise AdmissionRejected(429, "Too many queued queries for this session", self.retry_after())
+
+        future = asyncio.get_running_loop().create_future()
+        if waiters is None:
+            waiters = self._waiters[key] = deque()
+        waiters.append(future)
+        self.queued += 1
+
+        start = time.monotonic()
+        try:
+            done, _ = await asyncio.wait({future}, timeout=self.queue_timeout)
+        except asyncio.CancelledError:
+            # Client went away while queued; hand back a slot we were given
+            if future.done() and not future.cancelled():
+                self._release_slot()
+            else:
+                self._remove_waiter(key, future)
+            raise
+
+        if not done:
+            self._remove_waiter(key, future)
+            self.rejected_timeout += 1
+            raise AdmissionRejected(503, "Timed out waiting for query capacity", self.retry_after())
+
+        return self._admit(time.monotonic() - start, handed_off=True)
+
+    def _admit(self, waited: float, handed_off: bool) -> Callable[[], None]:
+        # A queued waiter is handed a slot _release_slot already counts
+        if not handed_off:
+            self.in_flight += 1
+        self.admitted += 1
+        self.total_wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        ADMISSION_WAIT.observe(waited)
+
+        started = time.monotonic()
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if released:
+                return
+            released = True
+            self._service_time = 0.8 * self._service_time + 0.2 * (time.monotonic() - started)
+            self._release_slot()
+
+        return release
+
+    def _remove_waiter(self, key: str, future: asyncio.Future) -> None:
+        waiters = self._waiters.get(key)
+        if waiters is not None and future in waiters:
+            waiters.remove(future)
+            self.queued -= 1
+            if not waiters:
+                del self._waiters[key]
+        future.cancel()
+
+    def _release_slot(self) -> None:
+        """
+        Hand the slot to the next session in round-robin order, or free it
+        """
+        while self._waiters:
+            key, waiters = next(iter(self._waiters.items()))
+            future = waiters.popleft()
+            self.queued -= 1
+
+            if waiters:
+                self._waiters.move_to_end(key)
+            else:
+                del self._waiters[key]
+
+            if not future.done():
+                # Slot passes straight to the waiter; in_flight is unchanged
+                future.set_result(None)
+                return
+
+        self.in_flight -= 1
+
+    def stats(self) -> dict:
+        """
+        Queue depth, wait time and shedding counters
+        """
+        return {
+            "in_flight": self.in_flight,
+            "queue_depth": self.queued,
+            "queued_sessions": len(self._waiters),
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+            "avg_wait_seconds": round(self.total_wait_seconds / self.admitted, 4) if self.admitted else 0.0,
+            "max_wait_seconds": round(self.max_wait_seconds, 4)
+        }
+
+
+# Global admission controller instance
+_admission_controller = None
+
+
+def get_admission_controller() -> Optional[AdmissionController]:
+    """
+    Get or create the query admission controller, or None when disabled in config
+    """
+    global _admission_controller
+
+    if _admission_controller is None and get_setting("admission.enabled", True):
+        _admission_controller = AdmissionController(
+            max_in_flight=int(get_setting("admission.max_in_flight", 32)),
+            max_queue=int(get_setting("admission.max_queue", 128)),
+            queue_timeout=float(get_setting("admission.queue_timeout_seconds", 10)),
+            max_queued_per_session=int(get_setting("admission.max_queued_per_session", 4))
+        )
+
+    return _admission_controller
@@ -1,89 +1,308 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import Response, StreamingResponse
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
+from typing import AsyncIterator, Callable, Optional
+import json
 import logging
-from .schemas import QueryRequest, QueryResponse, IngestResponse, SourceInfo
-from ..graph.workflow import run_rag_query
-from ..ingestion.loader import DocumentLoader, load_sample_documents
-from ..retrieval.vector_store import add_documents
+import weakref
+from .schemas import (
+    QueryRequest,
+    QueryResponse,
+    IngestJobStatus,
+    SourceInfo,
+    ResponseMetadata,
+    BatchQueryRequest,
+    BatchQueryResult,
+    BatchQueryResponse
+)
+from .admission import AdmissionRejected, get_admission_controller
+from ..config import get_setting
+from ..metrics import ServingStatsCollector
+from ..graph.deadline import deadline_exceeded, make_deadline
+from ..graph.workflow import aanswer_query, arun_rag_batch, astream_rag_query
+from ..graph.singleflight import get_query_coalescer
+from ..cache.answer_cache import get_answer_cache
+from ..cache.semantic_cache import get_semantic_cache
+from ..cache.embedding_cache import get_embedding_cache
+from ..retrieval.reranker import get_rerank_cache
+from ..memory.session_store import get_session_store
+from ..ingestion.jobs import IngestJobConflict, get_job_manager
+from ..retrieval.vector_store import COLLECTION_NAME
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+DEADLINE_DETAIL = "Query deadline exceeded before an answer could be produced"
+
+DOCS_DIRECTORY = get_setting("ingestion.docs_directory", "./sample-docs/technical-docs")
+
+
+def _build_response(result: dict, session_id: str = None) -> QueryResponse:
+    """
+    Format a workflow result as a QueryResponse
+    """
+    sources = [
+        SourceInfo(**source)
+        for source in result.get("sources", [])
+    ]
+
+    return QueryResponse(
+        answer=result.get("answer", ""),
+        sources=sources,
+        confidence=result.get("confidence", 0.0),
+        conversation_id=session_id,
+        metadata=ResponseMetadata(degradations=result.get("degradations", []))
+    )
+
+
+def _sse(event: str, data: dict) -> str:
+    """
+    Encode a single Server-Sent Event
+    """
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _stream_query(
+    request: QueryRequest,
+    on_close: Optional[Callable[[], None]] = None,
+    deadline: Optional[float] = None
+) -> AsyncIterator[str]:
+    """
+    Relay workflow events to the client as Server-Sent Events
+    """
+    try:
+        async for event in astream_rag_query(
+            question=request.question,
+            session_id=request.session_id,
+            deadline=deadline
+        ):
+            if event["event"] == "final" and deadline_exceeded(event["data"]["result"]):
+                yield _sse("error", {"detail": DEADLINE_DETAIL, "status_code": 504})
+            elif event["event"] == "final":
+                response = _build_response(event["data"]["result"], request.session_id)
+                yield _sse("final", {
+                    **response.model_dump(),
+                    "timings": event["data"]["timings"]
+                })
+            else:
+                yield _sse(event["event"], event["data"])
+
+    except Exception as e:
+        logger.error(f"Streaming query failed: {e}")
+        yield _sse("error", {"detail": str(e)})
+
+    finally:
+        if on_close is not None:
+            on_close()
+
 
 @router.post("/query", response_model=QueryResponse)
 async def query_documents(request: QueryRequest):
     """
     Query the RAG system with a question
+
+    With ``stream=true`` the response is a Server-Sent Events stream of
+    ``progress``, ``token`` and ``final`` events.
+
+    Under overload, requests queue for a slot and are shed with 429 (queue
+    full) or 503 (queue wait timed out), both carrying Retry-After.
+
+    The query must finish within ``timeout_seconds`` of arrival, queueing
+    included. Short on time, the workflow degrades (fewer documents, a
+    smaller context, a faster model, or an answer quoted from the documents)
+    and lists what it cut in ``metadata.degradations``. It fails with 504
+    only when it ran out of time with nothing to answer from.
     """
+    logger.info(f"Received query: {request.question}")
+
+    deadline = make_deadline(request.timeout_seconds)
+
+    release = None
+    admission = get_admission_controller()
+
+    if admission is not None:
+        try:
+            release = await admission.acquire(request.session_id)
+        except AdmissionRejected as e:
+            logger.warning(f"Query shed ({e.status_code}): {e.detail}")
+            raise HTTPException(
+                status_code=e.status_code,
+                detail=e.detail,
+                headers={"Retry-After": str(e.retry_after)}
+            ) from e
+
     try:
-        logger.info(f"Received query: {request.question}")
+        if request.stream:
+            # The slot is held until the stream finishes, or until the
+            # generator is discarded if the client leaves before it starts
+            stream = _stream_query(request, on_close=release, deadline=deadline)
+            if release is not None:
+                weakref.finalize(stream, release)
+                release = None
 
-        # Run RAG workflow
-        result = run_rag_query(
+            return StreamingResponse(
+                stream,
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+            )
+
+        # Serve from the answer cache, or run the (coalesced) RAG workflow
+        result = await aanswer_query(
             question=request.question,
-            session_id=request.session_id
+            session_id=request.session_id,
+            deadline=deadline
         )
 
-        # Format response
-        sources = [
-            SourceInfo(**source)
-            for source in result.get("sources", [])
-        ]
+        if deadline_exceeded(result):
+            raise HTTPException(status_code=504, detail=DEADLINE_DETAIL)
 
-        response = QueryResponse(
-            answer=result.get("answer", ""),
-            sources=sources,
-            confidence=result.get("confidence", 0.0),
-            conversation_id=request.session_id
-        )
+        return _build_response(result, request.session_id)
 
-        return response
+    except HTTPException:
+        raise
 
     except Exception as e:
         logger.error(f"Query failed: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+    finally:
+        if release is not None:
+            release()
+
+
+@router.post("/query/batch", response_model=BatchQueryResponse)
+async def query_documents_batch(request: BatchQueryRequest):
+    """
+    Answer many questions in one call
 
+    All questions are embedded in a single batched call, then the workflows
+    run concurrently up to the configured limit. Results keep input order and
+    each carries its own error, if any.
+    """
+    max_questions = int(get_setting("batch.max_questions", 1000))
+    if len(request.questions) > max_questions:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch of {len(request.questions)} questions exceeds limit of {max_questions}"
+        )
 
-@router.post("/ingest", response_model=IngestResponse)
+    # A client may lower the concurrency limit, never raise it
+    limit = int(get_setting("batch.max_concurrency", 8))
+    max_concurrency = min(request.max_concurrency or limit, limit)
+
+    try:
+        logger.info(f"Received batch of {len(request.questions)} queries")
+
+        results = await arun_rag_batch(
+            questions=request.questions,
+            session_id=request.session_id,
+            max_concurrency=max_concurrency
+        )
+
+        items = [
+            BatchQueryResult(
+                index=i,
+                question=question,
+                response=_build_response(result, request.session_id),
+                error=result.get("error")
+            )
+            for i, (question, result) in enumerate(zip(request.questions, results, strict=True))
+        ]
+        failed = sum(1 for item in items if item.error)
+
+        return BatchQueryResponse(
+            results=items,
+            succeeded=len(items) - failed,
+            failed=failed
+        )
+
+    except Exception as e:
+        logger.error(f"Batch query failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+
+@router.post("/ingest", response_model=IngestJobStatus, status_code=202)
 async def ingest_documents():
     """
-    Ingest documents from the sample-docs directory into vector store
+    Start ingesting documents from ingestion.docs_directory in the background
+
+    Returns immediately with a job id; poll /ingest/{job_id} for progress.
+    Only one job may run per collection at a time.
     """
     try:
-        logger.info("Starting document ingestion")
+        job = get_job_manager().submit(COLLECTION_NAME, DOCS_DIRECTORY)
+    except IngestJobConflict as e:
+        raise HTTPException(
+            status_code=409,
+            detail={"message": str(e), "job_id": e.job_id}
+        ) from e
 
-        # Try to load documents from directory
-        loader = DocumentLoader()
-        chunked_docs = loader.load_and_chunk()
+    return IngestJobStatus(**job.to_dict())
 
-        # If no documents found, use sample documents
-        if not chunked_docs:
-            logger.info("No documents found in directory, using sample documents")
-            chunked_docs = load_sample_documents()
 
-        # Add to vector store
-        add_documents(chunked_docs)
+@router.get("/ingest/{job_id}", response_model=IngestJobStatus)
+async def get_ingest_job(job_id: str):
+    """
+    Report progress of an ingestion job
+    """
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Ingestion job {job_id} not found")
 
-        response = IngestResponse(
-            status="success",
-            documents_processed=len(chunked_docs),
-            chunks_created=len(chunked_docs),
-            message=f"Successfully ingested {len(chunked_docs)} document chunks"
-        )
+    return IngestJobStatus(**job.to_dict())
+
+
+@router.delete("/ingest/{job_id}", response_model=IngestJobStatus)
+async def cancel_ingest_job(job_id: str):
+    """
+    Cancel a pending or running ingestion job
+    """
+    job = get_job_manager().cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Ingestion job {job_id} not found")
 
-        logger.info(f"Ingestion completed: {response.message}")
+    return IngestJobStatus(**job.to_dict())
 
-        return response
 
-    except Exception as e:
-        logger.error(f"Ingestion failed: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+def _query_stats() -> dict:
+    """
+    Counters for the query serving layer
+    """
+    admission = get_admission_controller()
+    answer_cache = get_answer_cache()
+    semantic_cache = get_semantic_cache()
+    embedding_cache = get_embedding_cache()
+    rerank_cache = get_rerank_cache()
+    session_store = get_session_store()
+
+    return {
+        "admission": admission.stats() if admission else None,
+        "coalescing": get_query_coalescer().stats(),
+        "answer_cache": answer_cache.stats() if answer_cache else None,
+        "semantic_cache": semantic_cache.stats() if semantic_cache else None,
+        "embedding_cache": embedding_cache.stats() if embedding_cache else None,
+        "rerank_cache": rerank_cache.stats() if rerank_cache else None,
+        "sessions": session_store.stats() if session_store else None
+    }
+
+
+# Export the serving-layer counters alongside the Prometheus metrics
+REGISTRY.register(ServingStatsCollector(_query_stats))
+
+
+@router.get("/metrics")
+async def metrics():
+    """
+    Prometheus metrics: node, embedding, vector search, LLM token and request metrics
+    """
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
 
 @router.get("/stats")
 async def get_stats():
     """
-    Get statistics about the vector store
+    Get statistics about the vector store and query serving
     """
     try:
         from ..retrieval.vector_store import get_vector_store
@@ -97,7 +316,8 @@ async def get_stats():
         return {
             "total_documents": count,
             "collection_name": collection.name,
-            "status": "active"
+            "status": "active",
+            "queries": _query_stats()
         }
 
     except Exception as e:
@@ -105,5 +325,6 @@ async def get_stats():
         return {
             "total_documents": 0,
             "status": "not_initialized",
-            "error": str(e)
+            "error": str(e),
+            "queries": _query_stats()
         }
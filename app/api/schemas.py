@@ -1,3 +1,4 @@
+from datetime import datetime
 from pydantic import BaseModel, Field
 from typing import List, Optional
 
@@ -9,6 +10,11 @@ class QueryRequest(BaseModel):
     question: str = Field(..., description="User question")
     session_id: Optional[str] = Field(None, description="Session ID for conversation tracking")
     stream: bool = Field(False, description="Enable streaming response")
+    timeout_seconds: Optional[float] = Field(
+        None,
+        gt=0,
+        description="Latency budget for this query; defaults to deadline.default_seconds"
+    )
 
 
 class SourceInfo(BaseModel):
@@ -21,6 +27,16 @@ class SourceInfo(BaseModel):
     excerpt: str
 
 
+class ResponseMetadata(BaseModel):
+    """
+    How a query was served
+    """
+    degradations: List[str] = Field(
+        default_factory=list,
+        description="Steps cut short to meet the deadline, e.g. reduced_top_k, fast_model, generation_timeout"
+    )
+
+
 class QueryResponse(BaseModel):
     """
     Response schema for query endpoint
@@ -29,13 +45,52 @@ class QueryResponse(BaseModel):
     sources: List[SourceInfo]
     confidence: float
     conversation_id: Optional[str] = None
+    metadata: ResponseMetadata = Field(default_factory=ResponseMetadata)
+
+
+class BatchQueryRequest(BaseModel):
+    """
+    Request schema for batch query endpoint
+    """
+    questions: List[str] = Field(..., min_length=1, description="Questions to answer")
+    session_id: Optional[str] = Field(None, description="Session ID for conversation tracking")
+    max_concurrency: Optional[int] = Field(None, ge=1, description="Lower the configured concurrency limit")
+
+
+class BatchQueryResult(BaseModel):
+    """
+    Result for a single question in a batch, in input order
+    """
+    index: int
+    question: str
+    response: QueryResponse
+    error: Optional[str] = None
+
+
+class BatchQueryResponse(BaseModel):
+    """
+    Response schema for batch query endpoint
+    """
+    results: List[BatchQueryResult]
+    succeeded: int
+    failed: int
 
 
-class IngestResponse(BaseModel):
+class IngestJobStatus(BaseModel):
     """
-    Response schema for ingest endpoint
+    Progress of a background ingestion job
     """
-    status: str
-    documents_processed: int
+    job_id: str
+    collection: str
+    status: str = Field(..., description="pending, running, completed, failed or cancelled")
+    files_total: int
+    files_scanned: int
     chunks_created: int
+    embeddings_done: int
+    throughput_chunks_per_sec: Optional[float] = None
+    eta_seconds: Optional[float] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
     message: str
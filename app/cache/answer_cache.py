@@ -0,0 +1,250 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+import logging
+from ..config import get_setting
+
+logger = logging.getLogger(__name__)
+
+# Result fields needed to rebuild a QueryResponse
+CACHED_FIELDS = ("answer", "sources", "confidence", "steps_taken")
+
+
+class MemoryCacheBackend:
+    """
+    In-process LRU store bounded by total value size in bytes
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self._entries: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Tuple[bytes, float]]:
+        """
+        Return (value, expires_at) and mark the entry most recently used
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, value: bytes, expires_at: float) -> int:
+        """
+        Store an entry, returning how many entries were evicted to make room
+        """
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (value, expires_at)
+            self.size_bytes += len(value)
+
+            evicted = 0
+            while self.size_bytes > self.max_bytes and len(self._entries) > 1:
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+                evicted += 1
+            return evicted
+
+    def delete(self, key: str) -> None:
+        """
+        Remove an entry if present
+        """
+        with self._lock:
+            self._discard(key)
+
+    def _discard(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size_bytes -= len(entry[0])
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCacheBackend:
+    """
+    On-disk LRU store that survives restarts, bounded by total value size in bytes
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS answers ("
+            " key TEXT PRIMARY KEY,"
+            " value BLOB NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL,"
+            " size INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS answers_accessed ON answers(accessed_at)")
+        self.size_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM answers").fetchone()[0]
+
+        logger.info(f"Opened answer cache at {path} ({self.size_bytes} bytes)")
+
+    def get(self, key: str) -> Optional[Tuple[bytes, float]]:
+        """
+        Return (value, expires_at) and mark the entry most recently used
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM answers WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                self._conn.execute(
+                    "UPDATE answers SET accessed_at = ? WHERE key = ?", (time.time(), key)
+                )
+            return row
+
+    def set(self, key: str, value: bytes, expires_at: float) -> int:
+        """
+        Store an entry, returning how many entries were evicted to make room
+        """
+        with self._lock:
+            self._discard(key)
+            self._conn.execute(
+                "INSERT INTO answers (key, value, expires_at, accessed_at, size) VALUES (?, ?, ?, ?, ?)",
+                (key, value, expires_at, time.time(), len(value))
+            )
+            self.size_bytes += len(value)
+
+            evicted = 0
+            while self.size_bytes > self.max_bytes:
+                row = self._conn.execute(
+                    "SELECT key, size FROM answers WHERE key != ? ORDER BY accessed_at LIMIT 1", (key,)
+                ).fetchone()
+                if row is None:
+                    break
+                self._conn.execute("DELETE FROM answers WHERE key = ?", (row[0],))
+                self.size_bytes -= row[1]
+                evicted += 1
+            return evicted
+
+    def delete(self, key: str) -> None:
+        """
+        Remove an entry if present
+        """
+        with self._lock:
+            self._discard(key)
+
+    def _discard(self, key: str) -> None:
+        row = self._conn.execute("SELECT size FROM answers WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            self._conn.execute("DELETE FROM answers WHERE key = ?", (key,))
+            self.size_bytes -= row[0]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+
+
+class AnswerCache:
+    """
+    Exact-match answer cache with LRU + TTL eviction.
+
+    Keys combine the normalized question, retrieval parameters and the corpus
+    version, so any change to the index makes older answers unreachable; they
+    then age out through LRU/TTL eviction.
+    """
+
+    def __init__(self, backend, ttl_seconds: float):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def make_key(query_key: tuple, corpus_version: str) -> str:
+        """
+        Hash a query key and corpus version into a fixed-size cache key
+        """
+        raw = json.dumps([list(query_key), corpus_version], default=str)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Return a fresh copy of the cached result, or None
+        """
+        entry = self.backend.get(key)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, expires_at = entry
+        if expires_at <= time.time():
+            self.backend.delete(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return json.loads(value)
+
+    def set(self, key: str, result: dict) -> None:
+        """
+        Cache the response fields of a successful workflow result
+        """
+        value = json.dumps({field: result.get(field) for field in CACHED_FIELDS}).encode()
+        self.evictions += self.backend.set(key, value, time.time() + self.ttl_seconds)
+
+    def stats(self) -> dict:
+        """
+        Hit/miss and size metrics
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "entries": len(self.backend),
+            "size_bytes": self.backend.size_bytes,
+            "max_bytes": self.backend.max_bytes
+        }
+
+
+# Global answer cache instance
+_answer_cache = None
+
+
+def get_answer_cache() -> Optional[AnswerCache]:
+    """
+    Get or create the answer cache, or None when disabled in config
+    """
+    global _answer_cache
+
+    if _answer_cache is None and get_setting("answer_cache.enabled", True):
+        max_bytes = int(get_setting("answer_cache.max_bytes", 64 * 1024 * 1024))
+
+        if get_setting("answer_cache.backend", "memory") == "sqlite":
+            backend = SQLiteCacheBackend(
+                get_setting("answer_cache.path", "./data/answer_cache.sqlite"),
+                max_bytes
+            )
+        else:
+            backend = MemoryCacheBackend(max_bytes)
+
+        _answer_cache = AnswerCache(
+            backend,
+            ttl_seconds=float(get_setting("answer_cache.ttl_seconds", 3600))
+        )
+
+    return _answer_cache
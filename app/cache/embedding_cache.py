@@ -0,0 +1,229 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+import logging
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from ..config import get_setting
+
+logger = logging.getLogger(__name__)
+
+# Keeps "IN (?, ?, ...)" lookups under SQLite's bound-parameter limit
+SQLITE_BATCH = 500
+
+
+class SQLiteEmbeddingStore:
+    """
+    On-disk float32 vectors keyed by content hash, bounded by entry count.
+
+    When full, the oldest writes are dropped first.
+    """
+
+    def __init__(self, path: str, max_entries: int):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vector BLOB NOT NULL)")
+        self._count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+        logger.info(f"Opened embedding cache at {path} ({self._count} vectors)")
+
+    def get_many(self, keys: List[bytes]) -> Dict[bytes, np.ndarray]:
+        """
+        Vectors for whichever of the keys are stored
+        """
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), SQLITE_BATCH):
+                batch = keys[start:start + SQLITE_BATCH]
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))})",
+                    batch
+                ).fetchall()
+                for key, vector in rows:
+                    found[key] = np.frombuffer(vector, dtype=np.float32)
+        return found
+
+    def put_many(self, items: Dict[bytes, np.ndarray]) -> None:
+        """
+        Store vectors, evicting the oldest entries beyond max_entries
+        """
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                # A key hashes the model and text, so a stored vector never changes
+                before = self._conn.total_changes
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO embeddings (key, vector) VALUES (?, ?)",
+                    [(key, vector.tobytes()) for key, vector in items.items()]
+                )
+                count = self._count + self._conn.total_changes - before
+
+                if count > self.max_entries:
+                    self._conn.execute(
+                        "DELETE FROM embeddings WHERE rowid IN (SELECT rowid FROM embeddings ORDER BY rowid LIMIT ?)",
+                        (count - self.max_entries,)
+                    )
+                    count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+
+class EmbeddingCache:
+    """
+    Embedding vectors keyed on a hash of the model name and text.
+
+    An in-memory LRU sits in front of an optional on-disk store, so repeated
+    queries are served from memory and re-ingested chunks survive restarts.
+    """
+
+    def __init__(self, memory_entries: int, store: Optional[SQLiteEmbeddingStore] = None):
+        self.memory_entries = memory_entries
+        self.store = store
+        self._memory: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model: str, text: str) -> bytes:
+        """
+        Hash a model name and text into a fixed-size cache key
+        """
+        return hashlib.blake2b(f"{model}\0{text}".encode(), digest_size=16).digest()
+
+    def get_many(self, keys: List[bytes]) -> Dict[bytes, np.ndarray]:
+        """
+        Cached vectors for whichever of the keys are known, memory first, then disk
+        """
+        found = {}
+        with self._lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+
+        missing = [key for key in dict.fromkeys(keys) if key not in found]
+        if missing and self.store is not None:
+            on_disk = self.store.get_many(missing)
+            self._remember(on_disk)
+            found.update(on_disk)
+            self.disk_hits += len(on_disk)
+
+        hits = sum(1 for key in keys if key in found)
+        self.hits += hits
+        self.misses += len(keys) - hits
+        return found
+
+    def put_many(self, items: Dict[bytes, np.ndarray]) -> None:
+        """
+        Cache newly computed vectors in memory and on disk
+        """
+        self._remember(items)
+        if self.store is not None:
+            self.store.put_many(items)
+
+    def _remember(self, items: Dict[bytes, np.ndarray]) -> None:
+        with self._lock:
+            for key, vector in items.items():
+                self._memory[key] = vector
+                self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def stats(self) -> dict:
+        """
+        Hit/miss and size metrics
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self._memory),
+            "disk_entries": len(self.store) if self.store is not None else 0
+        }
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that only sends texts missing from the cache to the model.
+
+    A batch is looked up in one pass; the misses (de-duplicated) go to the
+    model in a single call. Vectors are kept as float32, and returned that
+    way whether or not they were cached, so results do not depend on cache state.
+    """
+
+    def __init__(self, embeddings: Embeddings, cache: EmbeddingCache, model: str):
+        self.embeddings = embeddings
+        self.cache = cache
+        self.model = model
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [self.cache.make_key(self.model, text) for text in texts]
+        vectors = self.cache.get_many(keys)
+
+        misses = {key: text for key, text in zip(keys, texts, strict=True) if key not in vectors}
+        if misses:
+            embedded = self.embeddings.embed_documents(list(misses.values()))
+            computed = {key: np.asarray(vector, dtype=np.float32) for key, vector in zip(misses, embedded, strict=True)}
+            self.cache.put_many(computed)
+            vectors.update(computed)
+
+        return [vectors[key].tolist() for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self.cache.make_key(self.model, text)
+
+        vector = self.cache.get_many([key]).get(key)
+        if vector is None:
+            vector = np.asarray(self.embeddings.embed_query(text), dtype=np.float32)
+            self.cache.put_many({key: vector})
+
+        return vector.tolist()
+
+
+# Global embedding cache instance
+_embedding_cache = None
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """
+    Get or create the embedding cache, or None when disabled in config
+    """
+    global _embedding_cache
+
+    if _embedding_cache is None and get_setting("embedding_cache.enabled", True):
+        store = None
+        if get_setting("embedding_cache.backend", "sqlite") == "sqlite":
+            store = SQLiteEmbeddingStore(
+                get_setting("embedding_cache.path", "./data/embedding_cache.sqlite"),
+                int(get_setting("embedding_cache.max_disk_entries", 1_000_000))
+            )
+
+        _embedding_cache = EmbeddingCache(
+            memory_entries=int(get_setting("embedding_cache.memory_entries", 10000)),
+            store=store
+        )
+
+    return _embedding_cache
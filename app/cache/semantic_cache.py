@@ -0,0 +1,146 @@
+import copy
+import threading
+import time
+from typing import List, Optional
+import logging
+import numpy as np
+from ..config import get_setting
+
+logger = logging.getLogger(__name__)
+
+# Result fields needed to rebuild a QueryResponse
+CACHED_FIELDS = ("answer", "sources", "confidence", "steps_taken")
+
+
+class SemanticCache:
+    """
+    Answer cache keyed on query-embedding similarity.
+
+    Embeddings of recently answered questions live in a preallocated float32
+    matrix of unit vectors, so a lookup is one matrix-vector product. When the
+    cache is full the least recently used slot is overwritten. All entries are
+    dropped when the corpus version changes.
+    """
+
+    def __init__(self, capacity: int, threshold: float, ttl_seconds: float):
+        self.capacity = capacity
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+
+        self._vectors: Optional[np.ndarray] = None
+        self._last_used = np.zeros(capacity, dtype=np.float64)
+        self._expires_at = np.zeros(capacity, dtype=np.float64)
+        self._results: List[Optional[dict]] = [None] * capacity
+        self._size = 0
+        self._corpus_version: Optional[str] = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.resets = 0
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def _sync_version(self, corpus_version: str) -> None:
+        if corpus_version != self._corpus_version:
+            if self._size:
+                logger.info("Corpus version changed, clearing semantic cache")
+                self.resets += 1
+            self._size = 0
+            self._results = [None] * self.capacity
+            self._corpus_version = corpus_version
+
+    def lookup(self, embedding: List[float], corpus_version: str) -> Optional[dict]:
+        """
+        Return a copy of the closest cached result above the threshold, or None
+        """
+        query = self._normalize(embedding)
+
+        with self._lock:
+            self._sync_version(corpus_version)
+
+            if self._size == 0 or self._vectors is None or self._vectors.shape[1] != query.shape[0]:
+                self.misses += 1
+                return None
+
+            similarities = self._vectors[:self._size] @ query
+            similarities[self._expires_at[:self._size] <= time.time()] = -np.inf
+            best = int(np.argmax(similarities))
+
+            if similarities[best] < self.threshold:
+                self.misses += 1
+                return None
+
+            self._last_used[best] = time.monotonic()
+            self.hits += 1
+            result = self._results[best]
+
+        logger.info(f"Semantic cache hit (similarity {similarities[best]:.3f})")
+        return copy.deepcopy(result)
+
+    def add(self, embedding: List[float], result: dict, corpus_version: str) -> None:
+        """
+        Remember the answer for a question embedding
+        """
+        vector = self._normalize(embedding)
+
+        with self._lock:
+            self._sync_version(corpus_version)
+
+            if self._vectors is None or self._vectors.shape[1] != vector.shape[0]:
+                self._vectors = np.zeros((self.capacity, vector.shape[0]), dtype=np.float32)
+                self._size = 0
+
+            if self._size < self.capacity:
+                slot = self._size
+                self._size += 1
+            else:
+                slot = int(np.argmin(self._last_used))
+                self.evictions += 1
+
+            self._vectors[slot] = vector
+            self._last_used[slot] = time.monotonic()
+            self._expires_at[slot] = time.time() + self.ttl_seconds
+            self._results[slot] = {field: copy.deepcopy(result.get(field)) for field in CACHED_FIELDS}
+
+    def stats(self) -> dict:
+        """
+        Hit/miss metrics; every hit is a GPT-4 call avoided
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "llm_calls_avoided": self.hits,
+            "evictions": self.evictions,
+            "resets": self.resets,
+            "entries": self._size,
+            "capacity": self.capacity,
+            "vector_bytes": self._vectors.nbytes if self._vectors is not None else 0
+        }
+
+
+# Global semantic cache instance
+_semantic_cache = None
+
+
+def get_semantic_cache() -> Optional[SemanticCache]:
+    """
+    Get or create the semantic cache, or None when disabled in config
+    """
+    global _semantic_cache
+
+    if _semantic_cache is None and get_setting("semantic_cache.enabled", False):
+        _semantic_cache = SemanticCache(
+            capacity=int(get_setting("semantic_cache.max_entries", 10000)),
+            threshold=float(get_setting("semantic_cache.similarity_threshold", 0.95)),
+            ttl_seconds=float(get_setting("semantic_cache.ttl_seconds", 3600))
+        )
+
+    return _semantic_cache
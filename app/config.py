@@ -0,0 +1,40 @@
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+import logging
+import yaml
+
+logger = logging.getLogger(__name__)
+
+CONFIG_PATH = os.getenv(
+    "CONFIG_PATH",
+    str(Path(__file__).resolve().parent.parent / "config" / "config.yaml")
+)
+
+
+@lru_cache(maxsize=1)
+def load_config() -> dict:
+    """
+    Load application settings from config.yaml
+    """
+    try:
+        with open(CONFIG_PATH) as f:
+            config = yaml.safe_load(f) or {}
+        logger.info(f"Loaded configuration from {CONFIG_PATH}")
+        return config
+    except FileNotFoundError:
+        logger.warning(f"Config file not found at {CONFIG_PATH}, using defaults")
+        return {}
+
+
+def get_setting(path: str, default: Any = None) -> Any:
+    """
+    Look up a dotted setting such as "retrieval.top_k", falling back to default
+    """
+    value: Any = load_config()
+    for key in path.split("."):
+        if not isinstance(value, dict) or key not in value:
+            return default
+        value = value[key]
+    return value
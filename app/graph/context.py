@@ -0,0 +1,165 @@
+import hashlib
+import re
+from functools import lru_cache
+from typing import FrozenSet, List, Optional, Tuple
+import logging
+from .state import Document
+from ..config import get_setting
+
+logger = logging.getLogger(__name__)
+
+# Rough characters-per-token ratio used when no tokenizer is available
+CHARS_PER_TOKEN = 4
+
+DOCUMENT_SEPARATOR = "\n\n"
+
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    """
+    Load the tokenizer for the configured model, or None if it can't be loaded
+    """
+    try:
+        import tiktoken
+
+        model = get_setting("llm.model", "gpt-4-turbo-preview")
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+
+    except Exception as e:
+        logger.warning(f"Tokenizer unavailable, estimating token counts: {e}")
+        return None
+
+
+@lru_cache(maxsize=int(get_setting("context_packing.token_cache_size", 10000)))
+def count_tokens(text: str) -> int:
+    """
+    Count tokens in text; cached, since the same chunks are retrieved repeatedly
+    """
+    encoding = _get_encoding()
+    if encoding is None:
+        return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, keep_end: bool = False) -> str:
+    """
+    Cut text down to at most max_tokens tokens, keeping the start (or the end)
+    """
+    if max_tokens <= 0:
+        return ""
+
+    encoding = _get_encoding()
+    if encoding is None:
+        limit = max_tokens * CHARS_PER_TOKEN
+        return text[-limit:] if keep_end else text[:limit]
+
+    tokens = encoding.encode(text, disallowed_special=())
+    return encoding.decode(tokens[-max_tokens:] if keep_end else tokens[:max_tokens])
+
+
+def format_document(index: int, doc: Document) -> str:
+    """
+    Render one document as it appears in the prompt context
+    """
+    return f"Document {index} (Source: {doc.metadata.get('source', 'unknown')}):\n{doc.content}"
+
+
+def _shingles(text: str, size: int = 3) -> FrozenSet[str]:
+    words = re.findall(r"\w+", text.lower())
+    if len(words) <= size:
+        return frozenset([" ".join(words)])
+    return frozenset(" ".join(words[i:i + size]) for i in range(len(words) - size + 1))
+
+
+def deduplicate(documents: List[Document], threshold: float) -> List[Document]:
+    """
+    Drop exact and near-duplicate chunks, keeping the first (best ranked) copy.
+
+    Exact duplicates are matched on whitespace/case-normalized content; near
+    duplicates on Jaccard similarity of word 3-gram shingles.
+    """
+    seen_hashes = set()
+    kept: List[Tuple[Document, FrozenSet[str]]] = []
+
+    for doc in documents:
+        normalized = " ".join(doc.content.lower().split())
+        digest = hashlib.sha1(normalized.encode()).hexdigest()
+        if digest in seen_hashes:
+            continue
+
+        shingles = _shingles(normalized)
+        if any(
+            len(shingles & other) / len(shingles | other) >= threshold
+            for _, other in kept
+        ):
+            continue
+
+        seen_hashes.add(digest)
+        kept.append((doc, shingles))
+
+    return [doc for doc, _ in kept]
+
+
+def context_budget(question: str, system_prompt: str, template: str, chat_history: Optional[List[dict]] = None) -> int:
+    """
+    Tokens left for documents after the prompt, history, question and reserved answer tokens
+    """
+    context_window = int(get_setting("conversation.context_window", 4096))
+    answer_tokens = int(get_setting("llm.max_tokens", 1024) or 0)
+    # Chat formatting adds a few tokens per message
+    overhead = count_tokens(system_prompt) + count_tokens(template.format(context="", question=question)) + 8
+    overhead += sum(count_tokens(message["content"]) + 4 for message in chat_history or [])
+
+    return max(0, context_window - answer_tokens - overhead)
+
+
+def pack_context(
+    documents: List[Document],
+    budget: int,
+    near_duplicate_threshold: Optional[float] = None
+) -> Tuple[str, List[Document], int]:
+    """
+    Pack the best documents into a token budget.
+
+    Documents are taken in the order given (the retrieval or rerank ranking,
+    nearest first), deduplicated, then added greedily while they fit; ones
+    that don't fit are skipped in favour of smaller, lower-ranked chunks. If
+    even the top document exceeds the budget it is truncated rather than
+    dropped. Returns (context, packed documents, tokens).
+    """
+    if near_duplicate_threshold is None:
+        near_duplicate_threshold = float(get_setting("context_packing.near_duplicate_threshold", 0.9))
+
+    candidates = deduplicate(documents, near_duplicate_threshold)
+
+    separator_tokens = count_tokens(DOCUMENT_SEPARATOR)
+    parts: List[str] = []
+    packed: List[Document] = []
+    used = 0
+
+    for doc in candidates:
+        cost = count_tokens(format_document(len(packed) + 1, doc))
+        if parts:
+            cost += separator_tokens
+
+        if used + cost <= budget:
+            parts.append(format_document(len(packed) + 1, doc))
+            packed.append(doc)
+            used += cost
+        elif not packed:
+            header_tokens = count_tokens(format_document(1, doc.model_copy(update={"content": ""})))
+            if budget > header_tokens:
+                truncated = doc.model_copy(update={"content": truncate_to_tokens(doc.content, budget - header_tokens)})
+                parts.append(format_document(1, truncated))
+                packed.append(truncated)
+                used += count_tokens(parts[0])
+
+    dropped = len(documents) - len(packed)
+    if dropped:
+        logger.info(f"Packed {len(packed)}/{len(documents)} documents into {used}/{budget} context tokens")
+
+    return DOCUMENT_SEPARATOR.join(parts), packed, used
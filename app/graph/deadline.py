@@ -0,0 +1,72 @@
+import asyncio
+import time
+from typing import Awaitable, Optional, TypeVar
+from .state import GraphState
+from ..config import get_setting
+
+T = TypeVar("T")
+
+DEFAULT_SECONDS = float(get_setting("deadline.default_seconds", 30))
+MAX_SECONDS = float(get_setting("deadline.max_seconds", 120))
+
+# Degradation thresholds, in seconds left when a node starts
+REDUCE_TOP_K_BELOW = float(get_setting("deadline.reduce_top_k_below_seconds", 10))
+DEGRADED_TOP_K = int(get_setting("deadline.degraded_top_k", 2))
+REDUCE_CONTEXT_BELOW = float(get_setting("deadline.reduce_context_below_seconds", 8))
+DEGRADED_CONTEXT_SCALE = float(get_setting("deadline.degraded_context_scale", 0.5))
+FAST_MODEL_BELOW = float(get_setting("deadline.fast_model_below_seconds", 6))
+FAST_MODEL = get_setting("deadline.fast_model", "gpt-3.5-turbo")
+MIN_GENERATION_SECONDS = float(get_setting("deadline.min_generation_seconds", 2))
+
+# Recorded when a request ran out of time with nothing useful to return
+DEADLINE_EXCEEDED = "deadline_exceeded"
+
+
+def make_deadline(timeout: Optional[float] = None) -> float:
+    """
+    Absolute deadline (time.monotonic clock) for a request starting now
+    """
+    if timeout is None:
+        timeout = DEFAULT_SECONDS
+    return time.monotonic() + min(timeout, MAX_SECONDS)
+
+
+def seconds_left(deadline: Optional[float]) -> Optional[float]:
+    """
+    Seconds until a deadline, or None if there is none
+    """
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def time_left(state: GraphState) -> Optional[float]:
+    """
+    Seconds until the request's deadline, or None if it has none
+    """
+    return seconds_left(state.get("deadline"))
+
+
+def running_short(state: GraphState, threshold: float) -> bool:
+    """
+    Whether the request has a deadline less than threshold seconds away
+    """
+    left = time_left(state)
+    return left is not None and left < threshold
+
+
+async def within_deadline(awaitable: Awaitable[T], deadline: Optional[float]) -> T:
+    """
+    Await, cancelling with asyncio.TimeoutError once the deadline passes
+    """
+    left = seconds_left(deadline)
+    if left is None:
+        return await awaitable
+    return await asyncio.wait_for(awaitable, timeout=max(left, 0.0))
+
+
+def deadline_exceeded(result: dict) -> bool:
+    """
+    Whether a workflow result ran out of time without anything useful to return
+    """
+    return DEADLINE_EXCEEDED in (result.get("degradations") or [])
@@ -0,0 +1,119 @@
+import math
+import re
+from collections import Counter
+from typing import List, Optional, Tuple
+import logging
+from .state import Document
+from ..config import get_setting
+from ..retrieval.multi_query import SUB_QUESTION_SPLIT
+from ..retrieval.text import keyword_form, stem
+
+logger = logging.getLogger(__name__)
+
+MAX_QUESTION_WORDS = int(get_setting("extractive.max_question_words", 15))
+MAX_SENTENCES = int(get_setting("extractive.max_sentences", 2))
+MIN_KEYWORD_COVERAGE = float(get_setting("extractive.min_keyword_coverage", 0.5))
+
+# Direct lookups: "what command ...", "which port ...", "where is ...", "how do I ..."
+LOOKUP_QUESTION = re.compile(
+    r"^\s*(?:what(?:'s|\s+is|\s+are)?|which|where|when|who|how\s+(?:do|can|should)\s+(?:i|you|we))\b",
+    re.IGNORECASE
+)
+
+# Questions that want reasoning or synthesis rather than a quoted fact
+OPEN_ENDED = re.compile(
+    r"\b(?:why|explain|compare|comparison|difference|differences|versus|vs|pros|cons|"
+    r"trade-?offs?|summari[sz]e|describe|overview|best\s+way|recommend)\b",
+    re.IGNORECASE
+)
+
+# Words naming the kind of answer wanted rather than its content ("what command ...")
+ANSWER_TYPE_WORDS = frozenset(["command", "commands", "cmd", "way", "ways", "step", "steps"])
+
+SECOND_SENTENCE_RATIO = 0.8
+
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|\n+")
+
+# Commands, flags, paths and inline code are what lookups usually ask for
+CODE_LIKE = re.compile(r"`[^`]+`|\s--?[a-z]|\$\s|[\w\-]+/[\w\-.]+|[\w\-]+\.(?:ya?ml|json|py|toml|env|md)\b")
+
+
+def is_lookup_question(question: str) -> bool:
+    """
+    Whether a question asks for a single fact that can be quoted from the docs
+    """
+    question = question.strip()
+    if len(question.split()) > MAX_QUESTION_WORDS:
+        return False
+    if not LOOKUP_QUESTION.match(question) or OPEN_ENDED.search(question):
+        return False
+
+    # Multi-part questions need the answers combined
+    return len(SUB_QUESTION_SPLIT.split(question.rstrip(" ?"))) == 1
+
+
+def _terms(text: str) -> List[str]:
+    return [stem(word) for word in keyword_form(text).split() if word not in ANSWER_TYPE_WORDS]
+
+
+def extract_answer(
+    question: str,
+    documents: List[Document],
+    max_sentences: int = MAX_SENTENCES,
+    min_coverage: float = MIN_KEYWORD_COVERAGE
+) -> Optional[Tuple[str, List[Document]]]:
+    """
+    Answer a lookup by quoting the best matching sentences of the retrieved chunks.
+
+    Sentences are scored by the IDF-weighted share of the question's keywords
+    they contain, with a small bonus for code-like text and for coming from a
+    higher-ranked chunk. Documents are taken in the order given, which is the
+    retrieval (or rerank) ranking, nearest first. Up to max_sentences are
+    quoted, as long as they score close to the best one. Returns (answer,
+    documents quoted), or None when no sentence covers at least min_coverage
+    of the keywords.
+    """
+    keywords = set(_terms(question))
+    if not keywords or not documents:
+        return None
+
+    candidates = []
+    for rank, doc in enumerate(documents):
+        for position, sentence in enumerate(SENTENCE_SPLIT.split(doc.content)):
+            sentence = sentence.strip()
+            if len(sentence.split()) >= 3:
+                candidates.append((sentence, set(_terms(sentence)), rank, position, doc))
+
+    if not candidates:
+        return None
+
+    # Keywords that appear in fewer sentences say more about the answer
+    frequency = Counter(term for _, terms, *_ in candidates for term in terms & keywords)
+    idf = {term: math.log(1 + len(candidates) / (1 + frequency[term])) for term in keywords}
+    total_weight = sum(idf.values())
+
+    scored = []
+    for sentence, terms, rank, position, doc in candidates:
+        coverage = sum(idf[term] for term in terms & keywords) / total_weight
+        if coverage < min_coverage:
+            continue
+        score = coverage + (0.1 if CODE_LIKE.search(sentence) else 0.0) - 0.05 * rank
+        scored.append((score, rank, position, sentence, doc))
+
+    if not scored:
+        return None
+
+    scored.sort(key=lambda item: item[0], reverse=True)
+
+    # Extra sentences only when they are nearly as good as the best one
+    best = [item for item in scored[:max_sentences] if item[0] >= SECOND_SENTENCE_RATIO * scored[0][0]]
+
+    # Quote in document order so multi-sentence answers read naturally
+    best.sort(key=lambda item: (item[1], item[2]))
+
+    quoted: List[Document] = []
+    for *_, doc in best:
+        if doc not in quoted:
+            quoted.append(doc)
+
+    return " ".join(sentence for *_, sentence, _ in best), quoted
@@ -0,0 +1,104 @@
+import re
+from typing import List, Optional
+import logging
+from ..config import get_setting
+
+logger = logging.getLogger(__name__)
+
+MIN_QUESTION_WORDS = int(get_setting("intent_router.min_question_words", 3))
+
+# Intents
+GREETING = "greeting"
+CLOSING = "closing"
+META = "meta"
+FOLLOW_UP = "follow_up"
+VAGUE = "vague"
+QUESTION = "question"
+
+_END = r"[\s!.?,:)]*$"
+
+GREETING_PATTERN = re.compile(
+    r"^\s*(?:hi|hello|hey|hiya|howdy|greetings|good\s+(?:morning|afternoon|evening|day))"
+    r"(?:\s+(?:there|all|everyone|team))?" + _END,
+    re.IGNORECASE
+)
+
+# Thanks and goodbyes that end an exchange
+CLOSING_PATTERN = re.compile(
+    r"^\s*(?:(?:ok(?:ay)?|great|perfect|cool|awesome|got\s+it)[\s,!.]+)?"
+    r"(?:thanks?|thank\s+you|thx|ty|cheers|much\s+appreciated|that\s+(?:helps|helped|worked)|"
+    r"bye|goodbye|see\s+you(?:\s+later)?)"
+    r"(?:\s+(?:a\s+lot|so\s+much|very\s+much))?(?:[\s,!.]+(?:bye|goodbye))?" + _END,
+    re.IGNORECASE
+)
+
+# Questions about the assistant itself rather than the documentation
+META_PATTERN = re.compile(
+    r"^\s*(?:help|what\s+(?:can|do)\s+you\s+do|what\s+are\s+you|who\s+are\s+you|"
+    r"what\s+(?:can|should)\s+i\s+ask(?:\s+you)?|how\s+(?:do|can|should)\s+i\s+use\s+(?:you|this)|"
+    r"what\s+do\s+you\s+know|are\s+you\s+(?:an?\s+)?(?:bot|human|ai|robot))" + _END,
+    re.IGNORECASE
+)
+
+# Requests to restate the previous answer: the conversation already has everything needed
+FOLLOW_UP_PATTERN = re.compile(
+    r"^\s*(?:(?:can|could|would)\s+you\s+)?(?:please\s+)?(?:"
+    r"rephrase(?:\s+(?:that|it))?|say\s+(?:that|it)\s+again|repeat\s+(?:that|it)|"
+    r"summari[sz]e\s+(?:that|it|this)|(?:make\s+(?:that|it)\s+)?(?:shorter|simpler|briefer)|"
+    r"explain\s+(?:that|it|this)(?:\s+(?:again|differently|more\s+simply|in\s+simpler\s+terms))?|"
+    r"in\s+(?:simpler|plain|other)\s+(?:terms|words|english)|tl;?dr|"
+    r"what\s+do\s+you\s+mean|what\s+does\s+that\s+mean|i\s+don'?t\s+(?:understand|get\s+it)"
+    r")(?:\s+please)?" + _END,
+    re.IGNORECASE
+)
+
+CANNED_RESPONSES = {
+    GREETING: "Hello! Ask me anything about the technical documentation and I'll find the answer for you.",
+    CLOSING: "You're welcome! Ask again any time you need something from the documentation.",
+    META: (
+        "I answer questions about the technical documentation. Ask something specific, "
+        "such as how to configure, deploy or troubleshoot a component, and I'll answer "
+        "from the relevant documents and cite my sources."
+    )
+}
+
+
+def _mentions_corpus(question: str) -> bool:
+    from ..retrieval.vector_store import get_corpus_vocabulary
+
+    return get_corpus_vocabulary().mentions(question)
+
+
+def classify_intent(question: str, chat_history: Optional[List[dict]] = None) -> str:
+    """
+    Classify a question without a model call.
+
+    Greetings, closings and questions about the assistant get canned answers;
+    requests to restate the previous answer are follow-ups (vague without one
+    to restate). Short questions only count as vague when none of their words
+    appear in the corpus vocabulary, so "kubectl rollout?" is still searched.
+    Everything else is a question for retrieval.
+    """
+    if GREETING_PATTERN.match(question):
+        return GREETING
+    if CLOSING_PATTERN.match(question):
+        return CLOSING
+    if META_PATTERN.match(question):
+        return META
+
+    has_history = any(message["role"] == "user" for message in chat_history or [])
+
+    if FOLLOW_UP_PATTERN.match(question):
+        return FOLLOW_UP if has_history else VAGUE
+
+    if len(question.split()) < MIN_QUESTION_WORDS and not has_history and not _mentions_corpus(question):
+        return VAGUE
+
+    return QUESTION
+
+
+def needs_retrieval(intent: str) -> bool:
+    """
+    Whether answering an intent involves searching the documents
+    """
+    return intent == QUESTION
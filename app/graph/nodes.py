@@ -1,10 +1,39 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
+import asyncio
 import logging
-from langchain_openai import ChatOpenAI
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from langchain_core.runnables import RunnableConfig
 from .state import GraphState, Document
+from ..config import get_setting
+from .context import context_budget, pack_context
+from .extractive import extract_answer
+from .intent import CANNED_RESPONSES, VAGUE, classify_intent, needs_retrieval as intent_needs_retrieval
+from .deadline import (
+    DEADLINE_EXCEEDED,
+    DEGRADED_CONTEXT_SCALE,
+    DEGRADED_TOP_K,
+    FAST_MODEL,
+    FAST_MODEL_BELOW,
+    MIN_GENERATION_SECONDS,
+    REDUCE_CONTEXT_BELOW,
+    REDUCE_TOP_K_BELOW,
+    running_short,
+    time_left,
+    within_deadline
+)
+from ..llm.client import get_llm
+from ..metrics import CONTEXT_TOKENS
 
 logger = logging.getLogger(__name__)
 
+RETRIEVAL_TOP_K = int(get_setting("retrieval.top_k", 5))
+MULTI_QUERY_ENABLED = bool(get_setting("retrieval.multi_query.enabled", False))
+HYBRID_SEARCH_ENABLED = bool(get_setting("retrieval.hybrid_search", False))
+INTENT_ROUTER_ENABLED = bool(get_setting("intent_router.enabled", False))
+RERANK_ENABLED = bool(get_setting("retrieval.rerank", False))
+RERANK_CANDIDATES = int(get_setting("reranker.candidates", 20))
+RERANK_BUDGET_SECONDS = float(get_setting("reranker.budget_ms", 300)) / 1000
+
 
 def query_analysis_node(state: GraphState) -> Dict[str, Any]:
     """
@@ -14,30 +43,79 @@ def query_analysis_node(state: GraphState) -> Dict[str, Any]:
 
     question = state["question"]
 
-    # Simple heuristics (in production, use LLM for classification)
-    needs_retrieval = True  # Most questions need retrieval
-    needs_clarification = False
+    # Follow-ups lean on the previous question ("How do I install it?")
+    previous_questions = [m["content"] for m in state.get("chat_history") or [] if m["role"] == "user"]
+
+    update = {"steps_taken": ["query_analysis"]}
+
+    if INTENT_ROUTER_ENABLED:
+        # Pattern and corpus-vocabulary classification; microseconds, no model call
+        intent = classify_intent(question, state.get("chat_history"))
+        needs_retrieval = intent_needs_retrieval(intent)
+        needs_clarification = intent == VAGUE
+        update["intent"] = intent
+        logger.info(f"Intent: {intent}")
+    else:
+        # Simple heuristics: every question is searched unless too vague
+        needs_retrieval = True
+        needs_clarification = len(question.strip().split()) < 3 and not previous_questions
 
-    # Check if question is too vague
-    if len(question.strip().split()) < 3:
-        needs_clarification = True
+    update["needs_retrieval"] = needs_retrieval
+    update["needs_clarification"] = needs_clarification
 
-    state["needs_retrieval"] = needs_retrieval
-    state["needs_clarification"] = needs_clarification
-    state["steps_taken"] = state.get("steps_taken", []) + ["query_analysis"]
+    if previous_questions:
+        update["retrieval_query"] = f"{previous_questions[-1]} {question}"
 
     logger.info(f"Needs retrieval: {needs_retrieval}, Needs clarification: {needs_clarification}")
 
-    return state
+    return update
+
+
+def _with_degradations(update: Dict[str, Any], degradations: List[str]) -> Dict[str, Any]:
+    """
+    Add any deadline-driven degradations to a node's state update
+    """
+    if degradations:
+        update["degradations"] = degradations
+    return update
+
+
+def _to_documents(results) -> List[Document]:
+    """
+    Convert (document, score) search results to Document objects
+    """
+    return [
+        Document(
+            content=doc.page_content,
+            metadata=doc.metadata,
+            relevance_score=float(score)
+        )
+        for doc, score in results
+    ]
+
+
+def _retrieval_top_k(state: GraphState, rerank: bool) -> Tuple[int, List[str]]:
+    """
+    Number of documents to retrieve, fewer when the deadline is close
+    """
+    if running_short(state, REDUCE_TOP_K_BELOW):
+        return min(RETRIEVAL_TOP_K, DEGRADED_TOP_K), ["reduced_top_k"]
+    if rerank:
+        # Over-fetch; the rerank node keeps the best top_k
+        return max(RERANK_CANDIDATES, RETRIEVAL_TOP_K), []
+    return RETRIEVAL_TOP_K, []
 
 
-def retrieval_node(state: GraphState) -> Dict[str, Any]:
+def retrieval_node(state: GraphState, rerank: bool = False) -> Dict[str, Any]:
     """
-    Retrieve relevant documents from vector store
+    Retrieve relevant documents from vector store.
+
+    With rerank, candidates are over-fetched for the rerank node that follows.
     """
     logger.info("Executing retrieval node")
 
-    question = state["question"]
+    question = state.get("retrieval_query") or state["question"]
+    top_k, degradations = _retrieval_top_k(state, rerank)
 
     try:
         from ..retrieval.vector_store import get_vector_store
@@ -45,31 +123,188 @@ def retrieval_node(state: GraphState) -> Dict[str, Any]:
         vector_store = get_vector_store()
 
         # Perform similarity search
-        results = vector_store.similarity_search_with_score(
-            query=question,
-            k=5
+        query_embedding = state.get("query_embedding")
+        if MULTI_QUERY_ENABLED:
+            from ..retrieval.multi_query import multi_query_search
+
+            results = multi_query_search(question, k=top_k, query_embedding=query_embedding)
+        elif HYBRID_SEARCH_ENABLED:
+            from ..retrieval.hybrid import hybrid_search
+
+            results = hybrid_search(question, k=top_k, query_embedding=query_embedding)
+        elif query_embedding is not None:
+            results = vector_store.similarity_search_by_vector_with_relevance_scores(
+                embedding=query_embedding,
+                k=top_k
+            )
+        else:
+            results = vector_store.similarity_search_with_score(
+                query=question,
+                k=top_k
+            )
+
+        documents = _to_documents(results)
+
+        logger.info(f"Retrieved {len(documents)} documents")
+
+        return _with_degradations({"retrieved_documents": documents, "steps_taken": ["retrieval"]}, degradations)
+
+    except Exception as e:
+        logger.error(f"Retrieval failed: {e}")
+        return {"retrieved_documents": [], "error": str(e)}
+
+
+async def aretrieval_node(state: GraphState, rerank: bool = False) -> Dict[str, Any]:
+    """
+    Async retrieval node; embedding and Chroma search run on the bounded executor
+    """
+    logger.info("Executing retrieval node")
+
+    question = state.get("retrieval_query") or state["question"]
+    top_k, degradations = _retrieval_top_k(state, rerank)
+
+    try:
+        from ..retrieval.vector_store import (
+            asimilarity_search_with_score,
+            asimilarity_search_by_vector_with_score
         )
 
-        # Convert to Document objects
-        documents = []
-        for doc, score in results:
-            documents.append(Document(
-                content=doc.page_content,
-                metadata=doc.metadata,
-                relevance_score=float(score)
-            ))
+        # Batch queries arrive with their embedding already computed
+        query_embedding = state.get("query_embedding")
+        if MULTI_QUERY_ENABLED:
+            from ..retrieval.multi_query import amulti_query_search
+
+            search = amulti_query_search(question, k=top_k, query_embedding=query_embedding)
+        elif HYBRID_SEARCH_ENABLED:
+            from ..retrieval.hybrid import ahybrid_search
+
+            search = ahybrid_search(question, k=top_k, query_embedding=query_embedding)
+        elif query_embedding is not None:
+            search = asimilarity_search_by_vector_with_score(query_embedding, k=top_k)
+        else:
+            search = asimilarity_search_with_score(question, k=top_k)
+
+        results = await within_deadline(search, state.get("deadline"))
 
-        state["retrieved_documents"] = documents
-        state["steps_taken"] = state.get("steps_taken", []) + ["retrieval"]
+        documents = _to_documents(results)
 
         logger.info(f"Retrieved {len(documents)} documents")
 
+        return _with_degradations({"retrieved_documents": documents, "steps_taken": ["retrieval"]}, degradations)
+
+    except asyncio.TimeoutError:
+        # Nothing to answer from: the request fails with a deadline error
+        logger.warning("Retrieval ran past the request deadline")
+        return {
+            "retrieved_documents": [],
+            "error": "Retrieval timed out",
+            "degradations": degradations + ["retrieval_timeout", DEADLINE_EXCEEDED]
+        }
+
     except Exception as e:
         logger.error(f"Retrieval failed: {e}")
-        state["retrieved_documents"] = []
-        state["error"] = str(e)
+        return {"retrieved_documents": [], "error": str(e)}
+
+
+def _rerank_budget(state: GraphState) -> float:
+    """
+    Seconds the rerank stage may take: its budget, less if the deadline is closer
+    """
+    left = time_left(state)
+    if left is None:
+        return RERANK_BUDGET_SECONDS
+    return max(min(RERANK_BUDGET_SECONDS, left - MIN_GENERATION_SECONDS), 0.0)
+
 
-    return state
+def _reranked(documents: List[Document], scores: List[float]) -> List[Document]:
+    """
+    The best RETRIEVAL_TOP_K documents by cross-encoder score
+    """
+    ranked = sorted(zip(documents, scores, strict=True), key=lambda pair: pair[1], reverse=True)
+    return [doc.model_copy(update={"rerank_score": score}) for doc, score in ranked[:RETRIEVAL_TOP_K]]
+
+
+def _rerank_skipped(documents: List[Document], degradation: str) -> Dict[str, Any]:
+    """
+    Keep the retrieval order, cut to RETRIEVAL_TOP_K, when reranking did not finish
+    """
+    return {
+        "retrieved_documents": documents[:RETRIEVAL_TOP_K],
+        "steps_taken": ["rerank"],
+        "degradations": [degradation]
+    }
+
+
+def rerank_node(state: GraphState) -> Dict[str, Any]:
+    """
+    Reorder the over-fetched candidates with the cross-encoder and keep the best
+    """
+    logger.info("Executing rerank node")
+
+    documents = state.get("retrieved_documents") or []
+    if len(documents) <= 1:
+        return {"steps_taken": ["rerank"]}
+
+    question = state.get("retrieval_query") or state["question"]
+    budget = _rerank_budget(state)
+    if budget <= 0:
+        return _rerank_skipped(documents, "rerank_timeout")
+
+    try:
+        from ..retrieval import reranker
+        from ..retrieval.vector_store import get_executor
+
+        # The model loads on the executor too; past the budget the pass keeps
+        # running and still fills the score cache
+        future = get_executor().submit(reranker.score, question, [doc.content for doc in documents])
+        scores = future.result(timeout=budget)
+
+    except FuturesTimeoutError:
+        logger.warning("Reranking ran past its time budget; keeping retrieval order")
+        return _rerank_skipped(documents, "rerank_timeout")
+
+    except Exception as e:
+        logger.error(f"Reranking failed: {e}")
+        return _rerank_skipped(documents, "rerank_failed")
+
+    return {"retrieved_documents": _reranked(documents, scores), "steps_taken": ["rerank"]}
+
+
+async def arerank_node(state: GraphState) -> Dict[str, Any]:
+    """
+    Async rerank node; the cross-encoder pass runs on the bounded executor
+    """
+    logger.info("Executing rerank node")
+
+    documents = state.get("retrieved_documents") or []
+    if len(documents) <= 1:
+        return {"steps_taken": ["rerank"]}
+
+    question = state.get("retrieval_query") or state["question"]
+    budget = _rerank_budget(state)
+    if budget <= 0:
+        return _rerank_skipped(documents, "rerank_timeout")
+
+    try:
+        from ..retrieval import reranker
+        from ..retrieval.vector_store import run_in_executor
+
+        # The model loads on the executor too, not the event loop; past the
+        # budget the pass keeps running and still fills the score cache
+        scores = await asyncio.wait_for(
+            run_in_executor(reranker.score, question, [doc.content for doc in documents]),
+            timeout=budget
+        )
+
+    except asyncio.TimeoutError:
+        logger.warning("Reranking ran past its time budget; keeping retrieval order")
+        return _rerank_skipped(documents, "rerank_timeout")
+
+    except Exception as e:
+        logger.error(f"Reranking failed: {e}")
+        return _rerank_skipped(documents, "rerank_failed")
+
+    return {"retrieved_documents": _reranked(documents, scores), "steps_taken": ["rerank"]}
 
 
 def relevance_check_node(state: GraphState) -> Dict[str, Any]:
@@ -81,17 +316,107 @@ def relevance_check_node(state: GraphState) -> Dict[str, Any]:
     documents = state.get("retrieved_documents", [])
 
     if not documents:
-        state["confidence"] = 0.0
+        confidence = 0.0
         logger.info("No documents retrieved, confidence: 0.0")
     else:
         # Calculate average relevance score
         avg_score = sum(doc.relevance_score or 0 for doc in documents) / len(documents)
-        state["confidence"] = min(avg_score, 1.0)
+        confidence = min(avg_score, 1.0)
         logger.info(f"Average relevance score: {avg_score:.2f}")
 
-    state["steps_taken"] = state.get("steps_taken", []) + ["relevance_check"]
+    return {"confidence": confidence, "steps_taken": ["relevance_check"]}
+
+
+SYSTEM_PROMPT = """You are a helpful technical documentation assistant.
+Answer questions based ONLY on the provided context.
+If the context doesn't contain relevant information, say so clearly.
+Always cite specific sources when providing information."""
+
+
+USER_PROMPT_TEMPLATE = """Context:
+{context}
+
+Question: {question}
+
+Answer the question based on the context above. Be specific and cite sources."""
+
+
+# Generation without retrieval: the conversation already holds the documented answer
+HISTORY_PROMPT_TEMPLATE = """Question: {question}
+
+Answer using the conversation so far; it already contains the relevant documentation."""
+
+
+def _build_messages(
+    question: str,
+    documents: List[Document],
+    chat_history: Optional[List[dict]] = None,
+    context_scale: float = 1.0
+) -> List[dict]:
+    """
+    Build the chat messages for answer generation
+    """
+    chat_history = chat_history or []
+
+    # Pack the best, de-duplicated documents into the context token budget
+    if documents or not chat_history:
+        budget = context_budget(question, SYSTEM_PROMPT, USER_PROMPT_TEMPLATE, chat_history)
+        context, _, context_tokens = pack_context(documents, int(budget * context_scale))
+        CONTEXT_TOKENS.observe(context_tokens)
+
+        user_prompt = USER_PROMPT_TEMPLATE.format(context=context, question=question)
+    else:
+        user_prompt = HISTORY_PROMPT_TEMPLATE.format(question=question)
+
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        *chat_history,
+        {"role": "user", "content": user_prompt}
+    ]
+
+
+def _generation_failed(error: Exception) -> Dict[str, Any]:
+    """
+    State update recording a generation failure
+    """
+    logger.error(f"Generation failed: {error}")
+    return {
+        "answer": "I apologize, but I encountered an error while generating the answer.",
+        "error": str(error),
+        "confidence": 0.0
+    }
+
+
+def _generation_plan(state: GraphState) -> Tuple[Optional[str], float, List[str]]:
+    """
+    Model override, context budget scale and degradations for the time left
+    """
+    model = None
+    context_scale = 1.0
+    degradations = []
+
+    if running_short(state, REDUCE_CONTEXT_BELOW):
+        context_scale = DEGRADED_CONTEXT_SCALE
+        degradations.append("reduced_context")
+    if running_short(state, FAST_MODEL_BELOW):
+        model = FAST_MODEL
+        degradations.append("fast_model")
+
+    return model, context_scale, degradations
+
+
+def _deadline_answer(state: GraphState, reason: str) -> Dict[str, Any]:
+    """
+    Answer quoted from the retrieved documents when there is no time left for the LLM
+    """
+    logger.warning(f"Answering without the LLM to meet the deadline ({reason})")
+
+    extracted = extract_answer(state["question"], state.get("retrieved_documents", []), min_coverage=0.0)
+    if extracted is None:
+        return {"answer": "", "degradations": [reason, DEADLINE_EXCEEDED]}
 
-    return state
+    answer, quoted = extracted
+    return {"answer": answer, "retrieved_documents": quoted, "degradations": [reason, "extractive_answer"]}
 
 
 def generation_node(state: GraphState) -> Dict[str, Any]:
@@ -100,53 +425,101 @@ def generation_node(state: GraphState) -> Dict[str, Any]:
     """
     logger.info("Executing generation node")
 
+    if running_short(state, MIN_GENERATION_SECONDS):
+        return _deadline_answer(state, "skipped_generation")
+
     question = state["question"]
     documents = state.get("retrieved_documents", [])
+    model, context_scale, degradations = _generation_plan(state)
 
     try:
-        # Prepare context from retrieved documents
-        context = "\n\n".join([
-            f"Document {i+1} (Source: {doc.metadata.get('source', 'unknown')}):\n{doc.content}"
-            for i, doc in enumerate(documents)
-        ])
-
-        # Create prompt
-        system_prompt = """You are a helpful technical documentation assistant.
-Answer questions based ONLY on the provided context.
-If the context doesn't contain relevant information, say so clearly.
-Always cite specific sources when providing information."""
+        messages = _build_messages(question, documents, state.get("chat_history"), context_scale)
 
-        user_prompt = f"""Context:
-{context}
+        # Shared, pooled LLM client configured from config.yaml
+        llm = get_llm(model=model)
 
-Question: {question}
+        # Generate response
+        response = llm.invoke(messages)
 
-Answer the question based on the context above. Be specific and cite sources."""
+        logger.info("Answer generated successfully")
 
-        # Initialize LLM
-        llm = ChatOpenAI(
-            model="gpt-4-turbo-preview",
-            temperature=0.1
-        )
+        return _with_degradations({"answer": response.content, "steps_taken": ["generation"]}, degradations)
 
-        # Generate response
-        response = llm.invoke([
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ])
+    except Exception as e:
+        return _generation_failed(e)
+
+
+async def ageneration_node(state: GraphState, config: Optional[RunnableConfig] = None) -> Dict[str, Any]:
+    """
+    Async generation node; awaits the LLM instead of blocking the event loop.
+
+    When the run config carries an ``on_token`` coroutine in ``configurable``,
+    the answer is streamed and each token is passed to it as it arrives.
+    """
+    logger.info("Executing generation node")
+
+    if running_short(state, MIN_GENERATION_SECONDS):
+        return _deadline_answer(state, "skipped_generation")
+
+    question = state["question"]
+    documents = state.get("retrieved_documents", [])
+    on_token = (config or {}).get("configurable", {}).get("on_token")
+    model, context_scale, degradations = _generation_plan(state)
+
+    async def generate() -> str:
+        if on_token is None:
+            response = await llm.ainvoke(messages)
+            return response.content
 
-        state["answer"] = response.content
-        state["steps_taken"] = state.get("steps_taken", []) + ["generation"]
+        tokens = []
+        async for chunk in llm.astream(messages):
+            if chunk.content:
+                tokens.append(chunk.content)
+                await on_token(chunk.content)
+        return "".join(tokens)
+
+    try:
+        messages = _build_messages(question, documents, state.get("chat_history"), context_scale)
+
+        # Shared, pooled LLM client configured from config.yaml
+        llm = get_llm(model=model)
+
+        # Generate response, giving up at the request deadline
+        answer = await within_deadline(generate(), state.get("deadline"))
 
         logger.info("Answer generated successfully")
 
+        return _with_degradations({"answer": answer, "steps_taken": ["generation"]}, degradations)
+
+    except asyncio.TimeoutError:
+        update = _deadline_answer(state, "generation_timeout")
+        update["degradations"] = degradations + update["degradations"]
+        return update
+
     except Exception as e:
-        logger.error(f"Generation failed: {e}")
-        state["answer"] = "I apologize, but I encountered an error while generating the answer."
-        state["error"] = str(e)
-        state["confidence"] = 0.0
+        return _generation_failed(e)
 
-    return state
+
+def extractive_answer_node(state: GraphState) -> Dict[str, Any]:
+    """
+    Answer a lookup question by quoting the retrieved chunks, without the LLM.
+
+    When no sentence matches well enough the answer is left empty and the
+    workflow falls through to generation.
+    """
+    logger.info("Executing extractive answer node")
+
+    extracted = extract_answer(state["question"], state.get("retrieved_documents", []))
+
+    if extracted is None:
+        logger.info("No extractive answer, falling back to generation")
+        return {"steps_taken": ["extractive_answer"]}
+
+    answer, quoted = extracted
+    logger.info(f"Extractive answer from {len(quoted)} documents")
+
+    # Cite the chunks the answer was quoted from
+    return {"answer": answer, "retrieved_documents": quoted, "steps_taken": ["extractive_answer"]}
 
 
 def source_attribution_node(state: GraphState) -> Dict[str, Any]:
@@ -167,12 +540,9 @@ def source_attribution_node(state: GraphState) -> Dict[str, Any]:
         }
         sources.append(source_info)
 
-    state["sources"] = sources
-    state["steps_taken"] = state.get("steps_taken", []) + ["source_attribution"]
-
     logger.info(f"Added {len(sources)} source citations")
 
-    return state
+    return {"sources": sources, "steps_taken": ["source_attribution"]}
 
 
 def fallback_node(state: GraphState) -> Dict[str, Any]:
@@ -181,7 +551,7 @@ def fallback_node(state: GraphState) -> Dict[str, Any]:
     """
     logger.info("Executing fallback node")
 
-    state["answer"] = """I apologize, but I couldn't find relevant information in the documentation to answer your question.
+    answer = """I apologize, but I couldn't find relevant information in the documentation to answer your question.
 
 This could be because:
 - The topic is not covered in the available documentation
@@ -190,11 +560,12 @@ This could be because:
 
 Could you please rephrase your question or provide more context?"""
 
-    state["confidence"] = 0.0
-    state["sources"] = []
-    state["steps_taken"] = state.get("steps_taken", []) + ["fallback"]
-
-    return state
+    return {
+        "answer": answer,
+        "confidence": 0.0,
+        "sources": [],
+        "steps_taken": ["fallback"]
+    }
 
 
 def clarification_node(state: GraphState) -> Dict[str, Any]:
@@ -203,7 +574,84 @@ def clarification_node(state: GraphState) -> Dict[str, Any]:
     """
     logger.info("Executing clarification node")
 
-    state["clarification_question"] = "Could you please provide more details or rephrase your question?"
-    state["steps_taken"] = state.get("steps_taken", []) + ["clarification"]
+    return {
+        "clarification_question": "Could you please provide more details or rephrase your question?",
+        "steps_taken": ["clarification"]
+    }
+
+
+def canned_response_node(state: GraphState) -> Dict[str, Any]:
+    """
+    Answer greetings, closings and questions about the assistant without retrieval or the LLM
+    """
+    logger.info("Executing canned response node")
+
+    return {
+        "answer": CANNED_RESPONSES[state["intent"]],
+        "confidence": 1.0,
+        "steps_taken": ["canned_response"]
+    }
+
+
+# Async variants of the CPU-only nodes. They run inline on the event loop so
+# the async workflow does not pay a thread hop for trivial work.
+
+async def aquery_analysis_node(state: GraphState) -> Dict[str, Any]:
+    """
+    Async query analysis node
+    """
+    return query_analysis_node(state)
+
+
+async def arelevance_check_node(state: GraphState) -> Dict[str, Any]:
+    """
+    Async relevance check node
+    """
+    return relevance_check_node(state)
+
+
+async def aextractive_answer_node(state: GraphState, config: Optional[RunnableConfig] = None) -> Dict[str, Any]:
+    """
+    Async extractive answer node; a streamed answer arrives as a single token
+    """
+    update = extractive_answer_node(state)
+
+    on_token = (config or {}).get("configurable", {}).get("on_token")
+    if on_token is not None and update.get("answer"):
+        await on_token(update["answer"])
+
+    return update
+
+
+async def asource_attribution_node(state: GraphState) -> Dict[str, Any]:
+    """
+    Async source attribution node
+    """
+    return source_attribution_node(state)
+
+
+async def afallback_node(state: GraphState) -> Dict[str, Any]:
+    """
+    Async fallback node
+    """
+    return fallback_node(state)
+
+
+async def aclarification_node(state: GraphState) -> Dict[str, Any]:
+    """
+    Async clarification node
+    """
+    return clarification_node(state)
+
+
+async def acanned_response_node(state: GraphState, config: Optional[RunnableConfig] = None) -> Dict[str, Any]:
+    """
+    Async canned response node; a streamed answer arrives as a single token
+    """
+    update = canned_response_node(state)
+
+    on_token = (config or {}).get("configurable", {}).get("on_token")
+    if on_token is not None:
+        await on_token(update["answer"])
 
-    return state
+    return update
@@ -0,0 +1,91 @@
+import asyncio
+import copy
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_question(question: str) -> str:
+    """
+    Normalize a question for use in cache and coalescing keys
+    """
+    return " ".join(question.lower().split()).rstrip("?!. ")
+
+
+def query_key(question: str, **params: Any) -> Tuple:
+    """
+    Key identifying identical queries: normalized question plus retrieval parameters
+    """
+    return (normalize_question(question), *sorted(params.items()))
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into one execution.
+
+    The first caller for a key starts the work as its own task; callers that
+    arrive while it is in flight wait on that task and receive a deep copy of
+    its result. The shared task is shielded, so a caller that disconnects (or
+    stops waiting) does not cancel the work for everyone else.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]], timeout: Optional[float] = None) -> Any:
+        """
+        Run func for key, or join the execution already in flight.
+
+        A caller joining an execution stops waiting after timeout seconds with
+        asyncio.TimeoutError; the caller that started it always waits it out.
+        """
+        task = self._in_flight.get(key)
+
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._in_flight[key] = task
+            task.add_done_callback(partial(self._forget, key))
+            self.executed += 1
+            return await asyncio.shield(task)
+
+        self.coalesced += 1
+        logger.info(f"Coalescing duplicate in-flight query: {key[0] if isinstance(key, tuple) else key}")
+        result = await asyncio.wait_for(asyncio.shield(task), timeout=timeout)
+        return copy.deepcopy(result)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Mark the exception as retrieved even if every waiter went away
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        """
+        Counters for executed vs coalesced calls
+        """
+        return {
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._in_flight)
+        }
+
+
+# Global coalescer for RAG queries
+_query_coalescer = None
+
+
+def get_query_coalescer() -> SingleFlight:
+    """
+    Get or create the process-wide query coalescer
+    """
+    global _query_coalescer
+
+    if _query_coalescer is None:
+        _query_coalescer = SingleFlight()
+
+    return _query_coalescer
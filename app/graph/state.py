@@ -1,4 +1,5 @@
-from typing import TypedDict, List, Optional
+import operator
+from typing import Annotated, TypedDict, List, Optional
 from pydantic import BaseModel
 
 
@@ -9,11 +10,16 @@ class Document(BaseModel):
     content: str
     metadata: dict
     relevance_score: Optional[float] = None
+    rerank_score: Optional[float] = None
 
 
 class GraphState(TypedDict):
     """
     State object for the LangGraph workflow
+
+    Nodes return only the keys they change. ``steps_taken`` and
+    ``degradations`` are append-only: each node returns its own entries and
+    the graph concatenates.
     """
     # User input
     question: str
@@ -25,8 +31,10 @@ class GraphState(TypedDict):
     # Retrieval
     retrieved_documents: List[Document]
     retrieval_query: Optional[str]
+    query_embedding: Optional[List[float]]
 
     # Analysis
+    intent: Optional[str]
     needs_retrieval: bool
     needs_clarification: bool
     clarification_question: Optional[str]
@@ -39,5 +47,9 @@ class GraphState(TypedDict):
     sources: List[dict]
 
     # Metadata
-    steps_taken: List[str]
+    steps_taken: Annotated[List[str], operator.add]
     error: Optional[str]
+
+    # Latency budget: absolute time.monotonic() deadline, and what was cut to meet it
+    deadline: Optional[float]
+    degradations: Annotated[List[str], operator.add]
@@ -1,85 +1,306 @@
+from langchain_core.runnables import RunnableConfig, RunnableLambda
 from langgraph.graph import StateGraph, END
 from .state import GraphState
+from ..config import get_setting
+from ..metrics import instrument_node, record_degradations, record_route, record_speculation
 from .nodes import (
     query_analysis_node,
     retrieval_node,
+    rerank_node,
     relevance_check_node,
     generation_node,
+    extractive_answer_node,
     source_attribution_node,
     fallback_node,
-    clarification_node
+    clarification_node,
+    canned_response_node,
+    aquery_analysis_node,
+    aretrieval_node,
+    arerank_node,
+    arelevance_check_node,
+    ageneration_node,
+    aextractive_answer_node,
+    asource_attribution_node,
+    afallback_node,
+    aclarification_node,
+    acanned_response_node,
+    INTENT_ROUTER_ENABLED,
+    RERANK_ENABLED,
+    RETRIEVAL_TOP_K
 )
+from .deadline import DEADLINE_EXCEEDED, seconds_left, within_deadline
+from .extractive import is_lookup_question
+from .intent import CANNED_RESPONSES, classify_intent, needs_retrieval
+from .singleflight import get_query_coalescer, query_key
+from ..cache.answer_cache import get_answer_cache
+from ..cache.semantic_cache import get_semantic_cache
+from ..memory.session_store import get_session_store
+from ..retrieval.scores import distance_to_similarity
+from functools import partial
+from typing import AsyncIterator, List, Optional
+import asyncio
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
+EXTRACTIVE_ENABLED = bool(get_setting("extractive.enabled", False))
+EXTRACTIVE_MIN_TOP_SCORE = float(get_setting("extractive.min_top_score", 0.85))
+SPECULATIVE_ENABLED = bool(get_setting("speculative_generation.enabled", False))
+
 
 def should_retrieve(state: GraphState) -> str:
     """
     Conditional edge: determine if retrieval is needed
     """
     if state.get("needs_clarification"):
-        return "clarification"
+        route = "clarification"
+    elif state.get("intent") in CANNED_RESPONSES:
+        route = "canned_response"
     elif state.get("needs_retrieval"):
-        return "retrieval"
+        route = "retrieval"
     else:
-        return "generation"
+        route = "generation"
 
+    return record_route("should_retrieve", route)
 
-def should_generate(state: GraphState) -> str:
+
+def _generation_route(state: GraphState) -> str:
     """
-    Conditional edge: determine if we can generate or need fallback
+    Where a relevance-checked state goes next: generation, extractive answer or fallback
     """
     confidence = state.get("confidence", 0.0)
     threshold = 0.3
 
-    if confidence >= threshold:
-        return "generation"
-    else:
+    if confidence < threshold:
         return "fallback"
+    if EXTRACTIVE_ENABLED and _is_extractive_candidate(state):
+        return "extractive_answer"
+    return "generation"
+
+
+def should_generate(state: GraphState) -> str:
+    """
+    Conditional edge: determine if we can generate or need fallback
+    """
+    return record_route("should_generate", _generation_route(state))
 
 
-def create_workflow() -> StateGraph:
+def _is_extractive_candidate(state: GraphState) -> bool:
+    """
+    Whether the nearest document is similar enough to quote for a lookup question
+    """
+    documents = state.get("retrieved_documents") or []
+    # Scores are vector store distances: the nearest chunk has the smallest
+    top_similarity = max((distance_to_similarity(doc.relevance_score) for doc in documents), default=0.0)
+
+    return top_similarity >= EXTRACTIVE_MIN_TOP_SCORE and is_lookup_question(state["question"])
+
+
+def after_extractive(state: GraphState) -> str:
+    """
+    Conditional edge: cite the extractive answer, or generate one if extraction found nothing
+    """
+    route = "source_attribution" if state.get("answer") else "generation"
+
+    return record_route("after_extractive", route)
+
+
+def after_speculation(state: GraphState) -> str:
+    """
+    Conditional edge: cite a speculative answer that was kept, or route as should_generate does
+    """
+    route = "source_attribution" if state.get("answer") else _generation_route(state)
+
+    return record_route("after_speculation", route)
+
+
+def speculative_generation_node(state: GraphState) -> dict:
+    """
+    Relevance check followed by generation when it passes.
+
+    The sync workflow has nothing to overlap; this keeps it on the same graph
+    shape as the async speculative node.
+    """
+    update = relevance_check_node(state)
+
+    if _generation_route({**state, **update}) == "generation":
+        generated = generation_node(state)
+        update = {**update, **generated, "steps_taken": update["steps_taken"] + generated.get("steps_taken", [])}
+
+    return update
+
+
+async def aspeculative_generation_node(state: GraphState, config: Optional[RunnableConfig] = None) -> dict:
+    """
+    Start generating as soon as documents arrive and check relevance concurrently.
+
+    If the check routes anywhere but generation, the in-flight generation is
+    cancelled and its tokens are counted as wasted. Streamed tokens are held
+    back until the check passes, so clients never see a cancelled answer.
+    Lookups headed for the extractive fast path are not speculated on.
+    """
+    if EXTRACTIVE_ENABLED and _is_extractive_candidate(state):
+        return await arelevance_check_node(state)
+
+    on_token = (config or {}).get("configurable", {}).get("on_token")
+    held: List[str] = []
+    streamed = 0
+    decided = False
+
+    async def relay(token: str) -> None:
+        nonlocal streamed
+        streamed += 1
+        if not decided:
+            held.append(token)
+        elif on_token is not None:
+            await on_token(token)
+
+    # Always stream, so tokens spent on a cancelled generation can be counted
+    generation = asyncio.create_task(ageneration_node(state, {"configurable": {"on_token": relay}}))
+    start = time.perf_counter()
+
+    try:
+        update = await arelevance_check_node(state)
+        check_seconds = time.perf_counter() - start
+
+        if _generation_route({**state, **update}) != "generation":
+            generation.cancel()
+            await asyncio.gather(generation, return_exceptions=True)
+            record_speculation("cancelled", streamed)
+            logger.info(f"Speculative generation cancelled after {streamed} tokens")
+            return update
+
+        # Flush held tokens in order; ones arriving meanwhile join the queue
+        while held:
+            token = held.pop(0)
+            if on_token is not None:
+                await on_token(token)
+        decided = True
+
+        generated = await generation
+        record_speculation("used", streamed, saved_seconds=check_seconds)
+
+        return {**update, **generated, "steps_taken": update["steps_taken"] + generated.get("steps_taken", [])}
+
+    finally:
+        generation.cancel()
+
+
+class NodeRunnable(RunnableLambda):
+    """
+    RunnableLambda with a constant-time repr.
+
+    LangChain serializes the whole graph for callbacks on every invoke, and
+    the stock repr reads and parses each node function's source file to do
+    it, which costs tens of milliseconds per request.
+    """
+
+    def __repr__(self) -> str:
+        return f"NodeRunnable({self.name})"
+
+
+def _add_node(workflow: StateGraph, name: str, func, afunc) -> None:
+    """
+    Register a node with sync and async implementations, both timed
+    """
+    workflow.add_node(
+        name,
+        NodeRunnable(instrument_node(name, func), afunc=instrument_node(name, afunc), name=name)
+    )
+
+
+def create_workflow(speculative: Optional[bool] = None, rerank: Optional[bool] = None) -> StateGraph:
     """
     Create the LangGraph workflow for RAG
+
+    With ``speculative`` (default: speculative_generation.enabled) the
+    relevance check runs concurrently with generation instead of before it.
+    With ``rerank`` (default: retrieval.rerank) a cross-encoder reorders the
+    retrieved documents before the relevance check.
     """
+    if speculative is None:
+        speculative = SPECULATIVE_ENABLED
+    if rerank is None:
+        rerank = RERANK_ENABLED
+
     # Initialize graph
     workflow = StateGraph(GraphState)
 
-    # Add nodes
-    workflow.add_node("query_analysis", query_analysis_node)
-    workflow.add_node("retrieval", retrieval_node)
-    workflow.add_node("relevance_check", relevance_check_node)
-    workflow.add_node("generation", generation_node)
-    workflow.add_node("source_attribution", source_attribution_node)
-    workflow.add_node("fallback", fallback_node)
-    workflow.add_node("clarification", clarification_node)
+    # Add nodes (sync implementation for invoke, async one for ainvoke)
+    _add_node(workflow, "query_analysis", query_analysis_node, aquery_analysis_node)
+    _add_node(workflow, "retrieval", partial(retrieval_node, rerank=rerank), partial(aretrieval_node, rerank=rerank))
+    if rerank:
+        _add_node(workflow, "rerank", rerank_node, arerank_node)
+    if speculative:
+        _add_node(workflow, "speculative_generation", speculative_generation_node, aspeculative_generation_node)
+    else:
+        _add_node(workflow, "relevance_check", relevance_check_node, arelevance_check_node)
+    _add_node(workflow, "generation", generation_node, ageneration_node)
+    _add_node(workflow, "extractive_answer", extractive_answer_node, aextractive_answer_node)
+    _add_node(workflow, "source_attribution", source_attribution_node, asource_attribution_node)
+    _add_node(workflow, "fallback", fallback_node, afallback_node)
+    _add_node(workflow, "clarification", clarification_node, aclarification_node)
+    _add_node(workflow, "canned_response", canned_response_node, acanned_response_node)
 
     # Set entry point
     workflow.set_entry_point("query_analysis")
 
     # Add edges
-    # Query analysis -> retrieval or clarification
+    # Query analysis -> retrieval, clarification, canned response or generation from history
     workflow.add_conditional_edges(
         "query_analysis",
         should_retrieve,
         {
             "retrieval": "retrieval",
             "clarification": "clarification",
+            "canned_response": "canned_response",
             "generation": "generation"
         }
     )
 
-    # Retrieval -> relevance check
-    workflow.add_edge("retrieval", "relevance_check")
+    # Retrieval -> rerank, when enabled
+    if rerank:
+        workflow.add_edge("retrieval", "rerank")
+    retrieved = "rerank" if rerank else "retrieval"
 
-    # Relevance check -> generation or fallback
+    if speculative:
+        # Retrieved documents -> relevance check overlapped with generation
+        workflow.add_edge(retrieved, "speculative_generation")
+
+        # Kept speculative answer -> source attribution; otherwise route as usual
+        workflow.add_conditional_edges(
+            "speculative_generation",
+            after_speculation,
+            {
+                "source_attribution": "source_attribution",
+                "generation": "generation",
+                "extractive_answer": "extractive_answer",
+                "fallback": "fallback"
+            }
+        )
+    else:
+        # Retrieved documents -> relevance check
+        workflow.add_edge(retrieved, "relevance_check")
+
+        # Relevance check -> generation, extractive answer or fallback
+        workflow.add_conditional_edges(
+            "relevance_check",
+            should_generate,
+            {
+                "generation": "generation",
+                "extractive_answer": "extractive_answer",
+                "fallback": "fallback"
+            }
+        )
+
+    # Extractive answer -> source attribution, or generation if nothing matched
     workflow.add_conditional_edges(
-        "relevance_check",
-        should_generate,
+        "extractive_answer",
+        after_extractive,
         {
-            "generation": "generation",
-            "fallback": "fallback"
+            "source_attribution": "source_attribution",
+            "generation": "generation"
         }
     )
 
@@ -93,6 +314,9 @@ def create_workflow() -> StateGraph:
     # Clarification -> END
     workflow.add_edge("clarification", END)
 
+    # Canned response -> END
+    workflow.add_edge("canned_response", END)
+
     return workflow.compile()
 
 
@@ -100,19 +324,24 @@ def create_workflow() -> StateGraph:
 rag_workflow = create_workflow()
 
 
-def run_rag_query(question: str, session_id: str = None) -> dict:
+def _initial_state(
+    question: str,
+    session_id: Optional[str],
+    query_embedding: Optional[List[float]] = None,
+    chat_history: Optional[List[dict]] = None,
+    deadline: Optional[float] = None
+) -> dict:
     """
-    Run a RAG query through the workflow
+    Build the initial workflow state for a question
     """
-    logger.info(f"Running RAG query: {question}")
-
-    # Initialize state
-    initial_state = {
+    return {
         "question": question,
         "session_id": session_id,
-        "chat_history": [],
+        "chat_history": chat_history or [],
         "retrieved_documents": [],
         "retrieval_query": None,
+        "query_embedding": query_embedding,
+        "intent": None,
         "needs_retrieval": False,
         "needs_clarification": False,
         "clarification_question": None,
@@ -120,19 +349,346 @@ def run_rag_query(question: str, session_id: str = None) -> dict:
         "confidence": 0.0,
         "sources": [],
         "steps_taken": [],
-        "error": None
+        "error": None,
+        "deadline": deadline,
+        "degradations": []
+    }
+
+
+def _failed_result(error: Exception) -> dict:
+    """
+    Result returned when the workflow itself raises
+    """
+    logger.error(f"Workflow execution failed: {error}")
+    return {
+        "answer": "An error occurred while processing your question.",
+        "error": str(error),
+        "confidence": 0.0,
+        "sources": []
     }
 
+
+def _load_history(session_id: Optional[str]) -> List[dict]:
+    """
+    Conversation so far for a session, as chat messages
+    """
+    store = get_session_store() if session_id else None
+    return store.get_history(session_id) if store is not None else []
+
+
+def _remember_turn(session_id: Optional[str], question: str, result: dict) -> None:
+    """
+    Add a successfully answered question to the session's memory
+    """
+    store = get_session_store() if session_id else None
+    if store is not None and result is not None and not result.get("error"):
+        store.add_turn(session_id, question, result.get("answer", ""))
+
+
+def run_rag_query(question: str, session_id: str = None, deadline: Optional[float] = None) -> dict:
+    """
+    Run a RAG query through the workflow
+    """
+    logger.info(f"Running RAG query: {question}")
+
+    # Initialize state
+    initial_state = _initial_state(question, session_id, chat_history=_load_history(session_id), deadline=deadline)
+
     # Run workflow
     try:
         result = rag_workflow.invoke(initial_state)
         logger.info(f"Workflow completed. Steps: {result.get('steps_taken')}")
+    except Exception as e:
+        return _failed_result(e)
+
+    record_degradations(result.get("degradations", []))
+
+    _remember_turn(session_id, question, result)
+    return result
+
+
+async def arun_rag_query(
+    question: str,
+    session_id: str = None,
+    query_embedding: Optional[List[float]] = None,
+    chat_history: Optional[List[dict]] = None,
+    deadline: Optional[float] = None
+) -> dict:
+    """
+    Run a RAG query through the workflow without blocking the event loop
+    """
+    logger.info(f"Running async RAG query: {question}")
+
+    initial_state = _initial_state(question, session_id, query_embedding, chat_history, deadline)
+
+    try:
+        result = await rag_workflow.ainvoke(initial_state)
+        logger.info(f"Workflow completed. Steps: {result.get('steps_taken')}")
+        record_degradations(result.get("degradations", []))
         return result
     except Exception as e:
-        logger.error(f"Workflow execution failed: {e}")
+        return _failed_result(e)
+
+
+async def asemantic_rag_query(
+    question: str,
+    session_id: str = None,
+    query_embedding: Optional[List[float]] = None,
+    deadline: Optional[float] = None
+) -> dict:
+    """
+    Run a RAG query behind the semantic answer cache.
+
+    The question is embedded once; the same vector is used for the cache
+    lookup and, on a miss, for retrieval.
+    """
+    cache = get_semantic_cache()
+
+    # Nothing to look up (or embed) for greetings and other trivial intents
+    if INTENT_ROUTER_ENABLED and query_embedding is None and not needs_retrieval(classify_intent(question)):
+        cache = None
+
+    if cache is None:
+        return await arun_rag_query(question, session_id, query_embedding, deadline=deadline)
+
+    from ..retrieval.vector_store import aembed_query, get_corpus_version
+
+    if query_embedding is None:
+        try:
+            query_embedding = await within_deadline(aembed_query(question), deadline)
+        except Exception as e:
+            logger.warning(f"Query embedding for semantic cache failed: {e!r}")
+            return await arun_rag_query(question, session_id, deadline=deadline)
+
+    corpus_version = get_corpus_version()
+
+    cached = cache.lookup(query_embedding, corpus_version)
+    if cached is not None:
+        return cached
+
+    result = await arun_rag_query(question, session_id, query_embedding, deadline=deadline)
+
+    # Only full generated answers are worth reusing, and only for an unchanged corpus
+    if (
+        not result.get("error")
+        and not result.get("degradations")
+        and "generation" in result.get("steps_taken", [])
+        and corpus_version == get_corpus_version()
+    ):
+        cache.add(query_embedding, result, corpus_version)
+
+    return result
+
+
+async def acoalesced_rag_query(
+    question: str,
+    session_id: str = None,
+    query_embedding: Optional[List[float]] = None,
+    deadline: Optional[float] = None
+) -> dict:
+    """
+    Run a RAG query, sharing one execution between identical concurrent queries.
+
+    A shared execution runs to the deadline of the query that started it. A
+    query joining it waits only until its own deadline, then fails as a
+    query that ran out of time with nothing to answer from.
+    """
+    if not get_setting("coalescing.enabled", True):
+        return await asemantic_rag_query(question, session_id, query_embedding, deadline)
+
+    key = query_key(question, k=RETRIEVAL_TOP_K)
+    left = seconds_left(deadline)
+
+    try:
+        return await get_query_coalescer().do(
+            key,
+            lambda: asemantic_rag_query(question, session_id, query_embedding, deadline),
+            timeout=max(left, 0.0) if left is not None else None
+        )
+    except asyncio.TimeoutError:
+        logger.warning(f"Deadline passed waiting for a coalesced query: {question}")
+        degradations = ["coalesced_timeout", DEADLINE_EXCEEDED]
+        record_degradations(degradations)
         return {
-            "answer": "An error occurred while processing your question.",
-            "error": str(e),
+            "answer": "",
+            "error": "Query timed out",
             "confidence": 0.0,
-            "sources": []
+            "sources": [],
+            "degradations": degradations
         }
+
+
+async def acached_rag_query(
+    question: str,
+    session_id: str = None,
+    query_embedding: Optional[List[float]] = None,
+    deadline: Optional[float] = None
+) -> dict:
+    """
+    Serve a standalone query: exact-match answer cache first, then the coalesced workflow
+    """
+    cache = get_answer_cache()
+    if cache is None:
+        return await acoalesced_rag_query(question, session_id, query_embedding, deadline)
+
+    from ..retrieval.vector_store import get_corpus_version
+
+    key = cache.make_key(query_key(question, k=RETRIEVAL_TOP_K), get_corpus_version())
+
+    cached = cache.get(key)
+    if cached is not None:
+        logger.info(f"Answer cache hit: {question}")
+        return cached
+
+    result = await acoalesced_rag_query(question, session_id, query_embedding, deadline)
+
+    # Answers degraded to meet one request's deadline are not reused
+    if not result.get("error") and not result.get("degradations"):
+        cache.set(key, result)
+
+    return result
+
+
+async def aanswer_query(
+    question: str,
+    session_id: str = None,
+    query_embedding: Optional[List[float]] = None,
+    deadline: Optional[float] = None
+) -> dict:
+    """
+    Serve a query within its conversation.
+
+    First questions of a session go through the shared caches. Follow-ups
+    depend on the conversation so far, so they run the workflow with the
+    session's history and are never cached or coalesced with other users.
+    """
+    chat_history = _load_history(session_id)
+
+    if chat_history:
+        result = await arun_rag_query(question, session_id, query_embedding, chat_history, deadline)
+    else:
+        result = await acached_rag_query(question, session_id, query_embedding, deadline)
+
+    _remember_turn(session_id, question, result)
+    return result
+
+
+async def arun_rag_batch(
+    questions: List[str],
+    session_id: str = None,
+    max_concurrency: Optional[int] = None
+) -> List[dict]:
+    """
+    Run many RAG queries with one batched embedding call.
+
+    Workflows (and their similarity searches) run concurrently, at most
+    max_concurrency at a time. Results are returned in input order.
+    """
+    from ..retrieval.vector_store import aembed_queries
+
+    if max_concurrency is None:
+        max_concurrency = int(get_setting("batch.max_concurrency", 8))
+
+    logger.info(f"Running batch of {len(questions)} RAG queries (concurrency={max_concurrency})")
+
+    try:
+        embeddings = await aembed_queries(questions)
+    except Exception as e:
+        # Fall back to per-question embedding inside retrieval
+        logger.warning(f"Batched query embedding failed, embedding individually: {e}")
+        embeddings = [None] * len(questions)
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run_one(question: str, embedding: Optional[List[float]]) -> dict:
+        async with semaphore:
+            # Batch questions are independent; they neither read nor extend session memory
+            return await acached_rag_query(question, session_id, query_embedding=embedding)
+
+    results = await asyncio.gather(
+        *(run_one(question, embedding) for question, embedding in zip(questions, embeddings, strict=True)),
+        return_exceptions=True
+    )
+
+    return [
+        _failed_result(result) if isinstance(result, Exception) else result
+        for result in results
+    ]
+
+
+async def astream_rag_query(
+    question: str,
+    session_id: str = None,
+    deadline: Optional[float] = None
+) -> AsyncIterator[dict]:
+    """
+    Run a RAG query and yield events as the workflow makes progress.
+
+    Yields ``progress`` events (one per completed node), ``token`` events while
+    the answer is generated, and a single ``final`` event carrying the workflow
+    result and timings. Time to first token is reported separately from total
+    latency.
+    """
+    logger.info(f"Running streaming RAG query: {question}")
+
+    start = time.perf_counter()
+    events: asyncio.Queue = asyncio.Queue()
+    initial_state = _initial_state(question, session_id, chat_history=_load_history(session_id), deadline=deadline)
+
+    async def on_token(token: str) -> None:
+        await events.put({"event": "token", "data": {"token": token}})
+
+    async def run_workflow() -> None:
+        result = None
+        try:
+            async for step in rag_workflow.astream(
+                initial_state,
+                config={"configurable": {"on_token": on_token}}
+            ):
+                for node, output in step.items():
+                    if node == END:
+                        result = output
+                    else:
+                        await events.put({"event": "progress", "data": {"node": node}})
+            logger.info(f"Workflow completed. Steps: {result.get('steps_taken')}")
+            record_degradations(result.get("degradations", []))
+        except Exception as e:
+            result = _failed_result(e)
+        await events.put({"event": END, "data": result})
+
+    task = asyncio.create_task(run_workflow())
+    first_token_at = None
+
+    try:
+        while True:
+            event = await events.get()
+            if event["event"] == END:
+                result = event["data"]
+                break
+            if event["event"] == "token" and first_token_at is None:
+                first_token_at = time.perf_counter()
+            yield event
+    finally:
+        # Stop the workflow if the client went away mid-stream
+        task.cancel()
+
+    _remember_turn(session_id, question, result)
+
+    total_ms = (time.perf_counter() - start) * 1000
+    ttft_ms = (first_token_at - start) * 1000 if first_token_at is not None else None
+
+    if ttft_ms is not None:
+        logger.info(f"Streaming query finished: ttft={ttft_ms:.0f}ms total={total_ms:.0f}ms")
+    else:
+        logger.info(f"Streaming query finished without tokens: total={total_ms:.0f}ms")
+
+    yield {
+        "event": "final",
+        "data": {
+            "result": result,
+            "timings": {
+                "time_to_first_token_ms": ttft_ms,
+                "total_ms": total_ms
+            }
+        }
+    }
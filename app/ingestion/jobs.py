@@ -0,0 +1,269 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, Optional
+import logging
+from .chunker import chunk_documents
+from .loader import DocumentLoader, load_sample_documents
+from ..config import get_setting
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+ACTIVE_STATUSES = (PENDING, RUNNING)
+
+
+class IngestJobConflict(Exception):
+    """
+    Raised when a collection already has an ingestion job in progress
+    """
+
+    def __init__(self, job_id: str, collection: str):
+        super().__init__(f"Ingestion job {job_id} is already running for collection '{collection}'")
+        self.job_id = job_id
+        self.collection = collection
+
+
+class IngestCancelled(Exception):
+    """
+    Raised inside a worker when its job has been cancelled
+    """
+
+
+class IngestJob:
+    """
+    Progress and outcome of one background ingestion run
+    """
+
+    def __init__(self, collection: str, docs_directory: str):
+        self.job_id = uuid.uuid4().hex
+        self.collection = collection
+        self.docs_directory = docs_directory
+        self.status = PENDING
+        self.files_total = 0
+        self.files_scanned = 0
+        self.chunks_created = 0
+        self.embeddings_done = 0
+        self.created_at = datetime.now(timezone.utc)
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.error: Optional[str] = None
+        self.message = "Queued"
+
+        self._cancel_event = threading.Event()
+        self._embed_started: Optional[float] = None
+        self._embed_finished: Optional[float] = None
+
+    def check_cancelled(self) -> None:
+        """
+        Raise IngestCancelled if cancellation was requested
+        """
+        if self._cancel_event.is_set():
+            raise IngestCancelled()
+
+    def throughput(self) -> Optional[float]:
+        """
+        Embedded chunks per second since embedding started
+        """
+        if self._embed_started is None or self.embeddings_done == 0:
+            return None
+        elapsed = (self._embed_finished or time.monotonic()) - self._embed_started
+        return self.embeddings_done / elapsed if elapsed > 0 else None
+
+    def eta_seconds(self) -> Optional[float]:
+        """
+        Estimated seconds until all created chunks are embedded
+        """
+        if self.status != RUNNING:
+            return None
+        rate = self.throughput()
+        if not rate:
+            return None
+        return max(self.chunks_created - self.embeddings_done, 0) / rate
+
+    def to_dict(self) -> dict:
+        """
+        Snapshot of the job for the status endpoint
+        """
+        throughput = self.throughput()
+        eta = self.eta_seconds()
+        return {
+            "job_id": self.job_id,
+            "collection": self.collection,
+            "status": self.status,
+            "files_total": self.files_total,
+            "files_scanned": self.files_scanned,
+            "chunks_created": self.chunks_created,
+            "embeddings_done": self.embeddings_done,
+            "throughput_chunks_per_sec": round(throughput, 2) if throughput else None,
+            "eta_seconds": round(eta, 1) if eta is not None else None,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+            "message": self.message
+        }
+
+
+class IngestJobManager:
+    """
+    Runs ingestion jobs on a background worker pool, one active job per collection
+    """
+
+    def __init__(self, max_workers: int = 1, max_finished_jobs: int = 100):
+        self.max_finished_jobs = max_finished_jobs
+        self._jobs: "OrderedDict[str, IngestJob]" = OrderedDict()
+        self._active: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="ingest"
+        )
+
+    def submit(self, collection: str, docs_directory: str = "./sample-docs/technical-docs") -> IngestJob:
+        """
+        Start a background ingestion job, or raise IngestJobConflict
+        """
+        with self._lock:
+            active_id = self._active.get(collection)
+            if active_id is not None:
+                raise IngestJobConflict(active_id, collection)
+
+            job = IngestJob(collection, docs_directory)
+            self._jobs[job.job_id] = job
+            self._active[collection] = job.job_id
+            self._prune_finished()
+
+        logger.info(f"Submitted ingestion job {job.job_id} for collection '{collection}'")
+        self._executor.submit(self._run, job)
+
+        return job
+
+    def get(self, job_id: str) -> Optional[IngestJob]:
+        """
+        Look up a job by id
+        """
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[IngestJob]:
+        """
+        Request cancellation; the worker stops at the next file or batch boundary
+        """
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+
+        if job.status in ACTIVE_STATUSES:
+            logger.info(f"Cancelling ingestion job {job_id}")
+            job._cancel_event.set()
+            job.message = "Cancellation requested"
+
+        return job
+
+    def _prune_finished(self) -> None:
+        finished = [
+            job_id for job_id, job in self._jobs.items()
+            if job.status not in ACTIVE_STATUSES
+        ]
+        for job_id in finished[:max(len(finished) - self.max_finished_jobs, 0)]:
+            del self._jobs[job_id]
+
+    def _finish(self, job: IngestJob, status: str, message: str, error: Optional[str] = None) -> None:
+        if job._embed_started is not None:
+            job._embed_finished = time.monotonic()
+        job.status = status
+        job.message = message
+        job.error = error
+        job.finished_at = datetime.now(timezone.utc)
+
+        with self._lock:
+            if self._active.get(job.collection) == job.job_id:
+                del self._active[job.collection]
+
+    def _run(self, job: IngestJob) -> None:
+        from ..retrieval.vector_store import add_documents
+
+        job.status = RUNNING
+        job.started_at = datetime.now(timezone.utc)
+
+        try:
+            job.check_cancelled()
+
+            # Phase 1: scan and chunk files
+            job.message = "Scanning and chunking files"
+            loader = DocumentLoader(job.docs_directory)
+            files = loader.list_files()
+            job.files_total = len(files)
+
+            chunked_docs = []
+            for path in files:
+                job.check_cancelled()
+                try:
+                    chunks = chunk_documents(loader.load_file(path))
+                    chunked_docs.extend(chunks)
+                    job.chunks_created += len(chunks)
+                except Exception as e:
+                    logger.warning(f"Failed to load {path}: {e}")
+                job.files_scanned += 1
+
+            # If no documents found, use sample documents
+            if not chunked_docs:
+                logger.info("No documents found in directory, using sample documents")
+                chunked_docs = load_sample_documents()
+                job.chunks_created = len(chunked_docs)
+
+            # Phase 2: embed and store in batches
+            job.message = "Embedding chunks"
+            batch_size = int(get_setting("embeddings.batch_size", 100))
+            job._embed_started = time.monotonic()
+
+            for start in range(0, len(chunked_docs), batch_size):
+                job.check_cancelled()
+                batch = chunked_docs[start:start + batch_size]
+                add_documents(batch)
+                job.embeddings_done += len(batch)
+
+            self._finish(
+                job,
+                COMPLETED,
+                f"Successfully ingested {job.embeddings_done} document chunks"
+            )
+            logger.info(f"Ingestion job {job.job_id} completed: {job.message}")
+
+        except IngestCancelled:
+            self._finish(
+                job,
+                CANCELLED,
+                f"Cancelled after embedding {job.embeddings_done} of {job.chunks_created} chunks"
+            )
+            logger.info(f"Ingestion job {job.job_id} cancelled")
+
+        except Exception as e:
+            logger.error(f"Ingestion job {job.job_id} failed: {e}")
+            self._finish(job, FAILED, "Ingestion failed", error=str(e))
+
+
+# Global job manager instance
+_job_manager = None
+
+
+def get_job_manager() -> IngestJobManager:
+    """
+    Get or create the ingestion job manager
+    """
+    global _job_manager
+
+    if _job_manager is None:
+        _job_manager = IngestJobManager(
+            max_workers=int(get_setting("ingestion.max_workers", 1))
+        )
+
+    return _job_manager
@@ -17,9 +17,36 @@ class DocumentLoader:
     Load documents from various formats
     """
 
+    # File extension -> langchain loader class
+    LOADERS = {
+        ".pdf": PyPDFLoader,
+        ".txt": TextLoader,
+        ".md": TextLoader
+    }
+
     def __init__(self, docs_directory: str = "./sample-docs/technical-docs"):
         self.docs_directory = docs_directory
 
+    def list_files(self) -> List[str]:
+        """
+        List supported files under the docs directory
+        """
+        files = []
+        for root, _, names in os.walk(self.docs_directory):
+            for name in sorted(names):
+                if os.path.splitext(name)[1].lower() in self.LOADERS:
+                    files.append(os.path.join(root, name))
+
+        return files
+
+    def load_file(self, path: str) -> List[Document]:
+        """
+        Load a single file with the loader for its extension
+        """
+        loader_cls = self.LOADERS[os.path.splitext(path)[1].lower()]
+
+        return loader_cls(path).load()
+
     def load_directory(self) -> List[Document]:
         """
         Load all documents from directory
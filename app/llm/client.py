@@ -0,0 +1,150 @@
+import os
+import random
+import threading
+from typing import Dict, Optional, Tuple
+import logging
+import httpx
+import openai
+from langchain_core.language_models import BaseChatModel
+from langchain_openai import ChatOpenAI
+from ..config import get_setting
+from ..metrics import llm_token_usage_handler
+from .fake import FakeChatModel, LatencyDistribution
+
+logger = logging.getLogger(__name__)
+
+# Shared OpenAI clients, each owning one pooled keep-alive HTTP client
+_openai_clients: Optional[Tuple[openai.OpenAI, openai.AsyncOpenAI]] = None
+
+# Chat models keyed on (model, temperature, max_tokens)
+_llms: Dict[Tuple, BaseChatModel] = {}
+
+_lock = threading.Lock()
+
+
+def _connection_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=int(get_setting("llm.max_connections", 100)),
+        max_keepalive_connections=int(get_setting("llm.max_keepalive_connections", 20)),
+        keepalive_expiry=float(get_setting("llm.keepalive_expiry_seconds", 30))
+    )
+
+
+def get_openai_clients() -> Tuple[openai.OpenAI, openai.AsyncOpenAI]:
+    """
+    Get or create the process-wide sync and async OpenAI clients.
+
+    Both keep a pool of keep-alive connections, so requests after the first
+    skip the TCP and TLS handshakes. The async pool is bound to the event loop
+    that first uses it, which is the server's loop in production.
+    """
+    global _openai_clients
+
+    if _openai_clients is None:
+        with _lock:
+            if _openai_clients is None:
+                timeout = httpx.Timeout(
+                    float(get_setting("llm.request_timeout_seconds", 60)),
+                    connect=5.0
+                )
+                limits = _connection_limits()
+                params = {
+                    "base_url": get_setting("llm.base_url") or os.getenv("OPENAI_API_BASE"),
+                    "timeout": timeout,
+                    "max_retries": int(get_setting("llm.max_retries", 2))
+                }
+
+                logger.info(f"Creating pooled OpenAI clients (max {limits.max_connections} connections)")
+
+                _openai_clients = (
+                    openai.OpenAI(
+                        http_client=httpx.Client(limits=limits, timeout=timeout),
+                        **params
+                    ),
+                    openai.AsyncOpenAI(
+                        http_client=httpx.AsyncClient(limits=limits, timeout=timeout),
+                        **params
+                    )
+                )
+
+    return _openai_clients
+
+
+def _create_fake_llm(model: str) -> FakeChatModel:
+    """
+    Offline chat model configured from llm.fake
+    """
+    seed = get_setting("llm.fake.seed")
+    rng = random.Random(seed)
+
+    return FakeChatModel(
+        model_name=model,
+        answer_tokens=int(get_setting("llm.fake.answer_tokens", 120)),
+        first_token_latency=LatencyDistribution.from_config(get_setting("llm.fake.first_token_latency"), rng),
+        token_latency=LatencyDistribution.from_config(get_setting("llm.fake.token_latency"), rng),
+        callbacks=[llm_token_usage_handler]
+    )
+
+
+def get_llm(
+    model: Optional[str] = None,
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None
+) -> BaseChatModel:
+    """
+    Get the shared chat model for a configuration, defaulting to config.yaml's llm section.
+
+    Instances are cached per (model, temperature, max_tokens) and all share
+    the pooled OpenAI clients. They hold no per-request state, so they are
+    safe to use from concurrent tasks and threads. With ``llm.backend: fake``
+    they are offline FakeChatModel instances instead.
+    """
+    key = (
+        model or get_setting("llm.model", "gpt-4-turbo-preview"),
+        float(get_setting("llm.temperature", 0.1) if temperature is None else temperature),
+        max_tokens if max_tokens is not None else get_setting("llm.max_tokens")
+    )
+
+    llm = _llms.get(key)
+    if llm is None and get_setting("llm.backend", "openai") == "fake":
+        with _lock:
+            llm = _llms.get(key)
+            if llm is None:
+                logger.info(f"Creating fake LLM for {key[0]} (llm.backend=fake)")
+                llm = _llms[key] = _create_fake_llm(key[0])
+
+    if llm is None:
+        sync_client, async_client = get_openai_clients()
+
+        with _lock:
+            llm = _llms.get(key)
+            if llm is None:
+                logger.info(f"Creating shared LLM client for {key[0]} (temperature={key[1]}, max_tokens={key[2]})")
+                llm = ChatOpenAI(
+                    model=key[0],
+                    temperature=key[1],
+                    max_tokens=key[2],
+                    client=sync_client.chat.completions,
+                    async_client=async_client.chat.completions,
+                    callbacks=[llm_token_usage_handler]
+                )
+                _llms[key] = llm
+
+    return llm
+
+
+async def aclose_llm_clients() -> None:
+    """
+    Close the pooled connections; called on application shutdown
+    """
+    global _openai_clients
+
+    with _lock:
+        clients, _openai_clients = _openai_clients, None
+        _llms.clear()
+
+    if clients is not None:
+        sync_client, async_client = clients
+        sync_client.close()
+        await async_client.close()
+        logger.info("Closed pooled OpenAI clients")
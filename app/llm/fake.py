@@ -0,0 +1,177 @@
+import asyncio
+import hashlib
+import math
+import random
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+import logging
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+logger = logging.getLogger(__name__)
+
+DISTRIBUTIONS = ("constant", "uniform", "normal", "lognormal", "exponential")
+
+
+class LatencyDistribution:
+    """
+    Random latency in seconds, configured as a distribution with a mean and stddev in ms.
+
+    ``uniform`` spans mean ± stddev·√3; ``normal`` is clipped at zero;
+    ``lognormal`` is parameterized to have the given mean and stddev;
+    ``exponential`` ignores stddev.
+    """
+
+    def __init__(
+        self,
+        distribution: str = "constant",
+        mean_ms: float = 0.0,
+        stddev_ms: float = 0.0,
+        rng: Optional[random.Random] = None
+    ):
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution {distribution!r}; expected one of {DISTRIBUTIONS}")
+
+        self.distribution = distribution
+        self.mean = mean_ms / 1000
+        self.stddev = stddev_ms / 1000
+        self.rng = rng or random.Random()
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]], rng: Optional[random.Random] = None) -> "LatencyDistribution":
+        """
+        Build from a config mapping with distribution, mean_ms and stddev_ms keys
+        """
+        config = config or {}
+        return cls(
+            config.get("distribution", "constant"),
+            float(config.get("mean_ms", 0.0)),
+            float(config.get("stddev_ms", 0.0)),
+            rng
+        )
+
+    def sample(self) -> float:
+        if self.mean <= 0:
+            return 0.0
+        if self.distribution == "uniform":
+            spread = self.stddev * math.sqrt(3)
+            return max(0.0, self.rng.uniform(self.mean - spread, self.mean + spread))
+        if self.distribution == "normal":
+            return max(0.0, self.rng.gauss(self.mean, self.stddev))
+        if self.distribution == "lognormal":
+            sigma = math.sqrt(math.log(1 + (self.stddev / self.mean) ** 2))
+            return self.rng.lognormvariate(math.log(self.mean) - sigma ** 2 / 2, sigma)
+        if self.distribution == "exponential":
+            return self.rng.expovariate(1 / self.mean)
+        return self.mean
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Offline chat model for load tests and profiling.
+
+    Answers are deterministic for a given prompt: ``answer_tokens`` words
+    drawn from the last message (so they echo the retrieved context). Timing
+    follows the configured distributions: one draw for the time to first
+    token, then one per token, both when streaming and when not.
+    """
+
+    model_name: str = "fake"
+    answer_tokens: int = 120
+    first_token_latency: Any = None
+    token_latency: Any = None
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.first_token_latency = self.first_token_latency or LatencyDistribution()
+        self.token_latency = self.token_latency or LatencyDistribution()
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model_name": self.model_name, "answer_tokens": self.answer_tokens}
+
+    def _tokens(self, messages: List[BaseMessage]) -> List[str]:
+        prompt = str(messages[-1].content) if messages else ""
+        words = prompt.split() or ["answer"]
+
+        # Same prompt, same answer
+        seed = int.from_bytes(hashlib.blake2b(prompt.encode(), digest_size=8).digest(), "big")
+        start = seed % len(words)
+
+        return [
+            ("" if i == 0 else " ") + words[(start + i) % len(words)]
+            for i in range(self.answer_tokens)
+        ]
+
+    def _result(self, messages: List[BaseMessage], tokens: List[str]) -> ChatResult:
+        prompt_chars = sum(len(str(message.content)) for message in messages)
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content="".join(tokens)))],
+            llm_output={
+                "model_name": self.model_name,
+                "token_usage": {"prompt_tokens": prompt_chars // 4, "completion_tokens": len(tokens)}
+            }
+        )
+
+    def _delays(self, count: int) -> Iterator[float]:
+        for i in range(count):
+            yield self.first_token_latency.sample() if i == 0 else self.token_latency.sample()
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        tokens = self._tokens(messages)
+        time.sleep(sum(self._delays(len(tokens))))
+        return self._result(messages, tokens)
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        tokens = self._tokens(messages)
+        await asyncio.sleep(sum(self._delays(len(tokens))))
+        return self._result(messages, tokens)
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> Iterator[ChatGenerationChunk]:
+        tokens = self._tokens(messages)
+        for token, delay in zip(tokens, self._delays(len(tokens)), strict=True):
+            time.sleep(delay)
+            if run_manager:
+                run_manager.on_llm_new_token(token)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        tokens = self._tokens(messages)
+        for token, delay in zip(tokens, self._delays(len(tokens)), strict=True):
+            await asyncio.sleep(delay)
+            if run_manager:
+                await run_manager.on_llm_new_token(token)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
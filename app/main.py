@@ -1,10 +1,10 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
 import logging
 from datetime import datetime
 
 from .api.routes import router as api_router
+from .metrics import RequestMetricsMiddleware
 from .api.schemas import QueryRequest, QueryResponse
 
 # Configure logging
@@ -30,6 +30,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request latency and status metrics for /metrics
+app.add_middleware(RequestMetricsMiddleware)
+
 # Include API routes
 app.include_router(api_router)
 
@@ -84,6 +87,9 @@ async def shutdown_event():
     """
     logger.info("Shutting down LangGraph RAG Assistant API")
 
+    from .llm.client import aclose_llm_clients
+    await aclose_llm_clients()
+
 
 if __name__ == "__main__":
     import uvicorn
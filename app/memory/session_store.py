@@ -0,0 +1,411 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Deque, List, Optional, Set, Tuple
+import logging
+from ..config import get_setting
+from ..graph.context import count_tokens, truncate_to_tokens
+
+logger = logging.getLogger(__name__)
+
+# Rough per-session bookkeeping cost on top of the stored text
+SESSION_OVERHEAD_BYTES = 512
+
+SUMMARY_PROMPT = """You maintain a running summary of a conversation between a user and a
+technical documentation assistant. Merge the existing summary with the new turns.
+Keep facts, names, versions and open questions the user may refer back to.
+Reply with the summary only, in at most {max_tokens} tokens."""
+
+# (question, answer, tokens)
+Turn = Tuple[str, str, int]
+
+
+class SessionMemory:
+    """
+    One session's history: a capped ring of recent turns plus a running summary.
+
+    Turns pushed out of the ring wait in ``pending`` until they are folded
+    into the summary, so nothing drops out of the prompt while a background
+    summarization is in flight.
+    """
+
+    __slots__ = ("turns", "pending", "summary", "tokens", "size_bytes", "last_access", "summarizing")
+
+    def __init__(self, summary: str = "", turns: Optional[List[Turn]] = None, pending: Optional[List[Turn]] = None):
+        self.turns: Deque[Turn] = deque(turns or [])
+        self.pending: List[Turn] = list(pending or [])
+        self.summary = summary
+        self.tokens = sum(turn[2] for turn in self.turns)
+        self.size_bytes = 0
+        self.last_access = time.time()
+        self.summarizing = False
+        self._measure()
+
+    def _measure(self) -> None:
+        text = sum(len(q) + len(a) for q, a, _ in self.turns) + sum(len(q) + len(a) for q, a, _ in self.pending)
+        self.size_bytes = SESSION_OVERHEAD_BYTES + len(self.summary) + text
+
+    def to_messages(self) -> List[dict]:
+        messages = []
+        if self.summary:
+            messages.append({"role": "system", "content": f"Summary of the earlier conversation:\n{self.summary}"})
+        for question, answer, _ in (*self.pending, *self.turns):
+            messages.append({"role": "user", "content": question})
+            messages.append({"role": "assistant", "content": answer})
+        return messages
+
+
+class SQLiteSessionBackend:
+    """
+    Durable session storage; the in-memory store acts as an LRU cache in front of it
+    """
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._writes = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " session_id TEXT PRIMARY KEY,"
+            " summary TEXT NOT NULL,"
+            " turns TEXT NOT NULL,"
+            " pending TEXT NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS sessions_updated ON sessions(updated_at)")
+
+        logger.info(f"Opened session store at {path}")
+
+    def load(self, session_id: str, not_before: float) -> Optional[SessionMemory]:
+        """
+        Load a session updated since not_before
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT summary, turns, pending FROM sessions WHERE session_id = ? AND updated_at >= ?",
+                (session_id, not_before)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        return SessionMemory(
+            summary=row[0],
+            turns=[tuple(turn) for turn in json.loads(row[1])],
+            pending=[tuple(turn) for turn in json.loads(row[2])]
+        )
+
+    def save(self, session_id: str, memory: SessionMemory, expire_before: float) -> None:
+        """
+        Write a session through, occasionally purging expired ones
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, summary, turns, pending, updated_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (
+                    session_id,
+                    memory.summary,
+                    json.dumps(list(memory.turns)),
+                    json.dumps(memory.pending),
+                    time.time()
+                )
+            )
+            self._writes += 1
+            if self._writes % 1000 == 0:
+                self._conn.execute("DELETE FROM sessions WHERE updated_at < ?", (expire_before,))
+
+    def delete(self, session_id: str) -> None:
+        """
+        Remove a session
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+
+class SessionStore:
+    """
+    Bounded per-session conversation memory.
+
+    Each session keeps at most max_turns recent turns and max_history_tokens
+    of turn text; older turns are summarized in the background into a
+    summary capped at max_summary_tokens. Idle sessions are evicted in LRU
+    order once the store exceeds max_sessions or max_bytes, or after
+    idle_ttl_seconds. With a SQLite backend every change is written through,
+    so evicted sessions are reloaded on their next turn.
+    """
+
+    def __init__(
+        self,
+        max_turns: int,
+        max_history_tokens: int,
+        max_summary_tokens: int,
+        max_sessions: int,
+        max_bytes: int,
+        idle_ttl_seconds: float,
+        summarize_with_llm: bool = True,
+        backend: Optional[SQLiteSessionBackend] = None
+    ):
+        self.max_turns = max_turns
+        self.max_history_tokens = max_history_tokens
+        self.max_summary_tokens = max_summary_tokens
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.summarize_with_llm = summarize_with_llm
+        self.backend = backend
+
+        self.size_bytes = 0
+        self._sessions: "OrderedDict[str, SessionMemory]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._tasks: Set[asyncio.Task] = set()
+
+        self.evictions = 0
+        self.expirations = 0
+        self.summaries = 0
+        self.summary_failures = 0
+
+    def _get(self, session_id: str) -> Optional[SessionMemory]:
+        now = time.time()
+        memory = self._sessions.get(session_id)
+
+        if memory is not None and now - memory.last_access > self.idle_ttl_seconds:
+            self._drop(session_id)
+            self.expirations += 1
+            memory = None
+
+        if memory is None and self.backend is not None:
+            memory = self.backend.load(session_id, now - self.idle_ttl_seconds)
+            if memory is not None:
+                self._sessions[session_id] = memory
+                self.size_bytes += memory.size_bytes
+
+        if memory is not None:
+            memory.last_access = now
+            self._sessions.move_to_end(session_id)
+
+        return memory
+
+    def _drop(self, session_id: str) -> None:
+        memory = self._sessions.pop(session_id, None)
+        if memory is not None:
+            self.size_bytes -= memory.size_bytes
+
+    def _evict(self) -> None:
+        now = time.time()
+        while self._sessions:
+            session_id, oldest = next(iter(self._sessions.items()))
+            idle = now - oldest.last_access > self.idle_ttl_seconds
+            within_limits = len(self._sessions) <= self.max_sessions and self.size_bytes <= self.max_bytes
+            # Never evict the only live session, however large
+            if not idle and (within_limits or len(self._sessions) == 1):
+                break
+            self._drop(session_id)
+            if idle:
+                self.expirations += 1
+            else:
+                self.evictions += 1
+
+    def _resize(self, memory: SessionMemory) -> None:
+        before = memory.size_bytes
+        memory._measure()
+        self.size_bytes += memory.size_bytes - before
+
+    def _persist(self, session_id: str, memory: SessionMemory) -> None:
+        if self.backend is not None:
+            try:
+                self.backend.save(session_id, memory, time.time() - self.idle_ttl_seconds)
+            except Exception as e:
+                logger.error(f"Failed to persist session {session_id}: {e}")
+
+    def get_history(self, session_id: str) -> List[dict]:
+        """
+        Chat messages for the session: summary first, then recent turns
+        """
+        with self._lock:
+            memory = self._get(session_id)
+            return memory.to_messages() if memory is not None else []
+
+    def add_turn(self, session_id: str, question: str, answer: str) -> None:
+        """
+        Record a completed turn and summarize overflow in the background
+        """
+        tokens = count_tokens(question) + count_tokens(answer)
+
+        with self._lock:
+            memory = self._get(session_id)
+            if memory is None:
+                memory = SessionMemory()
+                self._sessions[session_id] = memory
+                self.size_bytes += memory.size_bytes
+
+            memory.turns.append((question, answer, tokens))
+            memory.tokens += tokens
+
+            # Keep at least the latest turn even if it alone exceeds the token cap
+            while len(memory.turns) > 1 and (
+                len(memory.turns) > self.max_turns or memory.tokens > self.max_history_tokens
+            ):
+                evicted = memory.turns.popleft()
+                memory.tokens -= evicted[2]
+                memory.pending.append(evicted)
+
+            self._resize(memory)
+            self._evict()
+            self._persist(session_id, memory)
+
+            needs_summary = bool(memory.pending) and not memory.summarizing
+            if needs_summary:
+                memory.summarizing = True
+
+        if needs_summary:
+            self._schedule_summary(session_id)
+
+    def _schedule_summary(self, session_id: str) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Sync callers get the cheap extractive summary inline
+            self._apply_summary(session_id, self._compact_summary(*self._summary_input(session_id)))
+            return
+
+        task = loop.create_task(self.asummarize(session_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _summary_input(self, session_id: str) -> Tuple[str, List[Turn]]:
+        with self._lock:
+            memory = self._sessions.get(session_id)
+            if memory is None:
+                return "", []
+            return memory.summary, list(memory.pending)
+
+    def _compact_summary(self, summary: str, turns: List[Turn]) -> str:
+        """
+        Extractive fallback: previous summary plus the turns, keeping the most recent text
+        """
+        transcript = "\n".join([summary] + [f"Q: {q}\nA: {a}" for q, a, _ in turns]).strip()
+        if count_tokens(transcript) <= self.max_summary_tokens:
+            return transcript
+
+        # Keep the tail, which holds the latest context
+        return truncate_to_tokens(transcript, self.max_summary_tokens, keep_end=True)
+
+    async def asummarize(self, session_id: str) -> None:
+        """
+        Fold pending turns into the session summary
+        """
+        summary, turns = self._summary_input(session_id)
+        if not turns:
+            self._apply_summary(session_id, summary, folded=0)
+            return
+
+        new_summary = None
+        if self.summarize_with_llm:
+            try:
+                from ..llm.client import get_llm
+
+                llm = get_llm(temperature=0.0, max_tokens=self.max_summary_tokens)
+                transcript = "\n".join(f"User: {q}\nAssistant: {a}" for q, a, _ in turns)
+                response = await llm.ainvoke([
+                    {"role": "system", "content": SUMMARY_PROMPT.format(max_tokens=self.max_summary_tokens)},
+                    {"role": "user", "content": f"Existing summary:\n{summary or '(none)'}\n\nNew turns:\n{transcript}"}
+                ])
+                new_summary = truncate_to_tokens(response.content.strip(), self.max_summary_tokens)
+            except Exception as e:
+                logger.warning(f"Session summarization failed, compacting instead: {e}")
+                self.summary_failures += 1
+
+        if new_summary is None:
+            new_summary = self._compact_summary(summary, turns)
+
+        self._apply_summary(session_id, new_summary, folded=len(turns))
+
+    def _apply_summary(self, session_id: str, summary: str, folded: Optional[int] = None) -> None:
+        with self._lock:
+            memory = self._sessions.get(session_id)
+            if memory is None:
+                return
+
+            if folded is None:
+                folded = len(memory.pending)
+
+            # Turns may have been added to pending while summarizing; keep those
+            memory.pending = memory.pending[folded:]
+            memory.summary = summary
+            memory.summarizing = False
+            if folded:
+                self.summaries += 1
+
+            self._resize(memory)
+            self._persist(session_id, memory)
+
+            again = bool(memory.pending)
+            if again:
+                memory.summarizing = True
+
+        if again:
+            self._schedule_summary(session_id)
+
+    def clear(self, session_id: str) -> None:
+        """
+        Forget a session
+        """
+        with self._lock:
+            self._drop(session_id)
+        if self.backend is not None:
+            self.backend.delete(session_id)
+
+    def stats(self) -> dict:
+        """
+        Footprint and eviction metrics
+        """
+        return {
+            "sessions": len(self._sessions),
+            "size_bytes": self.size_bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "summaries": self.summaries,
+            "summary_failures": self.summary_failures
+        }
+
+
+# Global session store instance
+_session_store = None
+
+
+def get_session_store() -> Optional[SessionStore]:
+    """
+    Get or create the session store, or None when disabled in config
+    """
+    global _session_store
+
+    if _session_store is None and get_setting("memory.enabled", True):
+        backend = None
+        if get_setting("memory.backend", "memory") == "sqlite":
+            backend = SQLiteSessionBackend(get_setting("memory.path", "./data/sessions.sqlite"))
+
+        _session_store = SessionStore(
+            max_turns=int(get_setting("conversation.max_history_turns", 10)),
+            max_history_tokens=int(get_setting("memory.max_history_tokens", 1000)),
+            max_summary_tokens=int(get_setting("memory.max_summary_tokens", 300)),
+            max_sessions=int(get_setting("memory.max_sessions", 10000)),
+            max_bytes=int(get_setting("memory.max_bytes", 64 * 1024 * 1024)),
+            idle_ttl_seconds=float(get_setting("memory.idle_ttl_seconds", 3600)),
+            summarize_with_llm=bool(get_setting("memory.summarize_with_llm", True)),
+            backend=backend
+        )
+
+    return _session_store
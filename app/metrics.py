@@ -0,0 +1,269 @@
+import functools
+import inspect
+import time
+from typing import Any, Callable, Dict, List, Optional
+import logging
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.embeddings import Embeddings
+from prometheus_client import Counter, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+logger = logging.getLogger(__name__)
+
+# Spans in-process work (ms) up to slow LLM calls (tens of seconds)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+NODE_LATENCY = Histogram(
+    "rag_node_duration_seconds",
+    "Time spent in each workflow node",
+    ["node"],
+    buckets=LATENCY_BUCKETS
+)
+
+ROUTE_DECISIONS = Counter(
+    "rag_route_decisions_total",
+    "Branch taken at each conditional edge of the workflow",
+    ["edge", "route"]
+)
+
+EMBEDDING_LATENCY = Histogram(
+    "rag_embedding_duration_seconds",
+    "Time spent in embedding model calls",
+    ["operation"],
+    buckets=LATENCY_BUCKETS
+)
+
+EMBEDDED_TEXTS = Counter(
+    "rag_embedded_texts_total",
+    "Texts sent to the embedding model",
+    ["operation"]
+)
+
+VECTOR_SEARCH_LATENCY = Histogram(
+    "rag_vector_search_duration_seconds",
+    "Time spent in vector store searches; text searches include query embedding",
+    ["method"],
+    buckets=LATENCY_BUCKETS
+)
+
+LLM_TOKENS = Counter(
+    "rag_llm_tokens_total",
+    "Tokens consumed by LLM calls",
+    ["type"]
+)
+
+CONTEXT_TOKENS = Histogram(
+    "rag_context_tokens",
+    "Tokens of retrieved context packed into each generation prompt",
+    buckets=(0, 250, 500, 1000, 1500, 2000, 3000, 4000, 6000, 8000, 16000)
+)
+
+SPECULATIVE_GENERATIONS = Counter(
+    "rag_speculative_generations_total",
+    "Speculative generations by outcome: used, or cancelled by the relevance check",
+    ["outcome"]
+)
+
+SPECULATIVE_TOKENS = Counter(
+    "rag_speculative_tokens_total",
+    "Completion tokens produced by speculative generations; cancelled ones are wasted",
+    ["outcome"]
+)
+
+SPECULATIVE_SAVED = Histogram(
+    "rag_speculative_saved_seconds",
+    "Relevance check time taken off the critical path by used speculative generations",
+    buckets=LATENCY_BUCKETS
+)
+
+DEADLINE_DEGRADATIONS = Counter(
+    "rag_deadline_degradations_total",
+    "Workflow steps cut short to meet request deadlines",
+    ["degradation"]
+)
+
+ADMISSION_WAIT = Histogram(
+    "rag_admission_wait_seconds",
+    "Time admitted queries spent queued for a slot",
+    buckets=LATENCY_BUCKETS
+)
+
+REQUEST_LATENCY = Histogram(
+    "rag_http_request_duration_seconds",
+    "End-to-end HTTP request latency, including streamed bodies",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS
+)
+
+REQUESTS = Counter(
+    "rag_http_requests_total",
+    "HTTP requests by route and status code",
+    ["method", "route", "status"]
+)
+
+
+def instrument_node(name: str, func: Callable) -> Callable:
+    """
+    Wrap a sync or async graph node so its run time lands in NODE_LATENCY
+    """
+    histogram = NODE_LATENCY.labels(node=name)
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start)
+
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            histogram.observe(time.perf_counter() - start)
+
+    return wrapper
+
+
+def record_route(edge: str, route: str) -> str:
+    """
+    Count a conditional-edge decision and pass the route through
+    """
+    ROUTE_DECISIONS.labels(edge=edge, route=route).inc()
+    return route
+
+
+def record_speculation(outcome: str, tokens: int, saved_seconds: Optional[float] = None) -> None:
+    """
+    Count a speculative generation, its tokens and (when used) the latency it saved
+    """
+    SPECULATIVE_GENERATIONS.labels(outcome=outcome).inc()
+    SPECULATIVE_TOKENS.labels(outcome=outcome).inc(tokens)
+    if saved_seconds is not None:
+        SPECULATIVE_SAVED.observe(saved_seconds)
+
+
+def record_degradations(degradations: List[str]) -> None:
+    """
+    Count the deadline-driven degradations of a workflow run
+    """
+    for degradation in degradations:
+        DEADLINE_DEGRADATIONS.labels(degradation=degradation).inc()
+
+
+class InstrumentedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that times every call, including those Chroma makes internally
+    """
+
+    def __init__(self, embeddings: Embeddings):
+        self.embeddings = embeddings
+        self._query_latency = EMBEDDING_LATENCY.labels(operation="query")
+        self._documents_latency = EMBEDDING_LATENCY.labels(operation="documents")
+
+    def embed_query(self, text: str) -> List[float]:
+        EMBEDDED_TEXTS.labels(operation="query").inc()
+        with self._query_latency.time():
+            return self.embeddings.embed_query(text)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        EMBEDDED_TEXTS.labels(operation="documents").inc(len(texts))
+        with self._documents_latency.time():
+            return self.embeddings.embed_documents(texts)
+
+
+class LLMTokenUsageHandler(BaseCallbackHandler):
+    """
+    Count LLM tokens: usage reported by the API, or one per streamed chunk
+    """
+
+    # Counter updates are cheap; skip the executor hop for async runs
+    run_inline = True
+
+    def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        LLM_TOKENS.labels(type="completion").inc()
+
+    def on_llm_end(self, response, **kwargs: Any) -> None:
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        if usage.get("prompt_tokens"):
+            LLM_TOKENS.labels(type="prompt").inc(usage["prompt_tokens"])
+        if usage.get("completion_tokens"):
+            LLM_TOKENS.labels(type="completion").inc(usage["completion_tokens"])
+
+
+# Shared handler attached to LLM clients
+llm_token_usage_handler = LLMTokenUsageHandler()
+
+
+class ServingStatsCollector:
+    """
+    Export the serving layer's stats() dictionaries at scrape time.
+
+    Each numeric field of each section becomes ``rag_<section>_<field>``;
+    monotonic fields are exported as counters, the rest as gauges.
+    """
+
+    COUNTER_FIELDS = {
+        "hits", "disk_hits", "misses", "evictions", "expirations", "resets", "llm_calls_avoided",
+        "executed", "coalesced", "admitted", "rejected_queue_full", "rejected_timeout",
+        "summaries", "summary_failures"
+    }
+
+    def __init__(self, stats_func: Callable[[], Dict[str, dict]]):
+        self.stats_func = stats_func
+
+    def describe(self):
+        # Names depend on runtime stats; don't collect at registration time
+        return []
+
+    def collect(self):
+        for section, stats in self.stats_func().items():
+            for field, value in (stats or {}).items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+
+                name = f"rag_{section}_{field}"
+                documentation = f"{section} {field.replace('_', ' ')}"
+                if field in self.COUNTER_FIELDS:
+                    yield CounterMetricFamily(name, documentation, value=value)
+                else:
+                    yield GaugeMetricFamily(name, documentation, value=value)
+
+
+class RequestMetricsMiddleware:
+    """
+    ASGI middleware recording request latency and status per route template.
+
+    Latency is measured until the last body chunk is sent, so streamed
+    responses are timed end to end. Unmatched paths share one label value.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            REQUEST_LATENCY.labels(method=scope["method"], route=path).observe(time.perf_counter() - start)
+            REQUESTS.labels(method=scope["method"], route=path, status=str(status)).inc()
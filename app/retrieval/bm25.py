@@ -0,0 +1,208 @@
+import json
+import math
+import os
+import re
+import threading
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+import numpy as np
+from .text import STOPWORDS, stem
+from .topk import top_k_indices
+
+logger = logging.getLogger(__name__)
+
+# CLI flags ("--no-cache"), identifiers ("ERR_CONN_RESET", "docker-compose.yml") and words
+TOKEN_PATTERN = re.compile(r"--?[a-z0-9][\w\-]*|\w[\w\-\.]*")
+COMPOUND_SPLIT = re.compile(r"[\-\._]+")
+
+# Terms in more than 1/8 of the chunks are "common": their postings are only
+# scanned in full when the rarer terms cannot settle the top k on their own
+DENSE_SCORING_RATIO = 8
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    BM25 terms of a text.
+
+    Flags, error codes and dotted or dashed identifiers are kept whole so they
+    match exactly, and their parts are indexed too; plain words are lightly
+    stemmed and stopwords dropped.
+    """
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        token = token.rstrip(".-")
+        if not token or token in STOPWORDS:
+            continue
+        if token.isalpha():
+            tokens.append(stem(token))
+            continue
+
+        tokens.append(token)
+        parts = [part for part in COMPOUND_SPLIT.split(token) if part and part not in STOPWORDS]
+        if len(parts) > 1:
+            tokens.extend(stem(part) if part.isalpha() else part for part in parts)
+    return tokens
+
+
+class BM25Index:
+    """
+    In-process BM25 inverted index over the chunks in the vector store.
+
+    Postings are compact per-term arrays of chunk numbers and term
+    frequencies, appended to as chunks are added. A search only touches the
+    postings of the query's terms and scores them with numpy, so its cost
+    grows with how common the terms are rather than with the corpus size.
+    Added chunks are appended to a log file, which is replayed on startup.
+    """
+
+    def __init__(self, path: Optional[str] = None, k1: float = 1.2, b: float = 0.75):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+
+        self._term_ids: Dict[str, int] = {}
+        self._postings_docs: List[array] = []
+        self._postings_tfs: List[array] = []
+        self._doc_ids: List[str] = []
+        self._doc_lengths = array("f")
+        self._total_length = 0.0
+        self._norms: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+        if path and os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    doc_id, counts = json.loads(line)
+                    self._add_counts(doc_id, counts)
+            logger.info(f"Loaded BM25 index of {len(self._doc_ids)} chunks from {path}")
+
+    def __len__(self) -> int:
+        return len(self._doc_ids)
+
+    def _add_counts(self, doc_id: str, counts: Dict[str, int]) -> None:
+        doc = len(self._doc_ids)
+        self._doc_ids.append(doc_id)
+
+        length = 0
+        for term, tf in counts.items():
+            term_id = self._term_ids.get(term)
+            if term_id is None:
+                term_id = self._term_ids[term] = len(self._postings_docs)
+                self._postings_docs.append(array("i"))
+                self._postings_tfs.append(array("f"))
+            self._postings_docs[term_id].append(doc)
+            self._postings_tfs[term_id].append(tf)
+            length += tf
+
+        self._doc_lengths.append(length)
+        self._total_length += length
+
+    def add(self, doc_ids: List[str], texts: Iterable[str]) -> None:
+        """
+        Index newly added chunks under their vector store ids
+        """
+        entries = list(zip(doc_ids, [dict(Counter(tokenize(text))) for text in texts], strict=True))
+
+        with self._lock:
+            for doc_id, doc_counts in entries:
+                self._add_counts(doc_id, doc_counts)
+
+            if self.path:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                with open(self.path, "a") as f:
+                    f.writelines(json.dumps([doc_id, doc_counts]) + "\n" for doc_id, doc_counts in entries)
+
+    def _length_norms(self) -> np.ndarray:
+        # k1 * (1 - b + b * length / average length) per chunk; changes whenever chunks are added
+        n = len(self._doc_ids)
+        if self._norms is None or len(self._norms) != n:
+            lengths = np.frombuffer(self._doc_lengths, dtype=np.float32)
+            self._norms = self.k1 * (1 - self.b + self.b * lengths / (self._total_length / n))
+            del lengths
+        return self._norms
+
+    def _idf(self, n: int, df: int) -> float:
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    @staticmethod
+    def _top(scores: np.ndarray, k: int) -> np.ndarray:
+        top = top_k_indices(scores, k)
+        return top[scores[top] > 0]
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[str, float]]:
+        """
+        Top-k (vector store id, BM25 score) for a query, best first.
+
+        Chunks containing a rare query term are scored first, adding the
+        common terms' contributions for just those chunks. Any other chunk
+        scores at most the common terms' combined upper bound, so the
+        candidates beating it are the exact head of the ranking and are
+        returned without scanning the long posting lists. Chunks matching
+        only common terms then add next to nothing, and are left out. When no
+        candidate beats the bound, every posting is scored.
+        """
+        terms = []
+
+        with self._lock:
+            n = len(self._doc_ids)
+            if n == 0:
+                return []
+            norms = self._length_norms()
+            doc_ids = self._doc_ids
+
+            # Copies of the postings, so indexing can keep appending to the arrays
+            for term in set(tokenize(query)):
+                term_id = self._term_ids.get(term)
+                if term_id is not None:
+                    terms.append((
+                        np.array(self._postings_docs[term_id], dtype=np.int32),
+                        np.array(self._postings_tfs[term_id], dtype=np.float32)
+                    ))
+
+        if not terms:
+            return []
+
+        def contribution(idf: float, tfs: np.ndarray, docs: np.ndarray) -> np.ndarray:
+            # idf * tf * (k1 + 1) / (tf + norm), computed in place
+            result = norms[docs]
+            result += tfs
+            np.divide(tfs, result, out=result)
+            result *= idf * (self.k1 + 1)
+            return result
+
+        rare = [(docs, tfs) for docs, tfs in terms if len(docs) * DENSE_SCORING_RATIO <= n]
+        common = [(docs, tfs) for docs, tfs in terms if len(docs) * DENSE_SCORING_RATIO > n]
+
+        if rare:
+            candidates, positions = np.unique(np.concatenate([docs for docs, _ in rare]), return_inverse=True)
+            scores = np.bincount(positions, weights=np.concatenate([
+                contribution(self._idf(n, len(docs)), tfs, docs) for docs, tfs in rare
+            ]))
+
+            bound = 0.0
+            for docs, tfs in common:
+                idf = self._idf(n, len(docs))
+                # Postings are in chunk order, so look the candidates up by binary search
+                found = np.minimum(np.searchsorted(docs, candidates), len(docs) - 1)
+                hit = docs[found] == candidates
+                scores[hit] += contribution(idf, tfs[found[hit]], candidates[hit])
+                bound += idf * (self.k1 + 1)
+
+            top = [i for i in self._top(scores, k) if scores[i] >= bound]
+            if top:
+                return [(doc_ids[candidates[i]], float(scores[i])) for i in top]
+
+        # Only common terms, or candidates too weak to rule the rest out: score every posting
+        scores = np.zeros(n, dtype=np.float32)
+        for docs, tfs in terms:
+            scores[docs] += contribution(self._idf(n, len(docs)), tfs, docs)
+
+        return [(doc_ids[i], float(scores[i])) for i in self._top(scores, k)]
+
+    def stats(self) -> dict:
+        """
+        Index size metrics
+        """
+        return {"chunks": len(self._doc_ids), "terms": len(self._term_ids)}
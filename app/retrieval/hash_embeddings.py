@@ -0,0 +1,53 @@
+import hashlib
+import re
+import time
+from functools import lru_cache
+from itertools import pairwise
+from typing import List, Optional, Tuple
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from ..llm.fake import LatencyDistribution
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+@lru_cache(maxsize=100_000)
+def _feature_slot(feature: str, dimensions: int) -> Tuple[int, float]:
+    digest = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "big")
+    return digest % dimensions, 1.0 if digest >> 63 else -1.0
+
+
+class HashEmbeddings(Embeddings):
+    """
+    Deterministic, offline embeddings from signed feature hashing.
+
+    Word unigrams and bigrams are hashed into a fixed number of dimensions and
+    the vector is L2-normalized. Texts sharing words get similar vectors, so
+    retrieval still behaves sensibly in load tests without a model or network.
+    """
+
+    def __init__(self, dimensions: int = 384, latency: Optional[LatencyDistribution] = None):
+        self.dimensions = dimensions
+        self.latency = latency or LatencyDistribution()
+
+    def _embed(self, text: str) -> List[float]:
+        words = TOKEN_PATTERN.findall(text.lower())
+        features = words + [f"{a} {b}" for a, b in pairwise(words)]
+
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for feature in features:
+            slot, sign = _feature_slot(feature, self.dimensions)
+            vector[slot] += sign
+
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector.tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        time.sleep(self.latency.sample())
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        time.sleep(self.latency.sample())
+        return self._embed(text)
@@ -0,0 +1,138 @@
+from typing import Dict, List, Optional, Tuple
+import logging
+import numpy as np
+from langchain.schema import Document
+from ..config import get_setting
+from ..metrics import VECTOR_SEARCH_LATENCY
+from .scores import distance_to_similarity
+from .vector_store import (
+    embed_query,
+    get_bm25_index,
+    get_vector_store,
+    run_in_executor,
+    similarity_search_by_vector_with_score
+)
+
+logger = logging.getLogger(__name__)
+
+KEYWORD_WEIGHT = float(get_setting("retrieval.keyword_weight", 0.3))
+SEMANTIC_WEIGHT = float(get_setting("retrieval.semantic_weight", 0.7))
+
+
+def _key(doc: Document) -> Tuple:
+    return doc.metadata.get("source"), doc.page_content
+
+
+def _space(store) -> str:
+    return (store._collection.metadata or {}).get("hnsw:space", "l2")
+
+
+def _distances(space: str, query: np.ndarray, vectors: np.ndarray) -> np.ndarray:
+    # The distances Chroma itself reports for each hnsw:space
+    if space == "cosine":
+        norms = np.linalg.norm(vectors, axis=1) * np.linalg.norm(query)
+        return 1 - (vectors @ query) / np.where(norms > 0, norms, 1)
+    if space == "ip":
+        return 1 - vectors @ query
+    return ((vectors - query) ** 2).sum(axis=1)
+
+
+def _keyword_hits(
+    doc_ids: List[str],
+    query_embedding: List[float]
+) -> Dict[str, Tuple[Document, float]]:
+    """
+    Documents for keyword hits, with the distance vector search would report for them
+    """
+    store = get_vector_store()
+    found = store.get(ids=doc_ids, include=["documents", "metadatas", "embeddings"])
+    if not found["ids"]:
+        return {}
+
+    distances = _distances(
+        _space(store),
+        np.asarray(query_embedding, dtype=np.float32),
+        np.asarray(found["embeddings"], dtype=np.float32)
+    )
+
+    return {
+        doc_id: (Document(page_content=text, metadata=metadata or {}), float(distance))
+        for doc_id, text, metadata, distance in zip(found["ids"], found["documents"], found["metadatas"], distances, strict=True)
+    }
+
+
+def weighted_fusion(
+    vector_results: List[Tuple[Document, float]],
+    keyword_results: List[Tuple[Document, float, float]],
+    top_k: int,
+    space: str = "l2",
+    keyword_weight: float = KEYWORD_WEIGHT,
+    semantic_weight: float = SEMANTIC_WEIGHT
+) -> List[Tuple[Document, float]]:
+    """
+    Merge vector and keyword results by a weighted sum of their scores.
+
+    Vector results are (document, distance) as the vector store returns them;
+    keyword results are (document, BM25 score, distance). Distances are turned
+    into similarities for the store's distance space, and BM25 scores scaled
+    so the best keyword hit scores 1. Chunks are ordered by
+    semantic_weight * similarity + keyword_weight * scaled BM25, and keep the
+    vector store's score so downstream confidence stays on its scale.
+    """
+    fused: Dict[Tuple, list] = {}
+
+    for doc, distance in vector_results:
+        fused[_key(doc)] = [doc, distance, 0.0]
+
+    best_bm25 = max((bm25 for _, bm25, _ in keyword_results), default=0.0)
+    for doc, bm25, distance in keyword_results:
+        entry = fused.setdefault(_key(doc), [doc, distance, 0.0])
+        entry[2] = bm25 / best_bm25 if best_bm25 > 0 else 0.0
+
+    ranked = sorted(
+        fused.values(),
+        key=lambda entry: semantic_weight * distance_to_similarity(entry[1], space) + keyword_weight * entry[2],
+        reverse=True
+    )
+    return [(doc, distance) for doc, distance, _ in ranked[:top_k]]
+
+
+def hybrid_search(
+    question: str,
+    k: int = 5,
+    query_embedding: Optional[List[float]] = None
+) -> List[Tuple[Document, float]]:
+    """
+    Dense and BM25 search over the same chunks, fused with the configured weights
+    """
+    if query_embedding is None:
+        query_embedding = embed_query(question)
+
+    vector_results = similarity_search_by_vector_with_score(query_embedding, k)
+
+    with VECTOR_SEARCH_LATENCY.labels(method="keyword").time():
+        keyword_scores = get_bm25_index().search(question, k)
+
+    keyword_results = []
+    if keyword_scores:
+        hits = _keyword_hits([doc_id for doc_id, _ in keyword_scores], query_embedding)
+        keyword_results = [
+            (hits[doc_id][0], bm25, hits[doc_id][1])
+            for doc_id, bm25 in keyword_scores
+            if doc_id in hits
+        ]
+
+    logger.info(f"Hybrid retrieval: {len(vector_results)} vector and {len(keyword_results)} keyword hits")
+
+    return weighted_fusion(vector_results, keyword_results, top_k=k, space=_space(get_vector_store()))
+
+
+async def ahybrid_search(
+    question: str,
+    k: int = 5,
+    query_embedding: Optional[List[float]] = None
+) -> List[Tuple[Document, float]]:
+    """
+    Async hybrid search on the vector store executor
+    """
+    return await run_in_executor(hybrid_search, question, k, query_embedding)
@@ -0,0 +1,126 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Tuple
+import logging
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from ..config import get_setting
+
+logger = logging.getLogger(__name__)
+
+# Global model instance, loaded once per process
+_local_embeddings = None
+_local_embeddings_lock = threading.Lock()
+
+LOCAL_MODEL = get_setting("embeddings.local.model", "sentence-transformers/all-MiniLM-L6-v2")
+
+
+class LocalEmbeddings(Embeddings):
+    """
+    sentence-transformers model run in-process, behind a query micro-batcher.
+
+    Query embeddings from concurrent requests are queued for one worker
+    thread. It takes everything queued (waiting up to max_wait_ms for more)
+    and encodes it in a single batch. Under load, queries share forward passes
+    instead of contending for the same cores. Document batches (ingestion,
+    batch queries) are encoded directly in the caller's thread.
+    """
+
+    def __init__(self, model, batch_size: int = 64, max_batch: int = 32, max_wait_ms: float = 2.0):
+        self.model = model
+        self.batch_size = batch_size
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue: "queue.Queue[Tuple[str, Future]]" = queue.Queue()
+        self._worker = None
+        self._worker_lock = threading.Lock()
+
+    def _encode(self, texts: List[str], batch_size: int) -> np.ndarray:
+        return self.model.encode(
+            texts,
+            batch_size=batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        )
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        return self._encode(list(texts), self.batch_size).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        if self._worker is None:
+            self._start_worker()
+
+        future: Future = Future()
+        self._queue.put((text, future))
+        return future.result()
+
+    def _start_worker(self) -> None:
+        with self._worker_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="local-embeddings", daemon=True)
+                self._worker.start()
+
+    def _next_batch(self) -> List[Tuple[str, Future]]:
+        # Block for the first query, then gather the ones arriving within max_wait
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_batch:
+            try:
+                remaining = deadline - time.monotonic()
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+
+            try:
+                vectors = self._encode([text for text, _ in batch], len(batch))
+                results = list(zip(batch, vectors, strict=True))
+            except Exception as e:
+                logger.error(f"Local query embedding failed: {e}")
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future), vector in results:
+                future.set_result(vector.tolist())
+
+
+def get_local_embeddings() -> LocalEmbeddings:
+    """
+    Get the local embedding model, loading it on first use
+    """
+    global _local_embeddings
+
+    with _local_embeddings_lock:
+        if _local_embeddings is None:
+            from sentence_transformers import SentenceTransformer
+
+            threads = get_setting("embeddings.local.threads")
+            if threads:
+                import torch
+
+                # Process-wide: also applies to the reranker's cross-encoder
+                torch.set_num_threads(int(threads))
+
+            logger.info(f"Loading embedding model {LOCAL_MODEL}")
+            model = SentenceTransformer(LOCAL_MODEL, device=get_setting("embeddings.local.device", "cpu"))
+
+            _local_embeddings = LocalEmbeddings(
+                model,
+                batch_size=int(get_setting("embeddings.local.batch_size", 64)),
+                max_batch=int(get_setting("embeddings.local.max_batch", 32)),
+                max_wait_ms=float(get_setting("embeddings.local.max_wait_ms", 2))
+            )
+
+    return _local_embeddings
@@ -0,0 +1,138 @@
+import asyncio
+import re
+from typing import Dict, List, Optional, Tuple
+import logging
+from langchain.schema import Document
+from ..config import get_setting
+from .text import keyword_form
+from .vector_store import (
+    aembed_queries,
+    asimilarity_search_by_vector_with_score,
+    embed_queries,
+    get_executor,
+    similarity_search_by_vector_with_score
+)
+
+logger = logging.getLogger(__name__)
+
+MAX_VARIANTS = int(get_setting("retrieval.multi_query.max_variants", 4))
+RRF_K = int(get_setting("retrieval.multi_query.rrf_k", 60))
+
+QUESTION_WORDS = r"(?:how|what|why|when|where|which|who|can|could|do|does|is|are|should|will)"
+
+# Split on sentence-ending question marks and semicolons, and on conjunctions
+# only when they start a new question ("... and how do I ...")
+SUB_QUESTION_SPLIT = re.compile(
+    rf"\?\s+|;\s*|,?\s+(?:and also|and then|also|and|or)\s+(?={QUESTION_WORDS}\b)",
+    re.IGNORECASE
+)
+
+def generate_query_variants(question: str, max_variants: int = MAX_VARIANTS) -> List[str]:
+    """
+    Derive search queries from a question without an LLM call.
+
+    The original question always comes first, followed by its sub-questions
+    (when it asks several things) and a stopword-free keyword form.
+    """
+    variants = [question.strip()]
+    seen = {" ".join(question.lower().split()).rstrip("?!. ")}
+
+    parts = [part.strip(" ?,.") for part in SUB_QUESTION_SPLIT.split(question)]
+    candidates = [part for part in parts if len(part.split()) >= 3] if len(parts) > 1 else []
+    candidates.append(keyword_form(question))
+
+    for candidate in candidates:
+        normalized = " ".join(candidate.lower().split()).rstrip("?!. ")
+        if len(normalized.split()) >= 2 and normalized not in seen:
+            seen.add(normalized)
+            variants.append(candidate)
+
+    return variants[:max_variants]
+
+
+def reciprocal_rank_fusion(
+    result_lists: List[List[Tuple[Document, float]]],
+    top_k: int,
+    k: int = RRF_K
+) -> List[Tuple[Document, float]]:
+    """
+    Merge ranked result lists with reciprocal-rank fusion.
+
+    Chunks are ordered by the sum of 1 / (k + rank) across lists. Each chunk
+    keeps its best (smallest) vector store distance, so downstream confidence
+    stays on the vector store's scale.
+    """
+    fused: Dict[Tuple, list] = {}
+
+    for results in result_lists:
+        for rank, (doc, score) in enumerate(results, start=1):
+            key = (doc.metadata.get("source"), doc.page_content)
+            entry = fused.get(key)
+            if entry is None:
+                fused[key] = [doc, score, 1.0 / (k + rank)]
+            else:
+                entry[1] = min(entry[1], score)
+                entry[2] += 1.0 / (k + rank)
+
+    ranked = sorted(fused.values(), key=lambda entry: entry[2], reverse=True)
+    return [(doc, score) for doc, score, _ in ranked[:top_k]]
+
+
+def _split_embedding_work(
+    variants: List[str],
+    query_embedding: Optional[List[float]]
+) -> List[str]:
+    # The original question's embedding may already be known (batch/semantic cache)
+    return variants[1:] if query_embedding is not None else variants
+
+
+def multi_query_search(
+    question: str,
+    k: int = 5,
+    query_embedding: Optional[List[float]] = None
+) -> List[Tuple[Document, float]]:
+    """
+    Fan a question out into variants, embed them in one batch, search
+    concurrently on the vector store executor and fuse the results
+    """
+    variants = generate_query_variants(question)
+    to_embed = _split_embedding_work(variants, query_embedding)
+
+    embeddings = embed_queries(to_embed) if to_embed else []
+    if query_embedding is not None:
+        embeddings = [query_embedding] + embeddings
+
+    futures = [
+        get_executor().submit(similarity_search_by_vector_with_score, embedding, k)
+        for embedding in embeddings
+    ]
+    result_lists = [future.result() for future in futures]
+
+    logger.info(f"Multi-query retrieval over {len(variants)} variants")
+
+    return reciprocal_rank_fusion(result_lists, top_k=k)
+
+
+async def amulti_query_search(
+    question: str,
+    k: int = 5,
+    query_embedding: Optional[List[float]] = None
+) -> List[Tuple[Document, float]]:
+    """
+    Async multi-query retrieval; searches for all variants run concurrently
+    """
+    variants = generate_query_variants(question)
+    to_embed = _split_embedding_work(variants, query_embedding)
+
+    embeddings = await aembed_queries(to_embed) if to_embed else []
+    if query_embedding is not None:
+        embeddings = [query_embedding] + embeddings
+
+    result_lists = await asyncio.gather(*(
+        asimilarity_search_by_vector_with_score(embedding, k)
+        for embedding in embeddings
+    ))
+
+    logger.info(f"Multi-query retrieval over {len(variants)} variants")
+
+    return reciprocal_rank_fusion(list(result_lists), top_k=k)
@@ -0,0 +1,252 @@
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import logging
+import numpy as np
+from langchain.schema import Document
+from langchain_core.embeddings import Embeddings
+from .topk import top_k_indices
+
+logger = logging.getLogger(__name__)
+
+HEADER_FILE = "index.json"
+VECTORS_FILE = "vectors.f32"
+SQUARED_NORMS_FILE = "squared_norms.f32"
+
+
+def _truncate(path: str, size: int) -> None:
+    # Drop bytes written by an append that never committed
+    if os.path.exists(path) and os.path.getsize(path) > size:
+        os.truncate(path, size)
+
+
+class _Column:
+    """
+    Variable-length values stored back to back in one file.
+
+    An int64 file of end offsets locates each value. Values are read through
+    a memory map, so opening the store loads only the offsets.
+    """
+
+    def __init__(self, path: str, count: int):
+        self.data_path = f"{path}.bin"
+        self.offsets_path = f"{path}.offsets"
+
+        ends = np.fromfile(self.offsets_path, dtype=np.int64, count=count) if count else np.empty(0, np.int64)
+        self._offsets = np.concatenate([np.zeros(1, dtype=np.int64), ends])
+        _truncate(self.offsets_path, ends.nbytes)
+        _truncate(self.data_path, int(self._offsets[-1]))
+        self._data = self._map()
+
+    def _map(self) -> Optional[np.memmap]:
+        if self._offsets[-1] == 0:
+            return None
+        return np.memmap(self.data_path, dtype=np.uint8, mode="r", shape=(int(self._offsets[-1]),))
+
+    def append(self, values: List[bytes]) -> None:
+        ends = self._offsets[-1] + np.cumsum([len(value) for value in values], dtype=np.int64)
+
+        with open(self.data_path, "ab") as f:
+            f.write(b"".join(values))
+        with open(self.offsets_path, "ab") as f:
+            f.write(ends.tobytes())
+
+        self._offsets = np.concatenate([self._offsets, ends])
+        self._data = self._map()
+
+    def __getitem__(self, row: int) -> bytes:
+        offsets, data = self._offsets, self._data
+        return data[offsets[row]:offsets[row + 1]].tobytes()
+
+
+class NumpyVectorStore:
+    """
+    In-process exact vector index over a memory-mapped float32 matrix.
+
+    Vectors are appended to one contiguous row-major file. Ids, texts and
+    metadata go to columnar side files, in the same row order. A search is
+    one matrix-vector product and a partial sort, with no client, SQLite or
+    serialization layers in between.
+
+    Scores are squared L2 distances, as the Chroma collection reports them,
+    so thresholds and hybrid fusion work the same with either store. Appends
+    go to the end of the files and commit by rewriting a small header; an
+    append interrupted before that is discarded on the next open.
+    """
+
+    def __init__(self, path: str, embedding_function: Embeddings, collection_name: str = "documents"):
+        self.path = path
+        self.name = collection_name
+        self.metadata = {"hnsw:space": "l2"}
+        self._embedding_function = embedding_function
+        self._lock = threading.Lock()
+
+        os.makedirs(path, exist_ok=True)
+
+        header = {"count": 0, "dimensions": None}
+        header_path = os.path.join(path, HEADER_FILE)
+        if os.path.exists(header_path):
+            with open(header_path) as f:
+                header = json.load(f)
+
+        self._count = header["count"]
+        self._dimensions = header["dimensions"]
+
+        row_bytes = 4 * (self._dimensions or 0)
+        _truncate(os.path.join(path, VECTORS_FILE), self._count * row_bytes)
+        _truncate(os.path.join(path, SQUARED_NORMS_FILE), self._count * 4)
+        self._matrix = self._map()
+        self._squared_norms = (
+            np.fromfile(os.path.join(path, SQUARED_NORMS_FILE), dtype=np.float32, count=self._count)
+            if self._count else np.empty(0, np.float32)
+        )
+
+        self._ids = _Column(os.path.join(path, "ids"), self._count)
+        self._texts = _Column(os.path.join(path, "documents"), self._count)
+        self._metadatas = _Column(os.path.join(path, "metadatas"), self._count)
+        self._rows = {self._ids[row].decode(): row for row in range(self._count)}
+
+        if self._count:
+            logger.info(f"Opened vector index of {self._count} chunks ({self._dimensions} dimensions) at {path}")
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding_function
+
+    @property
+    def _collection(self) -> "NumpyVectorStore":
+        # Callers read count(), name and metadata off a Chroma store's collection
+        return self
+
+    def count(self) -> int:
+        return self._count
+
+    def _map(self) -> Optional[np.memmap]:
+        if self._count == 0:
+            return None
+        return np.memmap(
+            os.path.join(self.path, VECTORS_FILE),
+            dtype=np.float32,
+            mode="r",
+            shape=(self._count, self._dimensions)
+        )
+
+    def add_documents(self, documents: List[Document], ids: Optional[List[str]] = None) -> List[str]:
+        """
+        Embed and append documents
+        """
+        vectors = self._embedding_function.embed_documents([doc.page_content for doc in documents])
+        return self.add_embeddings(
+            [doc.page_content for doc in documents],
+            vectors,
+            [doc.metadata for doc in documents],
+            ids
+        )
+
+    def add_embeddings(
+        self,
+        texts: Sequence[str],
+        vectors: Sequence[Sequence[float]],
+        metadatas: Optional[Sequence[Dict[str, Any]]] = None,
+        ids: Optional[List[str]] = None
+    ) -> List[str]:
+        """
+        Append already embedded texts
+        """
+        if not texts:
+            return []
+
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        ids = ids or [os.urandom(16).hex() for _ in texts]
+        metadatas = metadatas or [{} for _ in texts]
+
+        with self._lock:
+            if self._dimensions is None:
+                self._dimensions = vectors.shape[1]
+            if vectors.shape[1] != self._dimensions:
+                raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match index dimension {self._dimensions}")
+
+            squared_norms = np.einsum("ij,ij->i", vectors, vectors)
+            with open(os.path.join(self.path, VECTORS_FILE), "ab") as f:
+                f.write(vectors.tobytes())
+            with open(os.path.join(self.path, SQUARED_NORMS_FILE), "ab") as f:
+                f.write(squared_norms.tobytes())
+            self._ids.append([doc_id.encode() for doc_id in ids])
+            self._texts.append([text.encode() for text in texts])
+            self._metadatas.append([json.dumps(metadata or {}).encode() for metadata in metadatas])
+
+            for row, doc_id in enumerate(ids, start=self._count):
+                self._rows[doc_id] = row
+            self._count += len(ids)
+            self._write_header()
+
+            # Searches in flight keep the previous, shorter mapping
+            self._matrix = self._map()
+            self._squared_norms = np.concatenate([self._squared_norms, squared_norms])
+
+        return ids
+
+    def _write_header(self) -> None:
+        header_path = os.path.join(self.path, HEADER_FILE)
+        with open(f"{header_path}.tmp", "w") as f:
+            json.dump({"count": self._count, "dimensions": self._dimensions}, f)
+        os.replace(f"{header_path}.tmp", header_path)
+
+    def _document(self, row: int) -> Document:
+        return Document(page_content=self._texts[row].decode(), metadata=json.loads(self._metadatas[row]))
+
+    def similarity_search_by_vector_with_relevance_scores(
+        self,
+        embedding: List[float],
+        k: int = 4
+    ) -> List[Tuple[Document, float]]:
+        """
+        Top-k (document, squared L2 distance) for a query vector, nearest first
+        """
+        with self._lock:
+            matrix, squared_norms = self._matrix, self._squared_norms
+        if matrix is None:
+            return []
+
+        query = np.asarray(embedding, dtype=np.float32)
+        if len(query) != matrix.shape[1]:
+            raise ValueError(f"Query dimension {len(query)} does not match index dimension {matrix.shape[1]}")
+
+        # |x - q|^2 = |x|^2 - 2 x.q + |q|^2; rank on the part that depends on x
+        closeness = matrix @ query
+        closeness *= 2
+        closeness -= squared_norms[:len(closeness)]
+
+        query_norm = float(query @ query)
+        return [
+            (self._document(row), max(query_norm - float(closeness[row]), 0.0))
+            for row in top_k_indices(closeness, k)
+        ]
+
+    def similarity_search_with_score(self, query: str, k: int = 4) -> List[Tuple[Document, float]]:
+        """
+        Top-k (document, squared L2 distance) for a query text
+        """
+        return self.similarity_search_by_vector_with_relevance_scores(self._embedding_function.embed_query(query), k)
+
+    def similarity_search(self, query: str, k: int = 4) -> List[Document]:
+        """
+        Top-k documents for a query text
+        """
+        return [doc for doc, _ in self.similarity_search_with_score(query, k)]
+
+    def get(self, ids: Optional[List[str]] = None, include: Sequence[str] = ("documents", "metadatas")) -> dict:
+        """
+        Stored chunks by id (all of them without ids), in Chroma's result layout
+        """
+        with self._lock:
+            matrix = self._matrix
+            rows = list(range(self._count)) if ids is None else [self._rows[i] for i in ids if i in self._rows]
+
+        return {
+            "ids": [self._ids[row].decode() for row in rows],
+            "documents": [self._texts[row].decode() for row in rows] if "documents" in include else None,
+            "metadatas": [json.loads(self._metadatas[row]) for row in rows] if "metadatas" in include else None,
+            "embeddings": [matrix[row].tolist() for row in rows] if "embeddings" in include else None
+        }
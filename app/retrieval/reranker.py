@@ -0,0 +1,165 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence
+import logging
+from ..config import get_setting
+
+logger = logging.getLogger(__name__)
+
+# Global reranker instances
+_reranker = None
+_reranker_lock = threading.Lock()
+_rerank_cache = None
+
+RERANK_MODEL = get_setting("reranker.model", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+
+
+class RerankCache:
+    """
+    Cross-encoder scores keyed on a hash of the model name, query and chunk text.
+
+    Bounded LRU; a repeated or paraphrase-free question over the same chunks
+    is scored without running the model again.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._scores: "OrderedDict[bytes, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model: str, query: str, text: str) -> bytes:
+        """
+        Hash a model name, query and chunk text into a fixed-size cache key
+        """
+        return hashlib.blake2b(f"{model}\0{query}\0{text}".encode(), digest_size=16).digest()
+
+    def get_many(self, keys: List[bytes]) -> Dict[bytes, float]:
+        """
+        Cached scores for whichever of the keys are known
+        """
+        found = {}
+        with self._lock:
+            for key in keys:
+                score = self._scores.get(key)
+                if score is not None:
+                    self._scores.move_to_end(key)
+                    found[key] = score
+
+            hits = sum(1 for key in keys if key in found)
+            self.hits += hits
+            self.misses += len(keys) - hits
+        return found
+
+    def put_many(self, items: Dict[bytes, float]) -> None:
+        """
+        Cache newly computed scores, evicting the least recently used
+        """
+        with self._lock:
+            for key, score in items.items():
+                self._scores[key] = score
+                self._scores.move_to_end(key)
+            while len(self._scores) > self.max_entries:
+                self._scores.popitem(last=False)
+
+    def stats(self) -> dict:
+        """
+        Hit/miss and size metrics
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self._scores)
+        }
+
+
+class CrossEncoderReranker:
+    """
+    Scores (query, chunk) pairs with a cross-encoder on CPU.
+
+    All uncached pairs of a query go through the model in a single batch, so
+    a rerank costs one padded forward pass however many candidates there are.
+    Passes are serialized: concurrent ones would only split the same cores.
+    """
+
+    def __init__(self, model, cache: Optional[RerankCache] = None, model_name: str = RERANK_MODEL):
+        self.model = model
+        self.cache = cache
+        self.model_name = model_name
+        self._lock = threading.Lock()
+
+    def score(self, query: str, texts: Sequence[str]) -> List[float]:
+        """
+        Relevance score of each text to the query, higher is better
+        """
+        keys = [RerankCache.make_key(self.model_name, query, text) for text in texts]
+        scores = self.cache.get_many(keys) if self.cache is not None else {}
+
+        # Duplicate chunks (overlapping search variants) are scored once
+        missing = {key: text for key, text in zip(keys, texts, strict=True) if key not in scores}
+        if missing:
+            pairs = [(query, text) for text in missing.values()]
+            with self._lock:
+                predicted = self.model.predict(pairs, batch_size=len(pairs), show_progress_bar=False)
+
+            computed = {key: float(score) for key, score in zip(missing, predicted, strict=True)}
+            if self.cache is not None:
+                self.cache.put_many(computed)
+            scores.update(computed)
+
+            logger.info(f"Reranked {len(pairs)} chunks ({len(texts) - len(pairs)} cached)")
+
+        return [scores[key] for key in keys]
+
+
+def get_rerank_cache() -> Optional[RerankCache]:
+    """
+    Get or create the rerank score cache, or None when reranking is disabled
+    """
+    global _rerank_cache
+
+    if _rerank_cache is None and get_setting("retrieval.rerank", False):
+        _rerank_cache = RerankCache(int(get_setting("reranker.cache_entries", 10000)))
+
+    return _rerank_cache
+
+
+def get_reranker() -> CrossEncoderReranker:
+    """
+    Get or create the cross-encoder reranker, loading the model on first use
+    """
+    global _reranker
+
+    with _reranker_lock:
+        if _reranker is None:
+            from sentence_transformers import CrossEncoder
+
+            threads = get_setting("reranker.threads")
+            if threads:
+                import torch
+
+                # Process-wide: also applies to any other torch model in the process
+                torch.set_num_threads(int(threads))
+
+            logger.info(f"Loading cross-encoder {RERANK_MODEL}")
+            model = CrossEncoder(
+                RERANK_MODEL,
+                max_length=int(get_setting("reranker.max_length", 256)),
+                device="cpu"
+            )
+            _reranker = CrossEncoderReranker(model, get_rerank_cache(), RERANK_MODEL)
+
+    return _reranker
+
+
+def score(query: str, texts: Sequence[str]) -> List[float]:
+    """
+    Score texts with the shared reranker, loading it in the calling thread
+    """
+    return get_reranker().score(query, texts)
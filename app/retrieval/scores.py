@@ -0,0 +1,14 @@
+from typing import Optional
+
+
+def distance_to_similarity(distance: Optional[float], space: str = "l2") -> float:
+    """
+    Cosine similarity of unit-length embeddings, from the distance a vector store reports.
+
+    Chroma and the NumPy index return distances (lower is better): squared
+    L2 by default, or 1 - similarity for the cosine and ip spaces. A missing
+    score counts as no similarity.
+    """
+    if distance is None:
+        return 0.0
+    return 1 - distance / 2 if space == "l2" else 1 - distance
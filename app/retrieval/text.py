@@ -0,0 +1,31 @@
+import re
+
+STOPWORDS = frozenset("""
+a an the and or but if then else of to in on at by for with from into about as is are was were be been
+being do does did done have has had i me my we our you your it its this that these those there here
+how what why when where which who whom can could should would will shall may might must please tell
+explain show give some any all more most other such so than too very just also
+""".split())
+
+
+def keyword_form(question: str) -> str:
+    """
+    Lowercased, stopword-free words of a question, each once, in order
+    """
+    words = re.findall(r"[\w\-\.]+", question.lower())
+    keywords = []
+    for word in words:
+        word = word.strip(".")
+        if word and word not in STOPWORDS and word not in keywords:
+            keywords.append(word)
+    return " ".join(keywords)
+
+
+def stem(word: str) -> str:
+    """
+    Crude suffix stripping so "builds"/"building" match "build"
+    """
+    for suffix in ("ing", "ed", "s"):
+        if len(word) > len(suffix) + 2 and word.endswith(suffix) and not word.endswith("ss"):
+            return word[:-len(suffix)]
+    return word
@@ -0,0 +1,27 @@
+import numpy as np
+
+# Large score arrays are first cut down to the scores beating the k-th best of every n-th one
+TOP_K_SAMPLE_STRIDE = 64
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k highest scores, highest first.
+
+    The k-th best of a strided sample is at most the k-th best overall, so
+    every top-k score clears it; only the scores that do are partitioned.
+    """
+    n = len(scores)
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.intp)
+
+    if n > k * TOP_K_SAMPLE_STRIDE:
+        sample = scores[::TOP_K_SAMPLE_STRIDE]
+        threshold = np.partition(sample, len(sample) - k)[len(sample) - k]
+        top = np.flatnonzero(scores >= threshold)
+    else:
+        top = np.arange(n)
+
+    if len(top) > k:
+        top = top[np.argpartition(-scores[top], k - 1)[:k]]
+    return top[np.argsort(-scores[top], kind="stable")]
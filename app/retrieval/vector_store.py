@@ -1,47 +1,107 @@
 import os
-from typing import List
+import asyncio
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, List, Tuple
 import logging
 from langchain_community.vectorstores import Chroma
 from langchain_openai import OpenAIEmbeddings
 from langchain.schema import Document
+from ..cache.embedding_cache import CachedEmbeddings, get_embedding_cache
+from ..config import get_setting
+from ..metrics import InstrumentedEmbeddings, VECTOR_SEARCH_LATENCY
 
 logger = logging.getLogger(__name__)
 
 # Global vector store instance
 _vector_store = None
 
-CHROMA_PERSIST_DIR = os.getenv("CHROMA_PERSIST_DIR", "./data/chroma")
+# Bounded thread pool for blocking embedding / Chroma calls from async code
+_executor = None
+
+# Token identifying the current index contents; changes whenever documents are
+# added or the store is cleared. Persisted so answer caches survive restarts.
+_corpus_version = None
+CORPUS_VERSION_FILE = "corpus_version"
+
+# Keyword terms of the indexed documents, kept in step with the index
+_vocabulary = None
+VOCABULARY_FILE = "vocabulary.txt"
+
+# Keyword (BM25) index of the indexed documents, for hybrid search
+_bm25_index = None
+BM25_FILE = "bm25.log"
+
+# Files of the in-process NumPy index, when vector_store.provider is numpy
+NUMPY_STORE_DIR = "numpy_index"
+
+CHROMA_PERSIST_DIR = os.getenv("CHROMA_PERSIST_DIR", get_setting("vector_store.persist_directory", "./data/chroma"))
 COLLECTION_NAME = "technical_docs"
 
 
 def get_embeddings():
     """
-    Get embeddings model
+    Get embeddings model for the configured backend (openai, local, or hash for offline runs),
+    behind the embedding cache when enabled
     """
-    return OpenAIEmbeddings(
-        model="text-embedding-ada-002"
-    )
+    backend = get_setting("embeddings.backend", "openai")
+
+    if backend == "local":
+        from .local_embeddings import LOCAL_MODEL, get_local_embeddings
+
+        model = LOCAL_MODEL
+        embeddings = InstrumentedEmbeddings(get_local_embeddings())
+    elif backend == "hash":
+        from .hash_embeddings import HashEmbeddings
+        from ..llm.fake import LatencyDistribution
+
+        dimensions = int(get_setting("embeddings.dimensions", 384))
+        model = f"hash-{dimensions}"
+        embeddings = InstrumentedEmbeddings(HashEmbeddings(
+            dimensions=dimensions,
+            latency=LatencyDistribution.from_config(get_setting("embeddings.hash.latency"))
+        ))
+    else:
+        model = get_setting("embeddings.model", "text-embedding-ada-002")
+        embeddings = InstrumentedEmbeddings(OpenAIEmbeddings(model=model))
+
+    cache = get_embedding_cache()
+    if cache is None:
+        return embeddings
+
+    return CachedEmbeddings(embeddings, cache, model)
 
 
 def get_vector_store() -> Chroma:
     """
-    Get or create vector store instance
+    Get or create vector store instance: Chroma, or the NumPy index per vector_store.provider
     """
     global _vector_store
 
     if _vector_store is None:
-        logger.info(f"Initializing ChromaDB at {CHROMA_PERSIST_DIR}")
-
         embeddings = get_embeddings()
 
-        # Create or load vector store
-        _vector_store = Chroma(
-            collection_name=COLLECTION_NAME,
-            embedding_function=embeddings,
-            persist_directory=CHROMA_PERSIST_DIR
-        )
+        if get_setting("vector_store.provider", "chroma") == "numpy":
+            from .numpy_store import NumpyVectorStore
+
+            logger.info(f"Initializing NumPy vector index at {CHROMA_PERSIST_DIR}")
+            _vector_store = NumpyVectorStore(
+                os.path.join(CHROMA_PERSIST_DIR, NUMPY_STORE_DIR),
+                embeddings,
+                COLLECTION_NAME
+            )
+        else:
+            logger.info(f"Initializing ChromaDB at {CHROMA_PERSIST_DIR}")
 
-        logger.info("ChromaDB initialized successfully")
+            # Create or load vector store
+            _vector_store = Chroma(
+                collection_name=COLLECTION_NAME,
+                embedding_function=embeddings,
+                persist_directory=CHROMA_PERSIST_DIR
+            )
+
+            logger.info("ChromaDB initialized successfully")
 
     return _vector_store
 
@@ -54,11 +114,183 @@ def add_documents(documents: List[Document]) -> None:
 
     logger.info(f"Adding {len(documents)} documents to vector store")
 
-    vector_store.add_documents(documents)
+    # Ids are assigned here so the keyword index can refer to the same chunks
+    ids = [uuid.uuid4().hex for _ in documents]
+    vector_store.add_documents(documents, ids=ids)
+    get_bm25_index().add(ids, [doc.page_content for doc in documents])
+    get_corpus_vocabulary().add_texts(doc.page_content for doc in documents)
+    bump_corpus_version()
 
     logger.info("Documents added successfully")
 
 
+def get_corpus_version() -> str:
+    """
+    Get the token identifying the current index contents
+    """
+    global _corpus_version
+
+    if _corpus_version is None:
+        try:
+            with open(os.path.join(CHROMA_PERSIST_DIR, CORPUS_VERSION_FILE)) as f:
+                _corpus_version = f.read().strip() or None
+        except FileNotFoundError:
+            pass
+
+        if _corpus_version is None:
+            bump_corpus_version()
+
+    return _corpus_version
+
+
+def bump_corpus_version() -> str:
+    """
+    Record that the index contents changed
+    """
+    global _corpus_version
+
+    _corpus_version = uuid.uuid4().hex
+
+    os.makedirs(CHROMA_PERSIST_DIR, exist_ok=True)
+    with open(os.path.join(CHROMA_PERSIST_DIR, CORPUS_VERSION_FILE), "w") as f:
+        f.write(_corpus_version)
+
+    logger.info(f"Corpus version is now {_corpus_version}")
+
+    return _corpus_version
+
+
+def get_corpus_vocabulary():
+    """
+    Get the vocabulary of the indexed documents
+    """
+    global _vocabulary
+
+    if _vocabulary is None:
+        from .vocabulary import CorpusVocabulary
+
+        _vocabulary = CorpusVocabulary(os.path.join(CHROMA_PERSIST_DIR, VOCABULARY_FILE))
+
+    return _vocabulary
+
+
+def get_bm25_index():
+    """
+    Get the keyword index of the indexed documents
+    """
+    global _bm25_index
+
+    if _bm25_index is None:
+        from .bm25 import BM25Index
+
+        _bm25_index = BM25Index(
+            os.path.join(CHROMA_PERSIST_DIR, BM25_FILE),
+            k1=float(get_setting("retrieval.bm25.k1", 1.2)),
+            b=float(get_setting("retrieval.bm25.b", 0.75))
+        )
+
+    return _bm25_index
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Get the bounded thread pool used for blocking vector store work
+    """
+    global _executor
+
+    if _executor is None:
+        max_workers = int(get_setting("vector_store.max_workers", 8))
+        logger.info(f"Creating vector store executor with {max_workers} workers")
+        _executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="vector-store"
+        )
+
+    return _executor
+
+
+async def run_in_executor(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Run a blocking vector store call on the bounded executor
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), partial(func, *args, **kwargs))
+
+
+def similarity_search_with_score(query: str, k: int = 5) -> List[Tuple[Document, float]]:
+    """
+    Search for documents similar to query, returning relevance scores
+    """
+    vector_store = get_vector_store()
+
+    with VECTOR_SEARCH_LATENCY.labels(method="text").time():
+        return vector_store.similarity_search_with_score(query=query, k=k)
+
+
+async def asimilarity_search_with_score(query: str, k: int = 5) -> List[Tuple[Document, float]]:
+    """
+    Async similarity search; query embedding and Chroma lookup run off the event loop
+    """
+    return await run_in_executor(similarity_search_with_score, query, k)
+
+
+def similarity_search_by_vector_with_score(
+    embedding: List[float],
+    k: int = 5
+) -> List[Tuple[Document, float]]:
+    """
+    Search with a precomputed query embedding, returning relevance scores
+    """
+    vector_store = get_vector_store()
+
+    with VECTOR_SEARCH_LATENCY.labels(method="vector").time():
+        return vector_store.similarity_search_by_vector_with_relevance_scores(embedding=embedding, k=k)
+
+
+async def asimilarity_search_by_vector_with_score(
+    embedding: List[float],
+    k: int = 5
+) -> List[Tuple[Document, float]]:
+    """
+    Async search with a precomputed query embedding
+    """
+    return await run_in_executor(similarity_search_by_vector_with_score, embedding, k)
+
+
+def embed_query(query: str) -> List[float]:
+    """
+    Embed a single query with the vector store's embedding model
+    """
+    vector_store = get_vector_store()
+
+    return vector_store.embeddings.embed_query(query)
+
+
+async def aembed_query(query: str) -> List[float]:
+    """
+    Async query embedding on the bounded executor
+    """
+    return await run_in_executor(embed_query, query)
+
+
+def embed_queries(queries: List[str]) -> List[List[float]]:
+    """
+    Embed several queries with a single batched embedding call
+    """
+    vector_store = get_vector_store()
+
+    logger.info(f"Embedding {len(queries)} queries in one batch")
+
+    return vector_store.embeddings.embed_documents(queries)
+
+
+async def aembed_queries(queries: List[str]) -> List[List[float]]:
+    """
+    Async batched query embedding on the bounded executor
+    """
+    return await run_in_executor(embed_queries, queries)
+
+
 def search_documents(query: str, k: int = 5) -> List[Document]:
     """
     Search for documents similar to query
@@ -76,7 +308,7 @@ def clear_vector_store() -> None:
     """
     Clear all documents from vector store
     """
-    global _vector_store
+    global _vector_store, _vocabulary, _bm25_index
 
     logger.warning("Clearing vector store")
 
@@ -85,5 +317,8 @@ def clear_vector_store() -> None:
         shutil.rmtree(CHROMA_PERSIST_DIR)
 
     _vector_store = None
+    _vocabulary = None
+    _bm25_index = None
+    bump_corpus_version()
 
     logger.info("Vector store cleared")
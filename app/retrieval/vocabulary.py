@@ -0,0 +1,73 @@
+import os
+import re
+import threading
+from typing import Iterable, Optional, Set
+import logging
+from .text import STOPWORDS, stem
+
+logger = logging.getLogger(__name__)
+
+WORD_PATTERN = re.compile(r"[\w\-\.]+")
+
+
+def text_terms(text: str) -> Set[str]:
+    """
+    Stemmed, stopword-free keyword terms of a text
+    """
+    terms = set()
+    for word in WORD_PATTERN.findall(text.lower()):
+        word = word.strip(".")
+        if len(word) > 1 and not word.isdigit() and word not in STOPWORDS:
+            terms.add(stem(word))
+    return terms
+
+
+class CorpusVocabulary:
+    """
+    The set of keyword terms appearing anywhere in the indexed documents.
+
+    Lets cheap checks (like the intent router) tell whether a question is
+    about something the corpus covers without a search. The set only grows;
+    new terms are appended to a file so it survives restarts.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._terms: Set[str] = set()
+        self._lock = threading.Lock()
+
+        if path and os.path.exists(path):
+            with open(path) as f:
+                self._terms.update(line.strip() for line in f if line.strip())
+            logger.info(f"Loaded {len(self._terms)} vocabulary terms from {path}")
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def __contains__(self, term: str) -> bool:
+        return term in self._terms
+
+    def add_texts(self, texts: Iterable[str]) -> int:
+        """
+        Add the terms of some newly indexed texts; returns how many were new
+        """
+        terms = set()
+        for text in texts:
+            terms.update(text_terms(text))
+
+        with self._lock:
+            new_terms = terms - self._terms
+            self._terms.update(new_terms)
+
+            if new_terms and self.path:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                with open(self.path, "a") as f:
+                    f.writelines(f"{term}\n" for term in sorted(new_terms))
+
+        return len(new_terms)
+
+    def mentions(self, text: str) -> bool:
+        """
+        Whether any keyword of a text appears in the corpus
+        """
+        return any(term in self._terms for term in text_terms(text))
@@ -0,0 +1,107 @@
+"""
+Concurrent throughput of the blocking vs async query path on one event loop.
+
+The LLM and vector store are replaced with stubs that sleep for a fixed
+latency, so the benchmark measures how well a single uvicorn worker overlaps
+requests rather than OpenAI/Chroma speed.
+
+    python -m benchmarks.bench_async_query --requests 50 --llm-latency 0.5
+"""
+import argparse
+import asyncio
+import logging
+import time
+from unittest.mock import patch
+
+from langchain.schema import Document
+
+
+class StubVectorStore:
+    """
+    Vector store whose search blocks like a remote embedding call + Chroma query
+    """
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def similarity_search_with_score(self, query: str, k: int = 5):
+        time.sleep(self.latency)
+        return [
+            (Document(page_content=f"Chunk {i} about {query}", metadata={"source": f"doc{i}.md"}), 0.9)
+            for i in range(k)
+        ]
+
+
+class StubResponse:
+    def __init__(self, content: str):
+        self.content = content
+
+
+class StubChatModel:
+    """
+    Chat model with a fixed response latency for both invoke and ainvoke
+    """
+
+    latency = 0.2
+
+    def __init__(self, **kwargs):
+        pass
+
+    def invoke(self, messages):
+        time.sleep(self.latency)
+        return StubResponse("stub answer")
+
+    async def ainvoke(self, messages):
+        await asyncio.sleep(self.latency)
+        return StubResponse("stub answer")
+
+
+async def run_blocking(n: int) -> float:
+    """
+    Old route behaviour: sync workflow called from inside a coroutine
+    """
+    from app.graph.workflow import run_rag_query
+
+    async def handler(i: int):
+        return run_rag_query(f"How do I deploy service {i}?")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(handler(i) for i in range(n)))
+    return time.perf_counter() - start
+
+
+async def run_async(n: int) -> float:
+    """
+    New route behaviour: awaiting the async workflow
+    """
+    from app.graph.workflow import arun_rag_query
+
+    start = time.perf_counter()
+    await asyncio.gather(*(arun_rag_query(f"How do I deploy service {i}?") for i in range(n)))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    parser.add_argument("--search-latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    import app.retrieval.vector_store as vector_store
+    vector_store._vector_store = StubVectorStore(args.search_latency)
+    StubChatModel.latency = args.llm_latency
+
+    with patch("app.graph.nodes.get_llm", StubChatModel):
+        for name, runner in (("blocking", run_blocking), ("async", run_async)):
+            elapsed = asyncio.run(runner(args.requests))
+            print(
+                f"{name:>8}: {args.requests} requests in {elapsed:.2f}s "
+                f"-> {args.requests / elapsed:.1f} req/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Indexing throughput and query latency of the BM25 keyword index.
+
+Builds an in-memory index over synthetic chunks drawn from a Zipf-like
+vocabulary (so some terms are in most chunks and most terms are rare), in
+batches as ingestion would, then times keyword searches of common words
+alone and of common words plus a rarer identifier.
+
+    python -m benchmarks.bench_bm25 --chunks 100000 1000000 --queries 200
+"""
+import argparse
+import random
+import statistics
+import time
+
+from app.retrieval.bm25 import BM25Index
+
+COMMON = ["docker", "image", "build", "service", "config", "deploy", "container", "port", "volume", "network"]
+
+
+def make_chunk(rng: random.Random, vocabulary: list, words: int = 150) -> str:
+    return " ".join(
+        rng.choice(COMMON) if rng.random() < 0.2 else vocabulary[min(int(rng.paretovariate(1.1)), len(vocabulary)) - 1]
+        for _ in range(words)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, nargs="+", default=[100_000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary = [f"term{i}" for i in range(200_000)] + [f"ERR_{i:05d}" for i in range(5000)]
+    # Common words only, and common words plus a rarer term (an identifier or error code)
+    mixes = {
+        "words": [f"how do I {rng.choice(COMMON)} the {rng.choice(COMMON)}" for _ in range(args.queries)],
+        "identifier": [
+            f"how do I {rng.choice(COMMON)} the {rng.choice(COMMON)} after {vocabulary[rng.randrange(20, 2000)]}"
+            for _ in range(args.queries)
+        ]
+    }
+
+    print(f"{'chunks':>10} {'index/s':>10} {'queries':>10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'terms':>8}")
+    for total in args.chunks:
+        index = BM25Index()
+
+        start = time.perf_counter()
+        for offset in range(0, total, args.batch_size):
+            count = min(args.batch_size, total - offset)
+            index.add([str(offset + i) for i in range(count)], [make_chunk(rng, vocabulary) for _ in range(count)])
+        elapsed = time.perf_counter() - start
+
+        for mix, queries in mixes.items():
+            latencies = []
+            for query in queries:
+                start = time.perf_counter()
+                index.search(query, k=5)
+                latencies.append(time.perf_counter() - start)
+
+            percentiles = statistics.quantiles(latencies, n=100)
+            print(
+                f"{total:>10} {total / elapsed:>10.0f} {mix:>10} {statistics.median(latencies) * 1000:>8.2f} "
+                f"{percentiles[94] * 1000:>8.2f} {percentiles[98] * 1000:>8.2f} {index.stats()['terms']:>8}"
+            )
+
+
+if __name__ == "__main__":
+    main()
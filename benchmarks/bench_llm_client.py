@@ -0,0 +1,146 @@
+"""
+Latency of a fresh ChatOpenAI per request vs the shared pooled client.
+
+Starts a local stub of the OpenAI chat completions API and calls it through
+both paths, sequentially (latency percentiles) and concurrently (throughput).
+The stub answers over plain HTTP, so the gap shown is client construction plus
+TCP connection setup; against api.openai.com each new connection also pays a
+TLS handshake.
+
+    python -m benchmarks.bench_llm_client --requests 200 --concurrency 20
+"""
+import argparse
+import asyncio
+import logging
+import os
+import socket
+import statistics
+import threading
+import time
+
+import uvicorn
+from fastapi import FastAPI
+
+MESSAGES = [
+    {"role": "system", "content": "You are a helpful technical documentation assistant."},
+    {"role": "user", "content": "How do I deploy with docker?"}
+]
+
+
+def create_stub_app(latency: float) -> FastAPI:
+    """
+    Minimal chat completions endpoint with a fixed server-side latency
+    """
+    stub = FastAPI()
+
+    @stub.post("/v1/chat/completions")
+    async def chat_completions(body: dict):
+        await asyncio.sleep(latency)
+        return {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "Run docker build."},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": 20, "completion_tokens": 4, "total_tokens": 24}
+        }
+
+    return stub
+
+
+def start_stub_server(latency: float) -> str:
+    """
+    Run the stub in a background thread and return its base URL
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    server = uvicorn.Server(uvicorn.Config(create_stub_app(latency), port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+
+    while not server.started:
+        time.sleep(0.01)
+
+    return f"http://127.0.0.1:{port}/v1"
+
+
+def fresh_llm():
+    """
+    Previous behaviour: a new client (and HTTP connection pool) per request
+    """
+    from langchain_openai import ChatOpenAI
+    return ChatOpenAI(model="gpt-4-turbo-preview", temperature=0.1)
+
+
+def shared_llm():
+    """
+    Current behaviour: the process-wide pooled client
+    """
+    from app.llm.client import get_llm
+    return get_llm()
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+    return f"p50 {pick(0.5):6.1f} ms  p95 {pick(0.95):6.1f} ms  p99 {pick(0.99):6.1f} ms  mean {statistics.mean(ordered) * 1000:6.1f} ms"
+
+
+def run_sequential(factory, n: int):
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter()
+        factory().invoke(MESSAGES)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def run_concurrent(factory, n: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            await factory().ainvoke(MESSAGES)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(n)))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--server-latency", type=float, default=0.01)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    os.environ["OPENAI_API_BASE"] = start_stub_server(args.server_latency)
+    os.environ.setdefault("OPENAI_API_KEY", "stub-key")
+
+    for name, factory in (("per-request", fresh_llm), ("shared", shared_llm)):
+        # Warm-up so imports and the first pool connection are excluded
+        factory().invoke(MESSAGES)
+
+        samples = run_sequential(factory, args.requests)
+        print(f"{name:>11} sequential: {percentiles(samples)}")
+
+    for name, factory in (("per-request", fresh_llm), ("shared", shared_llm)):
+        elapsed = asyncio.run(run_concurrent(factory, args.requests, args.concurrency))
+        print(
+            f"{name:>11} concurrent: {args.requests} requests in {elapsed:.2f}s "
+            f"-> {args.requests / elapsed:.1f} req/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Query and document throughput of the local sentence-transformers backend.
+
+Embeds questions from a number of concurrent threads, as concurrent
+requests would, first with every query encoded on its own
+(--max-batch 1) and then with micro-batching. It reports per-query
+latency and queries per second for each. Then it times document encoding
+at the configured batch size, as ingestion would use it.
+
+    python -m benchmarks.bench_local_embeddings --threads 1 8 32 --queries 512
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.config import get_setting
+from app.retrieval.local_embeddings import LOCAL_MODEL, LocalEmbeddings
+
+WORDS = "docker image build service config deploy container port volume network registry cache layer".split()
+
+
+def make_text(i: int, words: int) -> str:
+    return " ".join(WORDS[(i * 7 + j) % len(WORDS)] for j in range(words))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--queries", type=int, default=512)
+    parser.add_argument("--documents", type=int, default=2000)
+    parser.add_argument("--max-wait-ms", type=float, default=float(get_setting("embeddings.local.max_wait_ms", 2)))
+    args = parser.parse_args()
+
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(LOCAL_MODEL, device=get_setting("embeddings.local.device", "cpu"))
+    questions = [make_text(i, 12) for i in range(args.queries)]
+
+    print(f"{'threads':>8} {'max_batch':>10} {'p50 ms':>8} {'p95 ms':>8} {'qps':>8}")
+    for threads in args.threads:
+        for max_batch in (1, int(get_setting("embeddings.local.max_batch", 32))):
+            embeddings = LocalEmbeddings(model, max_batch=max_batch, max_wait_ms=args.max_wait_ms)
+            embeddings.embed_query("warm up")
+
+            def timed(question, embeddings=embeddings):
+                start = time.perf_counter()
+                embeddings.embed_query(question)
+                return time.perf_counter() - start
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                latencies = list(pool.map(timed, questions))
+            elapsed = time.perf_counter() - start
+
+            print(
+                f"{threads:>8} {max_batch:>10} {statistics.median(latencies) * 1000:>8.2f} "
+                f"{statistics.quantiles(latencies, n=100)[94] * 1000:>8.2f} {len(questions) / elapsed:>8.0f}"
+            )
+
+    embeddings = LocalEmbeddings(model, batch_size=int(get_setting("embeddings.local.batch_size", 64)))
+    documents = [make_text(i, 180) for i in range(args.documents)]
+    start = time.perf_counter()
+    embeddings.embed_documents(documents)
+    print(f"documents: {args.documents / (time.perf_counter() - start):.0f}/s at batch size {embeddings.batch_size}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Per-request allocations and node overhead of the compiled workflow.
+
+Runs each node function directly and the whole compiled graph with
+zero-latency stubs for the LLM and vector store, reporting time and bytes
+allocated per call (via tracemalloc). The gap between the graph and the sum of
+its nodes is framework overhead.
+
+    python -m benchmarks.bench_node_overhead --iterations 200
+"""
+import argparse
+import asyncio
+import copy
+import logging
+import time
+import tracemalloc
+from functools import partial
+from unittest.mock import patch
+
+from langchain.schema import Document as LCDocument
+
+from benchmarks.bench_async_query import StubChatModel, StubVectorStore
+
+QUESTION = "How do I deploy the service with docker compose?"
+
+
+def sample_state():
+    from app.graph.state import Document
+    from app.graph.workflow import _initial_state
+
+    state = _initial_state(QUESTION, "bench")
+    state["retrieved_documents"] = [
+        Document(content=f"Chunk {i} about docker compose deployment. " * 20, metadata={"source": f"doc{i}.md"}, relevance_score=0.9)
+        for i in range(5)
+    ]
+    state["needs_retrieval"] = True
+    state["confidence"] = 0.9
+    return state
+
+
+def measure(func, iterations: int, make_input=None):
+    """
+    Return (microseconds per call, peak bytes held while running the iterations)
+
+    With make_input, each call gets its own fresh argument, built before the
+    timed and traced loops so neither counts building it.
+    """
+    def inputs():
+        return [(make_input(),) if make_input else () for _ in range(iterations)]
+
+    func(*inputs()[0])  # warm caches
+
+    calls = inputs()
+    start = time.perf_counter()
+    for args in calls:
+        func(*args)
+    elapsed = time.perf_counter() - start
+
+    calls = inputs()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    for args in calls:
+        func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed / iterations * 1e6, max(peak - before, 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    import app.retrieval.vector_store as vector_store
+    from app.graph import nodes
+    from app.graph.workflow import rag_workflow, _initial_state
+
+    vector_store._vector_store = StubVectorStore(0.0)
+    vector_store._vector_store.similarity_search_with_score = lambda query, k=5: [
+        (LCDocument(page_content=f"Chunk {i} about {query}. " * 20, metadata={"source": f"doc{i}.md"}), 0.9)
+        for i in range(k)
+    ]
+    StubChatModel.latency = 0.0
+
+    with patch("app.graph.nodes.get_llm", StubChatModel):
+        node_funcs = {
+            "query_analysis": nodes.query_analysis_node,
+            "retrieval": nodes.retrieval_node,
+            "relevance_check": nodes.relevance_check_node,
+            "generation": nodes.generation_node,
+            "source_attribution": nodes.source_attribution_node,
+        }
+
+        print(f"{'step':>20} {'us/call':>10} {'peak KB':>10}")
+
+        # Nodes get a fresh copy of the state each call, as nodes may mutate it
+        state = sample_state()
+
+        total = 0.0
+        for name, func in node_funcs.items():
+            micros, peak = measure(func, args.iterations, partial(copy.deepcopy, state))
+            total += micros
+            print(f"{name:>20} {micros:10.1f} {peak / 1024:10.1f}")
+
+        print(f"{'sum of nodes':>20} {total:10.1f}")
+
+        micros, peak = measure(lambda: rag_workflow.invoke(_initial_state(QUESTION, "bench")), args.iterations)
+        print(f"{'graph invoke':>20} {micros:10.1f} {peak / 1024:10.1f}")
+
+        async def ainvoke():
+            await rag_workflow.ainvoke(_initial_state(QUESTION, "bench"))
+
+        loop = asyncio.new_event_loop()
+        micros, peak = measure(lambda: loop.run_until_complete(ainvoke()), args.iterations)
+        loop.close()
+        print(f"{'graph ainvoke':>20} {micros:10.1f} {peak / 1024:10.1f}")
+        print(f"{'framework overhead':>20} {micros - total:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
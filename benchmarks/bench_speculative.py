@@ -0,0 +1,105 @@
+"""
+Latency gain and token waste of speculative generation.
+
+Runs the same queries through the sequential workflow and the speculative one
+(relevance check overlapped with generation). The relevance check is given a
+fixed latency to stand in for an LLM-based check; the chat model streams a
+fixed number of tokens at a fixed rate. A share of queries retrieve
+irrelevant documents, so their speculative generation is cancelled.
+
+    python -m benchmarks.bench_speculative --requests 50 --check-latency 0.3 --irrelevant 0.2
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+from unittest.mock import patch
+
+from langchain.schema import Document
+
+from benchmarks.bench_async_query import StubResponse
+
+
+class StubStreamingModel:
+    """
+    Chat model streaming a fixed number of tokens with a fixed delay each
+    """
+
+    tokens = 50
+    token_latency = 0.01
+
+    def __init__(self, **kwargs):
+        pass
+
+    async def ainvoke(self, messages):
+        await asyncio.sleep(self.tokens * self.token_latency)
+        return StubResponse("token " * self.tokens)
+
+    async def astream(self, messages):
+        for _ in range(self.tokens):
+            await asyncio.sleep(self.token_latency)
+            yield StubResponse("token ")
+
+
+async def run(graph, questions, irrelevant: set) -> list:
+    from app.graph.workflow import _initial_state
+
+    async def search(query, k=5):
+        score = 0.1 if query in irrelevant else 0.9
+        return [(Document(page_content=f"Chunk {i} about {query}", metadata={"source": f"doc{i}.md"}), score) for i in range(k)]
+
+    latencies = []
+    with patch("app.retrieval.vector_store.asimilarity_search_with_score", search):
+        for question in questions:
+            start = time.perf_counter()
+            await graph.ainvoke(_initial_state(question, "bench"))
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--check-latency", type=float, default=0.3, help="seconds per relevance check")
+    parser.add_argument("--tokens", type=int, default=50, help="tokens per generated answer")
+    parser.add_argument("--token-latency", type=float, default=0.01, help="seconds per streamed token")
+    parser.add_argument("--irrelevant", type=float, default=0.2, help="share of queries that end in fallback")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    from app.graph import nodes, workflow
+    from app.metrics import SPECULATIVE_TOKENS
+
+    StubStreamingModel.tokens = args.tokens
+    StubStreamingModel.token_latency = args.token_latency
+
+    check = nodes.arelevance_check_node
+
+    async def slow_check(state):
+        await asyncio.sleep(args.check_latency)
+        return await check(state)
+
+    questions = [f"How do I deploy service {i}?" for i in range(args.requests)]
+    irrelevant = set(questions[:int(len(questions) * args.irrelevant)])
+
+    with patch("app.graph.nodes.get_llm", StubStreamingModel), \
+            patch.object(nodes, "arelevance_check_node", slow_check), \
+            patch.object(workflow, "arelevance_check_node", slow_check):
+        sequential = asyncio.run(run(workflow.create_workflow(speculative=False), questions, irrelevant))
+        speculative = asyncio.run(run(workflow.create_workflow(speculative=True), questions, irrelevant))
+
+    used = SPECULATIVE_TOKENS.labels(outcome="used")._value.get()
+    wasted = SPECULATIVE_TOKENS.labels(outcome="cancelled")._value.get()
+
+    print(f"{'':>12} {'p50 ms':>8} {'p95 ms':>8}")
+    for name, latencies in (("sequential", sequential), ("speculative", speculative)):
+        p95 = statistics.quantiles(latencies, n=20)[-1]
+        print(f"{name:>12} {statistics.median(latencies) * 1000:8.0f} {p95 * 1000:8.0f}")
+
+    print(f"wasted tokens: {int(wasted)} of {int(used + wasted)} ({wasted / max(used + wasted, 1):.1%})")
+
+
+if __name__ == "__main__":
+    main()
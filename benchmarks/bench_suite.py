@@ -0,0 +1,337 @@
+"""
+End-to-end throughput and latency of the service on offline backends.
+
+Ingests sample-docs and a synthetic corpus through POST /ingest, then drives
+POST /query in-process (httpx against the ASGI app, no sockets) at several
+concurrency levels. The LLM and embeddings use the fake and hash backends, so
+no network is needed. Answer and embedding caches and coalescing are off
+unless --with-caches is given, so every query runs the full workflow.
+
+Reports per corpus and concurrency level: p50/p95/p99 latency, QPS, errors
+and mean time per workflow node (from the Prometheus node histograms);
+ingestion throughput; and peak RSS. Results are written as JSON and can be
+compared with an earlier run:
+
+    python -m benchmarks.bench_suite --chunks 10000 --concurrency 1 8 32 --output before.json
+    python -m benchmarks.bench_suite --chunks 10000 --concurrency 1 8 32 --compare before.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import yaml
+
+ROOT = Path(__file__).resolve().parent.parent
+SAMPLE_DOCS = ROOT / "sample-docs"
+
+COMPONENTS = [
+    "api gateway", "ingestion worker", "vector store", "answer cache", "scheduler", "auth service",
+    "metrics exporter", "load balancer", "message queue", "config loader", "session store", "reranker"
+]
+ACTIONS = ["configure", "deploy", "scale", "monitor", "upgrade", "debug", "secure", "restart", "back up", "tune"]
+FEATURES = [
+    "timeouts", "retries", "connection pool", "health checks", "rate limits", "tls certificates",
+    "log level", "replicas", "memory limits", "batch size", "cache ttl", "alerts"
+]
+FILLER = (
+    "The setting is read at startup and can be overridden per environment. "
+    "Changes take effect after a rolling restart of the affected pods. "
+    "Keep the default unless profiling shows a bottleneck in this stage."
+).split()
+
+NODES = [
+    "query_analysis", "retrieval", "relevance_check", "speculative_generation", "extractive_answer",
+    "generation", "source_attribution", "fallback", "clarification"
+]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_synthetic_corpus(directory: Path, chunks: int, seed: int, chunks_per_file: int = 100) -> None:
+    """
+    Markdown files of short paragraphs; the chunker turns each paragraph into about one chunk
+    """
+    rng = random.Random(seed)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    for file_index in range(0, chunks, chunks_per_file):
+        paragraphs = []
+        for _ in range(min(chunks_per_file, chunks - file_index)):
+            component, action, feature = rng.choice(COMPONENTS), rng.choice(ACTIONS), rng.choice(FEATURES)
+            filler = " ".join(rng.choices(FILLER, k=40))
+            paragraphs.append(
+                f"To {action} the {component} {feature}, edit the {component.replace(' ', '_')}.{feature.replace(' ', '_')} "
+                f"key and run `make {action.replace(' ', '-')}`. {filler}."
+            )
+        (directory / f"synthetic-{file_index // chunks_per_file:06d}.md").write_text("\n\n".join(paragraphs))
+
+
+def synthetic_questions(count: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    return [
+        f"How do I {rng.choice(ACTIONS)} the {rng.choice(COMPONENTS)} {rng.choice(FEATURES)}?"
+        for _ in range(count)
+    ]
+
+
+def sample_questions(count: int) -> List[str]:
+    base = [
+        "How do I get started with the assistant?",
+        "What does the system architecture look like?",
+        "How do I configure the vector store?",
+        "How are documents chunked before indexing?",
+        "How do I run the service with docker compose?",
+        "What are the main components of the RAG pipeline?"
+    ]
+    return [base[i % len(base)] for i in range(count)]
+
+
+def offline_config(args, workdir: Path) -> Path:
+    """
+    Copy config.yaml with offline backends and benchmark settings
+    """
+    with open(ROOT / "config" / "config.yaml") as f:
+        config = yaml.safe_load(f)
+
+    config["llm"]["backend"] = "fake"
+    config["llm"]["fake"] = {
+        "answer_tokens": args.answer_tokens,
+        "seed": args.seed,
+        "first_token_latency": {"distribution": "lognormal", "mean_ms": args.first_token_ms, "stddev_ms": args.first_token_ms / 3},
+        "token_latency": {"distribution": "constant", "mean_ms": args.token_ms}
+    }
+    config["embeddings"]["backend"] = "hash"
+    config["embeddings"]["batch_size"] = args.ingest_batch_size
+    config["vector_store"]["persist_directory"] = str(workdir / "chroma")
+    config["embedding_cache"]["path"] = str(workdir / "embedding_cache.sqlite")
+    config["logging"]["level"] = "WARNING"
+
+    if not args.with_caches:
+        config["answer_cache"]["enabled"] = False
+        config["semantic_cache"]["enabled"] = False
+        config["embedding_cache"]["enabled"] = False
+        config["coalescing"]["enabled"] = False
+
+    path = workdir / "config.yaml"
+    with open(path, "w") as f:
+        yaml.safe_dump(config, f)
+    return path
+
+
+async def run_ingest(client, routes, vector_store, docs_directory: Path, persist_directory: Path) -> dict:
+    """
+    Ingest a directory into a fresh Chroma index through POST /ingest
+    """
+    vector_store.CHROMA_PERSIST_DIR = str(persist_directory)
+    vector_store._vector_store = None
+    vector_store._corpus_version = None
+    routes.DOCS_DIRECTORY = str(docs_directory)
+
+    start = time.perf_counter()
+    response = await client.post("/ingest")
+    response.raise_for_status()
+    job_id = response.json()["job_id"]
+
+    while True:
+        status = (await client.get(f"/ingest/{job_id}")).json()
+        if status["status"] not in ("pending", "running"):
+            break
+        await asyncio.sleep(0.1)
+
+    elapsed = time.perf_counter() - start
+    if status["status"] != "completed":
+        raise RuntimeError(f"Ingestion {status['status']}: {status.get('error')}")
+
+    return {
+        "files": status["files_total"],
+        "chunks": status["embeddings_done"],
+        "seconds": round(elapsed, 3),
+        "chunks_per_second": round(status["embeddings_done"] / elapsed, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1)
+    }
+
+
+def node_totals(registry) -> Dict[str, tuple]:
+    totals = {}
+    for node in NODES:
+        count = registry.get_sample_value("rag_node_duration_seconds_count", {"node": node}) or 0.0
+        seconds = registry.get_sample_value("rag_node_duration_seconds_sum", {"node": node}) or 0.0
+        totals[node] = (count, seconds)
+    return totals
+
+
+async def run_queries(client, registry, questions: List[str], concurrency: int) -> dict:
+    """
+    Send the questions to POST /query with at most `concurrency` in flight
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def one(question: str) -> None:
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post("/query", json={"question": question})
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                errors += 1
+
+    before = node_totals(registry)
+    start = time.perf_counter()
+    await asyncio.gather(*(one(question) for question in questions))
+    elapsed = time.perf_counter() - start
+    after = node_totals(registry)
+
+    node_ms = {}
+    for node, (count, seconds) in after.items():
+        calls = count - before[node][0]
+        if calls:
+            node_ms[node] = round((seconds - before[node][1]) / calls * 1000, 3)
+
+    return {
+        "concurrency": concurrency,
+        "requests": len(questions),
+        "errors": errors,
+        "qps": round(len(questions) / elapsed, 2),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 2),
+            "p95": round(percentile(latencies, 95) * 1000, 2),
+            "p99": round(percentile(latencies, 99) * 1000, 2),
+            "mean": round(sum(latencies) / len(latencies) * 1000, 2)
+        },
+        "node_mean_ms": node_ms,
+        "peak_rss_mb": round(peak_rss_mb(), 1)
+    }
+
+
+async def run_suite(args, workdir: Path) -> dict:
+    from httpx import AsyncClient
+    from prometheus_client import REGISTRY
+
+    from app.api import routes
+    from app.main import app
+    from app.retrieval import vector_store
+
+    corpora = {"sample-docs": (SAMPLE_DOCS, sample_questions(args.requests))}
+    if args.chunks:
+        synthetic = workdir / "synthetic"
+        write_synthetic_corpus(synthetic, args.chunks, args.seed)
+        corpora["synthetic"] = (synthetic, synthetic_questions(args.requests, args.seed))
+
+    results = {"ingest": {}, "query": {}}
+
+    async with AsyncClient(app=app, base_url="http://bench", timeout=None) as client:
+        for name, (docs_directory, questions) in corpora.items():
+            print(f"[{name}] ingesting {docs_directory}", flush=True)
+            results["ingest"][name] = await run_ingest(client, routes, vector_store, docs_directory, workdir / f"chroma-{name}")
+            print(f"[{name}] {results['ingest'][name]}", flush=True)
+
+            results["query"][name] = []
+            for concurrency in args.concurrency:
+                level = await run_queries(client, REGISTRY, questions, concurrency)
+                results["query"][name].append(level)
+                latency = level["latency_ms"]
+                print(
+                    f"[{name}] c={concurrency:<4} qps={level['qps']:<8} p50={latency['p50']}ms "
+                    f"p95={latency['p95']}ms p99={latency['p99']}ms errors={level['errors']}",
+                    flush=True
+                )
+
+    results["peak_rss_mb"] = round(peak_rss_mb(), 1)
+    return results
+
+
+def compare(baseline: dict, current: dict) -> None:
+    """
+    Print relative changes in QPS and latency percentiles against a baseline run
+    """
+    print(f"\nvs {baseline.get('commit') or 'baseline'}:")
+    for corpus, levels in current["query"].items():
+        previous = {level["concurrency"]: level for level in baseline.get("query", {}).get(corpus, [])}
+        for level in levels:
+            before = previous.get(level["concurrency"])
+            if before is None:
+                continue
+            changes = [f"qps {(level['qps'] / before['qps'] - 1) * 100:+.1f}%"]
+            for pct in ("p50", "p95", "p99"):
+                changes.append(f"{pct} {(level['latency_ms'][pct] / before['latency_ms'][pct] - 1) * 100:+.1f}%")
+            print(f"  [{corpus}] c={level['concurrency']:<4} " + "  ".join(changes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=10000, help="synthetic corpus size (0 to skip)")
+    parser.add_argument("--requests", type=int, default=200, help="queries per concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--answer-tokens", type=int, default=60)
+    parser.add_argument("--first-token-ms", type=float, default=200.0, help="mean fake LLM time to first token")
+    parser.add_argument("--token-ms", type=float, default=5.0, help="fake LLM time per token")
+    parser.add_argument("--ingest-batch-size", type=int, default=500)
+    parser.add_argument("--with-caches", action="store_true", help="leave answer and embedding caches and coalescing on")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench-results.json")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="rag-bench-") as tmp:
+        workdir = Path(tmp)
+
+        # Must be in place before any app module reads its configuration
+        os.environ["CONFIG_PATH"] = str(offline_config(args, workdir))
+        os.environ["CHROMA_PERSIST_DIR"] = str(workdir / "chroma")
+        logging.basicConfig(level=logging.WARNING)
+        logging.disable(logging.INFO)
+        # chromadb's telemetry client logs an error per event when it can't send
+        logging.getLogger("chromadb.telemetry").setLevel(logging.CRITICAL)
+
+        results = asyncio.run(run_suite(args, workdir))
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": vars(args),
+        **results
+    }
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {args.output} (peak RSS {report['peak_rss_mb']} MB)")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
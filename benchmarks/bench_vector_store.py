@@ -0,0 +1,100 @@
+"""
+Search latency of the in-process NumPy index against Chroma.
+
+Loads the same random unit vectors (with short texts and metadata) into
+both stores, bypassing the embedding model, then times top-k searches by
+precomputed query vector through the calls retrieval makes. It also
+reports load throughput and how long the NumPy index takes to reopen
+from disk.
+
+    python -m benchmarks.bench_vector_store --chunks 10000 100000 --dimensions 384 --queries 200
+"""
+import argparse
+import statistics
+import tempfile
+import time
+
+import numpy as np
+from langchain_community.vectorstores import Chroma
+
+from app.retrieval.numpy_store import NumpyVectorStore
+
+# Chroma rejects larger add() batches
+CHROMA_BATCH = 5000
+
+
+def percentiles(latencies: list) -> tuple:
+    cuts = statistics.quantiles(latencies, n=100)
+    return statistics.median(latencies) * 1000, cuts[94] * 1000, cuts[98] * 1000
+
+
+def time_searches(search, queries: np.ndarray, k: int) -> list:
+    search(queries[0].tolist(), k)
+    latencies = []
+    for query in queries:
+        query = query.tolist()
+        start = time.perf_counter()
+        search(query, k)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--dimensions", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--skip-chroma", action="store_true")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    queries = rng.standard_normal((args.queries, args.dimensions)).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    print(f"{'chunks':>10} {'store':>6} {'load/s':>9} {'open s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for total in args.chunks:
+        vectors = rng.standard_normal((total, args.dimensions)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        ids = [f"chunk-{i}" for i in range(total)]
+        texts = [f"Synthetic chunk {i} about service configuration." for i in range(total)]
+        metadatas = [{"source": f"doc{i // 20}.md"} for i in range(total)]
+
+        with tempfile.TemporaryDirectory() as workdir:
+            store = NumpyVectorStore(f"{workdir}/numpy", embedding_function=None)
+            start = time.perf_counter()
+            for offset in range(0, total, args.batch_size):
+                end = offset + args.batch_size
+                store.add_embeddings(texts[offset:end], vectors[offset:end], metadatas[offset:end], ids[offset:end])
+            load = total / (time.perf_counter() - start)
+
+            start = time.perf_counter()
+            store = NumpyVectorStore(f"{workdir}/numpy", embedding_function=None)
+            reopen = time.perf_counter() - start
+
+            p50, p95, p99 = percentiles(time_searches(store.similarity_search_by_vector_with_relevance_scores, queries, args.k))
+            print(f"{total:>10} {'numpy':>6} {load:>9.0f} {reopen:>7.2f} {p50:>8.3f} {p95:>8.3f} {p99:>8.3f}")
+
+            if args.skip_chroma:
+                continue
+
+            chroma = Chroma(collection_name="bench", embedding_function=None, persist_directory=f"{workdir}/chroma")
+            start = time.perf_counter()
+            for offset in range(0, total, CHROMA_BATCH):
+                end = offset + CHROMA_BATCH
+                chroma._collection.add(
+                    ids=ids[offset:end],
+                    embeddings=vectors[offset:end].tolist(),
+                    documents=texts[offset:end],
+                    metadatas=metadatas[offset:end]
+                )
+            load = total / (time.perf_counter() - start)
+
+            p50, p95, p99 = percentiles(time_searches(chroma.similarity_search_by_vector_with_relevance_scores, queries, args.k))
+            print(f"{total:>10} {'chroma':>6} {load:>9.0f} {'':>7} {p50:>8.3f} {p95:>8.3f} {p99:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
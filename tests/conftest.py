@@ -0,0 +1,25 @@
+"""Shared test fixtures."""
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolated_serving_state(tmp_path, monkeypatch):
+    """Keep process-wide caches and the corpus version file out of the working tree."""
+    monkeypatch.setattr('app.retrieval.vector_store.CHROMA_PERSIST_DIR', str(tmp_path / "chroma"))
+    monkeypatch.setattr('app.retrieval.vector_store._corpus_version', None)
+    monkeypatch.setattr('app.retrieval.vector_store._vocabulary', None)
+    monkeypatch.setattr('app.retrieval.vector_store._bm25_index', None)
+    monkeypatch.setattr('app.cache.answer_cache._answer_cache', None)
+    monkeypatch.setattr('app.graph.singleflight._query_coalescer', None)
+    monkeypatch.setattr('app.cache.semantic_cache._semantic_cache', None)
+    # Semantic caching embeds every question; tests opt in explicitly
+    monkeypatch.setattr('app.graph.workflow.get_semantic_cache', lambda: None)
+    # Likewise the persistent embedding cache
+    monkeypatch.setattr('app.cache.embedding_cache._embedding_cache', None)
+    monkeypatch.setattr('app.retrieval.vector_store.get_embedding_cache', lambda: None)
+    monkeypatch.setattr('app.api.routes.get_embedding_cache', lambda: None)
+    monkeypatch.setattr('app.retrieval.reranker._reranker', None)
+    monkeypatch.setattr('app.retrieval.reranker._rerank_cache', None)
+    monkeypatch.setattr('app.api.admission._admission_controller', None)
+    monkeypatch.setattr('app.memory.session_store._session_store', None)
@@ -0,0 +1,137 @@
+"""Tests for query admission control."""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, patch
+from httpx import AsyncClient
+from app.api.admission import AdmissionController, AdmissionRejected
+from app.main import app
+
+
+class TestAdmissionController:
+    """Tests for AdmissionController queueing and shedding."""
+
+    @pytest.mark.asyncio
+    async def test_queue_full_rejects_with_429(self):
+        """Test requests beyond the queue bound are shed immediately."""
+        controller = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout=5, max_queued_per_session=4)
+        release = await controller.acquire("a")
+        waiter = asyncio.ensure_future(controller.acquire("b"))
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionRejected) as exc:
+            await controller.acquire("c")
+
+        assert exc.value.status_code == 429
+        assert exc.value.retry_after >= 1
+
+        release()
+        (await waiter)()
+        stats = controller.stats()
+        assert stats["in_flight"] == 0
+        assert stats["rejected_queue_full"] == 1
+
+    @pytest.mark.asyncio
+    async def test_handoff_with_zero_wait_keeps_count(self):
+        """Test a queued request handed a slot in the same clock tick is not counted twice."""
+        controller = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout=5, max_queued_per_session=4)
+
+        with patch('app.api.admission.time.monotonic', return_value=100.0):
+            release = await controller.acquire("a")
+            waiter = asyncio.ensure_future(controller.acquire("b"))
+            await asyncio.sleep(0)
+            release()
+            done = await waiter
+
+            assert controller.stats()["in_flight"] == 1
+            done()
+
+        assert controller.stats()["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_wait_timeout_rejects_with_503(self):
+        """Test a request queued past the timeout is shed and dequeued."""
+        controller = AdmissionController(max_in_flight=1, max_queue=4, queue_timeout=0.01, max_queued_per_session=4)
+        release = await controller.acquire("a")
+
+        with pytest.raises(AdmissionRejected) as exc:
+            await controller.acquire("b")
+
+        assert exc.value.status_code == 503
+        assert controller.stats()["queue_depth"] == 0
+
+        release()
+        assert controller.stats()["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_round_robin_across_sessions(self):
+        """Test a session with many queued requests cannot starve another."""
+        controller = AdmissionController(max_in_flight=1, max_queue=10, queue_timeout=5, max_queued_per_session=4)
+        release = await controller.acquire("busy")
+        order = []
+
+        async def request(session_id, label):
+            done = await controller.acquire(session_id)
+            order.append(label)
+            await asyncio.sleep(0)
+            done()
+
+        tasks = [asyncio.ensure_future(request("busy", f"busy{i}")) for i in range(3)]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.ensure_future(request("quiet", "quiet")))
+        await asyncio.sleep(0)
+
+        release()
+        await asyncio.gather(*tasks)
+
+        assert order[:2] == ["busy0", "quiet"]
+        assert controller.stats()["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_per_session_queue_limit(self):
+        """Test one session cannot fill the shared queue."""
+        controller = AdmissionController(max_in_flight=1, max_queue=10, queue_timeout=5, max_queued_per_session=1)
+        release = await controller.acquire("a")
+        waiter = asyncio.ensure_future(controller.acquire("a"))
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionRejected):
+            await controller.acquire("a")
+
+        release()
+        (await waiter)()
+
+    @pytest.mark.asyncio
+    async def test_release_is_idempotent(self):
+        """Test releasing twice frees only one slot."""
+        controller = AdmissionController(max_in_flight=2, max_queue=4, queue_timeout=5, max_queued_per_session=4)
+        release = await controller.acquire("a")
+        await controller.acquire("b")
+
+        release()
+        release()
+
+        assert controller.stats()["in_flight"] == 1
+
+
+class TestQueryAdmission:
+    """Tests for admission control on the /query route."""
+
+    @pytest.mark.asyncio
+    @patch('app.api.routes.aanswer_query', new_callable=AsyncMock)
+    async def test_shed_request_returns_retry_after(self, mock_answer):
+        """Test overloaded /query responds 429 with Retry-After."""
+        controller = AdmissionController(max_in_flight=1, max_queue=0, queue_timeout=5, max_queued_per_session=4)
+        hold = await controller.acquire("other")
+        mock_answer.return_value = {"answer": "ok", "sources": [], "confidence": 1.0}
+
+        with patch('app.api.routes.get_admission_controller', return_value=controller):
+            async with AsyncClient(app=app, base_url="http://test") as client:
+                shed = await client.post("/query", json={"question": "What is RAG?"})
+                hold()
+                served = await client.post("/query", json={"question": "What is RAG?"})
+
+        assert shed.status_code == 429
+        assert int(shed.headers["Retry-After"]) >= 1
+        assert served.status_code == 200
+        assert controller.stats()["in_flight"] == 0
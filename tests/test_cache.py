@@ -0,0 +1,171 @@
+"""Tests for answer caching."""
+
+import pytest
+from unittest.mock import AsyncMock, patch
+from app.cache.answer_cache import AnswerCache, MemoryCacheBackend, SQLiteCacheBackend
+from app.cache.semantic_cache import SemanticCache
+from app.graph.workflow import aanswer_query, asemantic_rag_query
+
+
+RESULT = {
+    "answer": "Use docker build.",
+    "sources": [{"document": "docker.md", "page": None, "relevance_score": 0.9, "excerpt": "docker build"}],
+    "confidence": 0.9,
+    "steps_taken": ["query_analysis", "retrieval", "relevance_check", "generation", "source_attribution"]
+}
+
+
+class TestAnswerCache:
+    """Tests for AnswerCache and its backends."""
+
+    def test_hit_returns_copy(self):
+        """Test hits return equal but independent copies."""
+        cache = AnswerCache(MemoryCacheBackend(max_bytes=10_000), ttl_seconds=60)
+        cache.set("k", RESULT)
+
+        first = cache.get("k")
+        first["answer"] = "mutated"
+
+        assert cache.get("k")["answer"] == "Use docker build."
+        assert cache.stats()["hits"] == 2
+
+    def test_ttl_expiry(self):
+        """Test expired entries count as misses and are removed."""
+        cache = AnswerCache(MemoryCacheBackend(max_bytes=10_000), ttl_seconds=60)
+
+        with patch('app.cache.answer_cache.time.time', return_value=1000.0):
+            cache.set("k", RESULT)
+        with patch('app.cache.answer_cache.time.time', return_value=1061.0):
+            assert cache.get("k") is None
+
+        stats = cache.stats()
+        assert stats["expirations"] == 1
+        assert stats["entries"] == 0
+
+    def test_lru_eviction_by_bytes(self):
+        """Test least recently used entries are evicted past the byte limit."""
+        backend = MemoryCacheBackend(max_bytes=1000)
+        cache = AnswerCache(backend, ttl_seconds=60)
+
+        for key in ("a", "b", "c", "d"):
+            cache.set(key, RESULT)
+            cache.get("a")
+
+        assert backend.size_bytes <= 1000
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+        assert cache.stats()["evictions"] >= 1
+
+    def test_sqlite_backend_survives_restart(self, tmp_path):
+        """Test the on-disk backend keeps entries across instances."""
+        path = str(tmp_path / "answers.sqlite")
+
+        AnswerCache(SQLiteCacheBackend(path, max_bytes=10_000), ttl_seconds=60).set("k", RESULT)
+        reopened = AnswerCache(SQLiteCacheBackend(path, max_bytes=10_000), ttl_seconds=60)
+
+        assert reopened.get("k") == RESULT
+        assert reopened.stats()["size_bytes"] > 0
+
+    def test_sqlite_backend_evicts_by_bytes(self, tmp_path):
+        """Test the on-disk backend stays under its byte limit."""
+        backend = SQLiteCacheBackend(str(tmp_path / "answers.sqlite"), max_bytes=1000)
+        cache = AnswerCache(backend, ttl_seconds=60)
+
+        for key in ("a", "b", "c", "d"):
+            cache.set(key, RESULT)
+
+        assert backend.size_bytes <= 1000
+        assert cache.get("d") == RESULT
+
+
+class TestAnswerQuery:
+    """Tests for the cached query path."""
+
+    @pytest.mark.asyncio
+    @patch('app.graph.workflow.arun_rag_query', new_callable=AsyncMock)
+    async def test_repeat_question_served_from_cache(self, mock_run):
+        """Test a normalized repeat skips the workflow."""
+        mock_run.return_value = dict(RESULT)
+
+        first = await aanswer_query("How do I deploy a docker container?")
+        second = await aanswer_query("how do i deploy a  docker container")
+
+        assert mock_run.await_count == 1
+        assert second["answer"] == first["answer"]
+
+    @pytest.mark.asyncio
+    @patch('app.graph.workflow.arun_rag_query', new_callable=AsyncMock)
+    async def test_corpus_change_invalidates(self, mock_run):
+        """Test adding documents changes the corpus version and misses the cache."""
+        from app.retrieval.vector_store import bump_corpus_version
+
+        mock_run.return_value = dict(RESULT)
+
+        await aanswer_query("How do I deploy a docker container?")
+        bump_corpus_version()
+        await aanswer_query("How do I deploy a docker container?")
+
+        assert mock_run.await_count == 2
+
+    @pytest.mark.asyncio
+    @patch('app.graph.workflow.arun_rag_query', new_callable=AsyncMock)
+    async def test_errors_not_cached(self, mock_run):
+        """Test failed results are never cached."""
+        mock_run.return_value = {"answer": "An error occurred", "error": "boom", "sources": []}
+
+        await aanswer_query("How do I deploy a docker container?")
+        await aanswer_query("How do I deploy a docker container?")
+
+        assert mock_run.await_count == 2
+
+
+class TestSemanticCache:
+    """Tests for the embedding-similarity answer cache."""
+
+    def test_similar_question_hits(self):
+        """Test a nearby embedding returns the cached answer."""
+        cache = SemanticCache(capacity=10, threshold=0.95, ttl_seconds=60)
+        cache.add([1.0, 0.0, 0.0], RESULT, "v1")
+
+        assert cache.lookup([0.99, 0.05, 0.0], "v1")["answer"] == "Use docker build."
+        assert cache.lookup([0.0, 1.0, 0.0], "v1") is None
+        assert cache.stats()["llm_calls_avoided"] == 1
+
+    def test_corpus_version_change_clears(self):
+        """Test entries from an older corpus version are never returned."""
+        cache = SemanticCache(capacity=10, threshold=0.95, ttl_seconds=60)
+        cache.add([1.0, 0.0], RESULT, "v1")
+
+        assert cache.lookup([1.0, 0.0], "v2") is None
+        assert cache.stats()["entries"] == 0
+        assert cache.stats()["resets"] == 1
+
+    def test_evicts_least_recently_used(self):
+        """Test capacity is fixed and the least recently used slot is replaced."""
+        cache = SemanticCache(capacity=2, threshold=0.95, ttl_seconds=60)
+        cache.add([1.0, 0.0, 0.0], {**RESULT, "answer": "a"}, "v1")
+        cache.add([0.0, 1.0, 0.0], {**RESULT, "answer": "b"}, "v1")
+        cache.lookup([1.0, 0.0, 0.0], "v1")
+        cache.add([0.0, 0.0, 1.0], {**RESULT, "answer": "c"}, "v1")
+
+        assert cache.lookup([1.0, 0.0, 0.0], "v1")["answer"] == "a"
+        assert cache.lookup([0.0, 1.0, 0.0], "v1") is None
+        assert cache.stats()["entries"] == 2
+        assert cache.stats()["evictions"] == 1
+
+    @pytest.mark.asyncio
+    @patch('app.graph.workflow.arun_rag_query', new_callable=AsyncMock)
+    @patch('app.retrieval.vector_store.aembed_query', new_callable=AsyncMock)
+    async def test_paraphrase_skips_workflow(self, mock_embed, mock_run):
+        """Test a paraphrase reuses the answer and the embedding feeds retrieval."""
+        cache = SemanticCache(capacity=10, threshold=0.95, ttl_seconds=60)
+        mock_embed.side_effect = [[1.0, 0.0], [0.98, 0.1]]
+        mock_run.return_value = dict(RESULT)
+
+        with patch('app.graph.workflow.get_semantic_cache', return_value=cache):
+            await asemantic_rag_query("How do I deploy a docker container?")
+            second = await asemantic_rag_query("What's the way to deploy docker containers?")
+
+        assert mock_run.await_count == 1
+        assert mock_run.await_args.args[2] == [1.0, 0.0]
+        assert second["answer"] == "Use docker build."
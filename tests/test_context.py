@@ -0,0 +1,87 @@
+"""Tests for token-budgeted context packing."""
+
+import pytest
+from app.graph import context
+from app.graph.context import count_tokens, deduplicate, pack_context
+from app.graph.state import Document
+
+
+@pytest.fixture(autouse=True)
+def estimated_tokens(monkeypatch):
+    """Use the character-based estimate so tests don't need tokenizer files."""
+    monkeypatch.setattr(context, "_get_encoding", lambda: None)
+    count_tokens.cache_clear()
+    yield
+    count_tokens.cache_clear()
+
+
+def doc(content, score, source="docs.md"):
+    return Document(content=content, metadata={"source": source}, relevance_score=score)
+
+
+class TestDeduplicate:
+    """Tests for duplicate chunk removal."""
+
+    def test_exact_duplicates_ignore_case_and_whitespace(self):
+        """Test normalized copies of a chunk are dropped."""
+        docs = [doc("Run docker build.", 0.9), doc("run  docker BUILD.", 0.8)]
+
+        assert deduplicate(docs, threshold=0.9) == docs[:1]
+
+    def test_near_duplicates_dropped(self):
+        """Test chunks differing by a word are treated as duplicates."""
+        base = "the deployment guide explains how to build and push docker images to the registry before rollout"
+        docs = [doc(base, 0.9), doc(base + " today", 0.8), doc("kubernetes manifests live in the deploy folder", 0.7)]
+
+        kept = deduplicate(docs, threshold=0.8)
+
+        assert [d.relevance_score for d in kept] == [0.9, 0.7]
+
+
+class TestPackContext:
+    """Tests for pack_context."""
+
+    def test_nearest_kept_within_budget(self):
+        """Test the nearest documents survive when the budget forces a drop."""
+        # Distances in retrieval order: lower is nearer
+        docs = [doc("a" * 400, 0.2, "near.md"), doc("b" * 400, 0.5, "mid.md"), doc("c" * 400, 0.9, "far.md")]
+
+        text, packed, used = pack_context(docs, budget=250)
+
+        assert [d.metadata["source"] for d in packed] == ["near.md", "mid.md"]
+        assert used <= 250
+        assert text.startswith("Document 1 (Source: near.md)")
+
+    def test_keeps_rerank_order(self):
+        """Test a reranked order is packed as given, not re-sorted on the retrieval distance."""
+        docs = [doc("a" * 400, 0.6, "reranked-first.md"), doc("b" * 400, 0.2, "second.md"), doc("c" * 400, 0.4, "third.md")]
+
+        _, packed, _ = pack_context(docs, budget=250)
+
+        assert [d.metadata["source"] for d in packed] == ["reranked-first.md", "second.md"]
+
+    def test_skips_oversized_chunk_for_smaller_one(self):
+        """Test a chunk that doesn't fit is skipped in favour of a lower-ranked one that does."""
+        docs = [doc("a" * 400, 0.9, "first.md"), doc("b" * 2000, 0.8, "huge.md"), doc("c" * 100, 0.7, "small.md")]
+
+        _, packed, _ = pack_context(docs, budget=200)
+
+        assert [d.metadata["source"] for d in packed] == ["first.md", "small.md"]
+
+    def test_truncates_top_document_when_nothing_fits(self):
+        """Test the best document is truncated rather than dropped."""
+        _, packed, used = pack_context([doc("x" * 4000, 0.9)], budget=100)
+
+        assert len(packed) == 1
+        assert len(packed[0].content) < 4000
+        assert used <= 100
+
+    def test_token_counts_cached(self):
+        """Test repeated chunks are counted once."""
+        docs = [doc("repeated chunk of documentation", 0.9)]
+
+        pack_context(docs, budget=1000)
+        misses = count_tokens.cache_info().misses
+        pack_context(docs, budget=1000)
+
+        assert count_tokens.cache_info().misses == misses
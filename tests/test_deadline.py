@@ -0,0 +1,169 @@
+"""Tests for per-request deadlines and graceful degradation."""
+
+import asyncio
+import time
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+from httpx import AsyncClient
+from app.graph.deadline import DEADLINE_EXCEEDED, FAST_MODEL, make_deadline
+from app.graph.nodes import ageneration_node, aretrieval_node, generation_node, retrieval_node
+from app.graph.state import Document
+from app.main import app
+
+
+def seconds_from_now(seconds):
+    return time.monotonic() + seconds
+
+
+def docs():
+    return [Document(
+        content="Docker images are layered. Use docker build to create a docker image.",
+        metadata={"source": "docker.md"},
+        relevance_score=0.9
+    )]
+
+
+def search_result():
+    mock_doc = Mock()
+    mock_doc.page_content = "Use docker build to create an image."
+    mock_doc.metadata = {"source": "docker.md"}
+    return [(mock_doc, 0.9)]
+
+
+class TestMakeDeadline:
+    """Tests for make_deadline."""
+
+    def test_timeout_capped(self):
+        """Test client timeouts are capped at deadline.max_seconds."""
+        assert make_deadline(10_000) - time.monotonic() <= 120
+
+
+class TestRetrievalDeadline:
+    """Tests for deadline handling in retrieval."""
+
+    @patch('app.retrieval.vector_store.get_vector_store')
+    def test_top_k_reduced_when_short(self, mock_get_store):
+        """Test fewer documents are retrieved close to the deadline."""
+        mock_store = mock_get_store.return_value
+        mock_store.similarity_search_with_score.return_value = search_result()
+
+        result = retrieval_node({"question": "How do I build an image?", "deadline": seconds_from_now(5)})
+
+        mock_store.similarity_search_with_score.assert_called_once_with(query="How do I build an image?", k=2)
+        assert result["degradations"] == ["reduced_top_k"]
+
+    @patch('app.retrieval.vector_store.get_vector_store')
+    def test_no_degradation_with_time_left(self, mock_get_store):
+        """Test a comfortable deadline changes nothing."""
+        mock_get_store.return_value.similarity_search_with_score.return_value = search_result()
+
+        result = retrieval_node({"question": "How do I build an image?", "deadline": seconds_from_now(60)})
+
+        assert "degradations" not in result
+
+    @pytest.mark.asyncio
+    @patch('app.retrieval.vector_store.asimilarity_search_with_score')
+    async def test_timeout_exceeds_deadline(self, mock_search):
+        """Test a search running past the deadline leaves nothing to answer from."""
+        async def slow_search(query, k):
+            await asyncio.sleep(1)
+
+        mock_search.side_effect = slow_search
+
+        result = await aretrieval_node({"question": "How do I build an image?", "deadline": seconds_from_now(0.05)})
+
+        assert result["retrieved_documents"] == []
+        assert result["degradations"] == ["reduced_top_k", "retrieval_timeout", DEADLINE_EXCEEDED]
+
+
+class TestGenerationDeadline:
+    """Tests for deadline handling in generation."""
+
+    @patch('app.graph.nodes.get_llm')
+    def test_fast_model_and_smaller_context_when_short(self, mock_llm):
+        """Test a close deadline switches to the fast model with a reduced context."""
+        mock_llm.return_value.invoke.return_value = Mock(content="Run docker build.")
+
+        result = generation_node({
+            "question": "How do I build an image?",
+            "retrieved_documents": docs(),
+            "deadline": seconds_from_now(4)
+        })
+
+        mock_llm.assert_called_once_with(model=FAST_MODEL)
+        assert result["answer"] == "Run docker build."
+        assert result["degradations"] == ["reduced_context", "fast_model"]
+
+    @patch('app.graph.nodes.get_llm')
+    def test_no_time_for_llm_quotes_documents(self, mock_llm):
+        """Test the LLM is skipped and the documents quoted when almost out of time."""
+        result = generation_node({
+            "question": "How do I build a docker image?",
+            "retrieved_documents": docs(),
+            "deadline": seconds_from_now(1)
+        })
+
+        mock_llm.assert_not_called()
+        assert result["answer"] == "Use docker build to create a docker image."
+        assert result["degradations"] == ["skipped_generation", "extractive_answer"]
+
+    @pytest.mark.asyncio
+    @patch('app.graph.nodes.MIN_GENERATION_SECONDS', 0)
+    @patch('app.graph.nodes.get_llm')
+    async def test_llm_timeout_quotes_documents(self, mock_llm):
+        """Test an LLM call running past the deadline is cancelled and the documents quoted."""
+        async def slow_answer(messages):
+            await asyncio.sleep(1)
+
+        mock_llm.return_value.ainvoke = AsyncMock(side_effect=slow_answer)
+
+        result = await ageneration_node({
+            "question": "How do I build a docker image?",
+            "retrieved_documents": docs(),
+            "deadline": seconds_from_now(0.05)
+        })
+
+        assert result["answer"] == "Use docker build to create a docker image."
+        assert result["degradations"] == [
+            "reduced_context", "fast_model", "generation_timeout", "extractive_answer"
+        ]
+
+
+class TestQueryDeadline:
+    """Tests for deadlines on the /query route."""
+
+    @pytest.mark.asyncio
+    @patch('app.api.routes.aanswer_query', new_callable=AsyncMock)
+    async def test_degradations_in_metadata(self, mock_answer):
+        """Test degradations are reported in the response metadata."""
+        mock_answer.return_value = {
+            "answer": "Run docker build.",
+            "sources": [],
+            "confidence": 0.9,
+            "degradations": ["reduced_top_k", "fast_model"]
+        }
+
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.post("/query", json={"question": "How do I build an image?", "timeout_seconds": 5})
+
+        assert response.status_code == 200
+        assert response.json()["metadata"]["degradations"] == ["reduced_top_k", "fast_model"]
+        deadline = mock_answer.call_args.kwargs["deadline"]
+        assert 0 < deadline - time.monotonic() <= 5
+
+    @pytest.mark.asyncio
+    @patch('app.api.routes.aanswer_query', new_callable=AsyncMock)
+    async def test_nothing_useful_returns_504(self, mock_answer):
+        """Test running out of time with nothing to answer from is a 504."""
+        mock_answer.return_value = {
+            "answer": "",
+            "sources": [],
+            "confidence": 0.0,
+            "error": "Retrieval timed out",
+            "degradations": ["retrieval_timeout", DEADLINE_EXCEEDED]
+        }
+
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.post("/query", json={"question": "How do I build an image?"})
+
+        assert response.status_code == 504
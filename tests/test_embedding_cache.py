@@ -0,0 +1,134 @@
+"""Tests for the persistent embedding cache."""
+
+import numpy as np
+import pytest
+from langchain.schema import Document as LCDocument
+from langchain_core.embeddings import Embeddings
+from app.cache.embedding_cache import CachedEmbeddings, EmbeddingCache, SQLiteEmbeddingStore
+from app.retrieval import vector_store
+
+
+class CountingEmbeddings(Embeddings):
+    """Embeds a text as [length, number of words] and records every text it was sent."""
+
+    def __init__(self):
+        self.calls = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text)), float(len(text.split()))] for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+@pytest.fixture
+def model():
+    return CountingEmbeddings()
+
+
+def cached(model, tmp_path, memory_entries=100):
+    store = SQLiteEmbeddingStore(str(tmp_path / "embeddings.sqlite"), max_entries=1000)
+    return CachedEmbeddings(model, EmbeddingCache(memory_entries, store), "test-model")
+
+
+class TestCachedEmbeddings:
+    """Tests for CachedEmbeddings."""
+
+    def test_only_misses_reach_model(self, model, tmp_path):
+        """Test a batch sends only unseen texts to the model, each once, and keeps order."""
+        embeddings = cached(model, tmp_path)
+        embeddings.embed_documents(["docker build", "kubectl apply"])
+
+        vectors = embeddings.embed_documents(["kubectl apply", "helm install", "docker build", "helm install"])
+
+        assert model.calls == [["docker build", "kubectl apply"], ["helm install"]]
+        assert vectors == [[13.0, 2.0], [12.0, 2.0], [12.0, 2.0], [12.0, 2.0]]
+
+    def test_queries_cached(self, model, tmp_path):
+        """Test a repeated query string is embedded once."""
+        embeddings = cached(model, tmp_path)
+
+        first = embeddings.embed_query("How do I build an image?")
+
+        assert embeddings.embed_query("How do I build an image?") == first
+        assert len(model.calls) == 1
+        assert embeddings.cache.stats()["hit_rate"] == 0.5
+
+    def test_survives_restart(self, model, tmp_path):
+        """Test vectors are read back from disk by a fresh cache."""
+        cached(model, tmp_path).embed_documents(["docker build", "kubectl apply"])
+
+        restarted = cached(model, tmp_path)
+        restarted.embed_documents(["docker build", "kubectl apply"])
+
+        assert len(model.calls) == 1
+        assert restarted.cache.stats()["disk_hits"] == 2
+
+    def test_keyed_on_model(self, model, tmp_path):
+        """Test the same text under another model name is a miss."""
+        embeddings = cached(model, tmp_path)
+        embeddings.embed_query("docker build")
+
+        CachedEmbeddings(model, embeddings.cache, "other-model").embed_query("docker build")
+
+        assert len(model.calls) == 2
+
+    def test_memory_lru_bounded(self, model, tmp_path):
+        """Test the in-memory tier keeps only the most recent vectors."""
+        embeddings = cached(model, tmp_path, memory_entries=2)
+
+        embeddings.embed_documents(["a", "b", "c"])
+
+        assert embeddings.cache.stats()["entries"] == 2
+
+
+class TestSQLiteEmbeddingStore:
+    """Tests for SQLiteEmbeddingStore."""
+
+    def test_oldest_evicted(self, tmp_path):
+        """Test the store drops its oldest vectors beyond max_entries."""
+        store = SQLiteEmbeddingStore(str(tmp_path / "embeddings.sqlite"), max_entries=2)
+        store.put_many({b"a": np.ones(3, dtype=np.float32), b"b": np.ones(3, dtype=np.float32)})
+        store.put_many({b"c": np.zeros(3, dtype=np.float32)})
+
+        assert len(store) == 2
+        assert set(store.get_many([b"a", b"b", b"c"])) == {b"b", b"c"}
+
+    def test_count_tracks_new_keys(self, tmp_path):
+        """Test re-storing known keys does not grow the count."""
+        store = SQLiteEmbeddingStore(str(tmp_path / "embeddings.sqlite"), max_entries=10)
+        store.put_many({b"a": np.ones(3, dtype=np.float32), b"b": np.ones(3, dtype=np.float32)})
+        store.put_many({b"b": np.ones(3, dtype=np.float32), b"c": np.zeros(3, dtype=np.float32)})
+
+        assert len(store) == 3
+        assert len(SQLiteEmbeddingStore(str(tmp_path / "embeddings.sqlite"), max_entries=10)) == 3
+
+    def test_failed_write_rolled_back(self, tmp_path):
+        """Test a write that fails part way leaves the store unchanged and usable."""
+        store = SQLiteEmbeddingStore(str(tmp_path / "embeddings.sqlite"), max_entries=10)
+        store.put_many({b"a": np.ones(3, dtype=np.float32)})
+
+        with pytest.raises(AttributeError):
+            store.put_many({b"b": np.ones(3, dtype=np.float32), b"c": None})
+
+        assert len(store) == 1
+        assert set(store.get_many([b"a", b"b"])) == {b"a"}
+        store.put_many({b"b": np.ones(3, dtype=np.float32)})
+        assert len(store) == 2
+
+
+class TestIngestion:
+    """Tests for the cache on the ingestion path."""
+
+    def test_reingest_does_not_reembed(self, model, tmp_path, monkeypatch):
+        """Test re-adding unchanged chunks is served from the cache."""
+        embeddings = cached(model, tmp_path)
+        monkeypatch.setattr(vector_store, "get_embeddings", lambda: embeddings)
+        monkeypatch.setattr(vector_store, "_vector_store", None)
+        documents = [LCDocument(page_content="Use docker build to create an image.", metadata={"source": "docker.md"})]
+
+        vector_store.add_documents(documents)
+        vector_store.add_documents(documents)
+
+        assert model.calls == [["Use docker build to create an image."]]
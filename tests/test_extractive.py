@@ -0,0 +1,164 @@
+"""Tests for the extractive fast path."""
+
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+from app.graph.extractive import extract_answer, is_lookup_question
+from app.graph.nodes import extractive_answer_node
+from app.graph.state import Document
+from app.graph.workflow import after_extractive, arun_rag_query, should_generate
+
+
+def doc(content, distance, source="docs.md"):
+    # Scores are vector store distances (squared L2): lower is nearer
+    return Document(content=content, metadata={"source": source}, relevance_score=distance)
+
+
+class TestLookupQuestion:
+    """Tests for is_lookup_question."""
+
+    @pytest.mark.parametrize("question", [
+        "What command builds a docker image?",
+        "Which port does the API listen on?",
+        "Where is the config file?",
+        "How do I build a docker image?",
+    ])
+    def test_lookups(self, question):
+        """Test direct fact questions are lookups."""
+        assert is_lookup_question(question)
+
+    @pytest.mark.parametrize("question", [
+        "Why does the build fail on ARM?",
+        "What is the difference between Chroma and FAISS?",
+        "How do I build an image and how do I push it?",
+        "Tell me about deployment",
+        "What are all of the steps needed to configure the service for a production deployment on kubernetes?",
+    ])
+    def test_not_lookups(self, question):
+        """Test open-ended, multi-part and long questions are not lookups."""
+        assert not is_lookup_question(question)
+
+
+class TestExtractAnswer:
+    """Tests for extract_answer."""
+
+    def test_picks_matching_sentence(self):
+        """Test the sentence covering the question keywords is quoted."""
+        docs = [doc(
+            "Docker is a container runtime. Run `docker build -t app .` to build a docker image. "
+            "Images are stored locally.",
+            0.1
+        )]
+
+        answer, quoted = extract_answer("What command builds a docker image?", docs, max_sentences=1)
+
+        assert answer == "Run `docker build -t app .` to build a docker image."
+        assert quoted == docs
+
+    def test_quotes_in_document_order(self):
+        """Test multiple sentences keep their order and cite their chunks."""
+        docs = [
+            doc("The API listens on port 8000 by default.", 0.1, "api.md"),
+            doc("Images are built in CI. The API can listen on another port via API_PORT.", 0.2, "config.md"),
+        ]
+
+        answer, quoted = extract_answer("Which port does the API listen on?", docs, max_sentences=2)
+
+        assert answer == "The API listens on port 8000 by default. The API can listen on another port via API_PORT."
+        assert [d.metadata["source"] for d in quoted] == ["api.md", "config.md"]
+
+    def test_nearest_chunk_ranks_first(self):
+        """Test chunks keep the retrieval order, nearest first, rather than sorting on the distance."""
+        docs = [
+            doc("The API listens on port 8000 by default.", 0.1, "near.md"),
+            doc("The API listens on port 9000 in staging.", 0.9, "far.md"),
+        ]
+
+        answer, quoted = extract_answer("Which port does the API listen on?", docs, max_sentences=1)
+
+        assert answer == "The API listens on port 8000 by default."
+        assert [d.metadata["source"] for d in quoted] == ["near.md"]
+
+    def test_no_match(self):
+        """Test None is returned when no sentence covers the question."""
+        docs = [doc("Kubernetes manifests live in the deploy folder.", 0.1)]
+
+        assert extract_answer("What command builds a docker image?", docs) is None
+
+
+class TestExtractiveRouting:
+    """Tests for the extractive branch of the workflow."""
+
+    @patch('app.graph.workflow.EXTRACTIVE_ENABLED', True)
+    def test_routes_confident_lookup(self):
+        """Test a confident lookup goes to the extractive node."""
+        state = {
+            "question": "What command builds a docker image?",
+            "confidence": 0.9,
+            "retrieved_documents": [doc("Run docker build.", 0.2), doc("Docker images are layered.", 1.2)]
+        }
+
+        assert should_generate(state) == "extractive_answer"
+
+    @patch('app.graph.workflow.EXTRACTIVE_ENABLED', True)
+    def test_low_top_score_generates(self):
+        """Test a lookup whose nearest document is far away still uses the LLM."""
+        state = {
+            "question": "What command builds a docker image?",
+            "confidence": 0.6,
+            "retrieved_documents": [doc("Run docker build.", 0.6)]
+        }
+
+        assert should_generate(state) == "generation"
+
+    @patch('app.graph.workflow.EXTRACTIVE_ENABLED', True)
+    def test_poor_match_generates(self):
+        """Test distance-ordered results whose nearest chunk is a poor match do not skip the LLM."""
+        state = {
+            "question": "What command builds a docker image?",
+            "confidence": 0.9,
+            "retrieved_documents": [doc("Run docker build.", 1.3), doc("Docker images are layered.", 1.6)]
+        }
+
+        assert should_generate(state) == "generation"
+
+    def test_disabled_by_default(self):
+        """Test the branch is off unless enabled in config."""
+        state = {
+            "question": "What command builds a docker image?",
+            "confidence": 0.9,
+            "retrieved_documents": [doc("Run docker build.", 0.1)]
+        }
+
+        assert should_generate(state) == "generation"
+
+    def test_falls_through_without_answer(self):
+        """Test a failed extraction routes to generation."""
+        state = {"question": "What is Chroma?", "retrieved_documents": [doc("Unrelated text here.", 0.1)]}
+
+        update = extractive_answer_node(state)
+
+        assert "answer" not in update
+        assert after_extractive({**state, "answer": ""}) == "generation"
+
+    @pytest.mark.asyncio
+    @patch('app.graph.workflow.EXTRACTIVE_ENABLED', True)
+    @patch('app.graph.nodes.get_llm')
+    @patch('app.retrieval.vector_store.asimilarity_search_with_score', new_callable=AsyncMock)
+    async def test_workflow_skips_llm(self, mock_search, mock_llm):
+        """Test the workflow answers a lookup without calling the LLM."""
+        mock_doc = Mock()
+        mock_doc.page_content = "Docker images are layered. Use docker build to create a docker image."
+        mock_doc.metadata = {"source": "docker.md"}
+        far_doc = Mock()
+        far_doc.page_content = "Kubernetes restarts pods that fail their liveness probe."
+        far_doc.metadata = {"source": "k8s.md"}
+        mock_search.return_value = [(mock_doc, 0.2), (far_doc, 1.1)]
+
+        result = await arun_rag_query("How do I build a docker image?")
+
+        assert result["answer"] == "Use docker build to create a docker image."
+        assert result["steps_taken"] == [
+            "query_analysis", "retrieval", "relevance_check", "extractive_answer", "source_attribution"
+        ]
+        assert result["sources"][0]["document"] == "docker.md"
+        mock_llm.assert_not_called()
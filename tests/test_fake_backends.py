@@ -0,0 +1,153 @@
+"""Tests for the offline fake LLM and hashed embedding backends."""
+
+import random
+import statistics
+import time
+import numpy as np
+import pytest
+from httpx import AsyncClient
+from langchain.schema import Document as LCDocument
+from app.config import get_setting
+from app.llm import client
+from app.llm.fake import FakeChatModel, LatencyDistribution
+from app.retrieval import vector_store
+from app.retrieval.hash_embeddings import HashEmbeddings
+
+
+def with_settings(**overrides):
+    """get_setting with some dotted paths (given with __ for .) overridden."""
+    overrides = {path.replace("__", "."): value for path, value in overrides.items()}
+
+    def lookup(path, default=None):
+        return overrides[path] if path in overrides else get_setting(path, default)
+
+    return lookup
+
+
+class TestLatencyDistribution:
+    """Tests for LatencyDistribution."""
+
+    def test_constant(self):
+        """Test a constant distribution always returns the mean."""
+        assert LatencyDistribution("constant", mean_ms=250).sample() == 0.25
+
+    @pytest.mark.parametrize("distribution", ["uniform", "normal", "lognormal", "exponential"])
+    def test_mean(self, distribution):
+        """Test random distributions are centred on the configured mean."""
+        latency = LatencyDistribution(distribution, mean_ms=100, stddev_ms=30, rng=random.Random(7))
+
+        samples = [latency.sample() for _ in range(5000)]
+
+        assert min(samples) >= 0
+        assert statistics.mean(samples) == pytest.approx(0.1, rel=0.1)
+
+    def test_unknown_distribution(self):
+        """Test a typo in config fails loudly."""
+        with pytest.raises(ValueError):
+            LatencyDistribution("gaussian", mean_ms=100)
+
+
+class TestFakeChatModel:
+    """Tests for FakeChatModel."""
+
+    def test_deterministic_answer(self):
+        """Test the same prompt gets the same answer of the configured length."""
+        llm = FakeChatModel(answer_tokens=5)
+        messages = [{"role": "user", "content": "Context: use docker build to create an image"}]
+
+        first = llm.invoke(messages).content
+
+        assert first == llm.invoke(messages).content
+        assert len(first.split()) == 5
+
+    @pytest.mark.asyncio
+    async def test_stream_matches_invoke(self):
+        """Test streamed tokens add up to the non-streamed answer."""
+        llm = FakeChatModel(answer_tokens=8)
+        messages = [{"role": "user", "content": "How do I deploy the service with docker compose?"}]
+
+        chunks = [chunk.content async for chunk in llm.astream(messages)]
+
+        assert len(chunks) == 8
+        assert "".join(chunks) == (await llm.ainvoke(messages)).content
+
+    @pytest.mark.asyncio
+    async def test_latency(self):
+        """Test time to first token and per-token latency are applied."""
+        llm = FakeChatModel(
+            answer_tokens=5,
+            first_token_latency=LatencyDistribution("constant", mean_ms=50),
+            token_latency=LatencyDistribution("constant", mean_ms=10)
+        )
+
+        start = time.perf_counter()
+        stream = llm.astream([{"role": "user", "content": "hello there"}])
+        await stream.__anext__()
+        first_token = time.perf_counter() - start
+        async for _ in stream:
+            pass
+        total = time.perf_counter() - start
+
+        assert 0.05 <= first_token < 0.09
+        assert total >= 0.09
+
+
+class TestHashEmbeddings:
+    """Tests for HashEmbeddings."""
+
+    def test_deterministic_and_normalized(self):
+        """Test vectors are stable, unit length and of the configured size."""
+        embeddings = HashEmbeddings(dimensions=64)
+
+        vector = embeddings.embed_query("Build the docker image")
+
+        assert vector == HashEmbeddings(dimensions=64).embed_query("Build the docker image")
+        assert len(vector) == 64
+        assert np.linalg.norm(vector) == pytest.approx(1.0)
+
+    def test_shared_words_are_closer(self):
+        """Test texts sharing words score higher than unrelated ones."""
+        embeddings = HashEmbeddings()
+        query, related, unrelated = embeddings.embed_documents([
+            "how do I build a docker image",
+            "use docker build to create an image",
+            "kubernetes pods restart on failure"
+        ])
+
+        assert np.dot(query, related) > np.dot(query, unrelated)
+
+
+class TestOfflineStack:
+    """Tests for running the whole service on the fake backends."""
+
+    @pytest.fixture
+    def offline(self, monkeypatch):
+        settings = with_settings(llm__backend="fake", llm__fake__answer_tokens=6, embeddings__backend="hash")
+        monkeypatch.setattr(client, "get_setting", settings)
+        monkeypatch.setattr(client, "_llms", {})
+        monkeypatch.setattr(vector_store, "get_setting", settings)
+        monkeypatch.setattr(vector_store, "_vector_store", None)
+
+    def test_backends_selected_by_config(self, offline):
+        """Test get_llm and get_embeddings honour the backend settings."""
+        assert isinstance(client.get_llm(), FakeChatModel)
+        assert client.get_llm() is client.get_llm()
+        assert isinstance(vector_store.get_embeddings().embeddings, HashEmbeddings)
+
+    @pytest.mark.asyncio
+    async def test_query_without_network(self, offline):
+        """Test /query answers from a real Chroma index with no OpenAI access."""
+        from app.main import app
+
+        vector_store.add_documents([
+            LCDocument(page_content="Use docker build to create a docker image.", metadata={"source": "docker.md"}),
+            LCDocument(page_content="Pods restart automatically on failure.", metadata={"source": "k8s.md"})
+        ])
+
+        async with AsyncClient(app=app, base_url="http://test") as http:
+            response = await http.post("/query", json={"question": "How do I build a docker image?"})
+
+        body = response.json()
+        assert response.status_code == 200
+        assert len(body["answer"].split()) == 6
+        assert body["sources"][0]["document"] == "docker.md"
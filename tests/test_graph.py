@@ -1,8 +1,13 @@
 """Tests for LangGraph workflow."""
 
 import pytest
-from unittest.mock import Mock, patch, MagicMock
-from app.graph.state import GraphState
+from unittest.mock import Mock, patch, MagicMock, AsyncMock
+import asyncio
+import time
+from app.graph.state import GraphState, Document
+from httpx import AsyncClient
+from app.graph.deadline import DEADLINE_EXCEEDED
+from app.graph.singleflight import SingleFlight, query_key
 from app.graph.nodes import (
     query_analysis_node,
     retrieval_node,
@@ -10,9 +15,20 @@ from app.graph.nodes import (
     generation_node,
     source_attribution_node,
     fallback_node,
-    clarification_node
+    clarification_node,
+    aretrieval_node,
+    ageneration_node
 )
-from app.graph.workflow import create_workflow, should_retrieve, should_generate
+from app.graph.workflow import (
+    create_workflow,
+    should_retrieve,
+    should_generate,
+    arun_rag_query,
+    arun_rag_batch,
+    astream_rag_query,
+    acoalesced_rag_query
+)
+from app.main import app
 
 
 class TestGraphState:
@@ -41,7 +57,7 @@ class TestGraphState:
 class TestQueryAnalysisNode:
     """Tests for query analysis node."""
 
-    @patch('app.graph.nodes.ChatOpenAI')
+    @patch('app.graph.nodes.get_llm')
     def test_simple_question_needs_retrieval(self, mock_llm):
         """Test that factual questions trigger retrieval."""
         mock_response = Mock()
@@ -64,7 +80,7 @@ class TestQueryAnalysisNode:
         result = query_analysis_node(state)
         assert result.get("needs_retrieval", state["needs_retrieval"]) is True
 
-    @patch('app.graph.nodes.ChatOpenAI')
+    @patch('app.graph.nodes.get_llm')
     def test_vague_question_needs_clarification(self, mock_llm):
         """Test that vague questions trigger clarification."""
         mock_response = Mock()
@@ -197,7 +213,7 @@ class TestRelevanceCheckNode:
 class TestGenerationNode:
     """Tests for generation node."""
 
-    @patch('app.graph.nodes.ChatOpenAI')
+    @patch('app.graph.nodes.get_llm')
     def test_generation_with_context(self, mock_llm):
         """Test generation with retrieved context."""
         mock_response = Mock()
@@ -328,8 +344,10 @@ class TestSourceAttributionNode:
 
         result = source_attribution_node(state)
 
+        # Nodes return only the keys they set; confidence belongs to relevance_check
         assert "sources" in result
-        assert "confidence" in result
+        assert "confidence" not in result
+        assert result["steps_taken"] == ["source_attribution"]
 
 
 class TestFallbackNode:
@@ -383,6 +401,255 @@ class TestClarificationNode:
         assert "?" in result["answer"] or "clarif" in result["answer"].lower()
 
 
+class TestAsyncNodes:
+    """Tests for the async query path."""
+
+    @pytest.mark.asyncio
+    @patch('app.retrieval.vector_store.asimilarity_search_with_score', new_callable=AsyncMock)
+    async def test_aretrieval_returns_documents(self, mock_search, sample_state):
+        """Test that async retrieval awaits the executor-backed search."""
+        mock_doc = Mock()
+        mock_doc.page_content = "LangGraph is a library for building stateful agents."
+        mock_doc.metadata = {"source": "docs.md"}
+        mock_search.return_value = [(mock_doc, 0.85)]
+
+        result = await aretrieval_node(sample_state)
+
+        mock_search.assert_awaited_once_with("What is LangGraph?", k=5)
+        assert len(result["retrieved_documents"]) == 1
+        assert result["retrieved_documents"][0].relevance_score == 0.85
+
+    @pytest.mark.asyncio
+    @patch('app.graph.nodes.get_llm')
+    async def test_ageneration_awaits_llm(self, mock_llm, sample_state):
+        """Test that async generation uses ainvoke instead of invoke."""
+        mock_response = Mock()
+        mock_response.content = "LangGraph is a library for building agents."
+        mock_llm.return_value.ainvoke = AsyncMock(return_value=mock_response)
+
+        sample_state["retrieved_documents"] = [
+            Document(content="LangGraph docs", metadata={"source": "docs.md"}, relevance_score=0.9)
+        ]
+
+        result = await ageneration_node(sample_state)
+
+        assert result["answer"] == "LangGraph is a library for building agents."
+        mock_llm.return_value.invoke.assert_not_called()
+
+    @pytest.mark.asyncio
+    @patch('app.graph.nodes.get_llm')
+    @patch('app.retrieval.vector_store.asimilarity_search_with_score', new_callable=AsyncMock)
+    async def test_arun_rag_query(self, mock_search, mock_llm):
+        """Test the full async workflow end to end."""
+        mock_doc = Mock()
+        mock_doc.page_content = "Use docker build to create an image."
+        mock_doc.metadata = {"source": "docker.md"}
+        mock_search.return_value = [(mock_doc, 0.9)]
+
+        mock_response = Mock()
+        mock_response.content = "Run docker build."
+        mock_llm.return_value.ainvoke = AsyncMock(return_value=mock_response)
+
+        result = await arun_rag_query("How do I build a docker image?")
+
+        assert result["answer"] == "Run docker build."
+        assert result["steps_taken"] == [
+            "query_analysis", "retrieval", "relevance_check", "generation", "source_attribution"
+        ]
+        assert result["sources"][0]["document"] == "docker.md"
+
+
+class TestStreamingQuery:
+    """Tests for the streaming query path."""
+
+    @pytest.mark.asyncio
+    @patch('app.graph.nodes.get_llm')
+    @patch('app.retrieval.vector_store.asimilarity_search_with_score', new_callable=AsyncMock)
+    async def test_stream_events_in_order(self, mock_search, mock_llm):
+        """Test progress, token and final events are emitted in order."""
+        mock_doc = Mock()
+        mock_doc.page_content = "Use docker build to create an image."
+        mock_doc.metadata = {"source": "docker.md"}
+        mock_search.return_value = [(mock_doc, 0.9)]
+
+        async def fake_astream(messages):
+            for token in ["Run ", "docker ", "build."]:
+                yield Mock(content=token)
+
+        mock_llm.return_value.astream = fake_astream
+
+        events = [event async for event in astream_rag_query("How do I build a docker image?")]
+        kinds = [event["event"] for event in events]
+
+        assert kinds[0] == "progress"
+        assert [e["data"]["token"] for e in events if e["event"] == "token"] == ["Run ", "docker ", "build."]
+        assert kinds.index("token") < kinds.index("final")
+        assert kinds[-1] == "final"
+
+        final = events[-1]["data"]
+        assert final["result"]["answer"] == "Run docker build."
+        assert final["timings"]["time_to_first_token_ms"] <= final["timings"]["total_ms"]
+
+    @pytest.mark.asyncio
+    async def test_stream_without_tokens(self):
+        """Test clarification path finishes with no time to first token."""
+        events = [event async for event in astream_rag_query("Help")]
+
+        assert not any(event["event"] == "token" for event in events)
+        assert events[-1]["data"]["timings"]["time_to_first_token_ms"] is None
+
+
+class TestBatchQuery:
+    """Tests for batched query execution."""
+
+    @pytest.mark.asyncio
+    @patch('app.graph.nodes.get_llm')
+    @patch('app.retrieval.vector_store.asimilarity_search_by_vector_with_score', new_callable=AsyncMock)
+    @patch('app.retrieval.vector_store.aembed_queries', new_callable=AsyncMock)
+    async def test_batch_embeds_once_and_keeps_order(self, mock_embed, mock_search, mock_llm):
+        """Test questions share one embedding call and results keep input order."""
+        questions = ["How do I build images?", "How do I run containers?", "How do I scale pods?"]
+        mock_embed.return_value = [[float(i)] for i in range(len(questions))]
+
+        mock_doc = Mock()
+        mock_doc.page_content = "Container docs"
+        mock_doc.metadata = {"source": "docker.md"}
+        mock_search.return_value = [(mock_doc, 0.9)]
+
+        async def fake_ainvoke(messages):
+            return Mock(content=messages[-1]["content"].split("Question: ")[1].split("\n")[0])
+
+        mock_llm.return_value.ainvoke = fake_ainvoke
+
+        results = await arun_rag_batch(questions, max_concurrency=2)
+
+        mock_embed.assert_awaited_once_with(questions)
+        assert [r["answer"] for r in results] == questions
+        searched = sorted(call.args[0] for call in mock_search.await_args_list)
+        assert searched == [[0.0], [1.0], [2.0]]
+
+    @pytest.mark.asyncio
+    @patch('app.graph.workflow.arun_rag_query', new_callable=AsyncMock)
+    @patch('app.retrieval.vector_store.aembed_queries', new_callable=AsyncMock)
+    async def test_batch_reports_per_item_errors(self, mock_embed, mock_run):
+        """Test a failing question does not fail the whole batch."""
+        mock_embed.return_value = [[0.1], [0.2]]
+        mock_run.side_effect = [{"answer": "ok", "sources": []}, RuntimeError("boom")]
+
+        results = await arun_rag_batch(["first question here", "second question here"])
+
+        assert results[0]["answer"] == "ok"
+        assert results[1]["error"] == "boom"
+
+    @pytest.mark.asyncio
+    @patch('app.api.routes.arun_rag_batch', new_callable=AsyncMock)
+    async def test_route_caps_max_concurrency(self, mock_batch):
+        """Test a client cannot raise the batch concurrency above batch.max_concurrency."""
+        mock_batch.return_value = [{"answer": "ok", "sources": [], "confidence": 1.0}]
+
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.post("/query/batch", json={"questions": ["What is RAG?"], "max_concurrency": 10000})
+
+        assert response.status_code == 200
+        assert mock_batch.call_args.kwargs["max_concurrency"] == 8
+
+
+class TestQueryCoalescing:
+    """Tests for single-flight coalescing of identical queries."""
+
+    def test_query_key_normalizes_question(self):
+        """Test case, whitespace and trailing punctuation do not change the key."""
+        assert query_key("How do I deploy?", k=5) == query_key("  how do  I deploy ", k=5)
+        assert query_key("How do I deploy?", k=5) != query_key("How do I deploy?", k=3)
+
+    @pytest.mark.asyncio
+    async def test_duplicates_share_one_execution(self):
+        """Test concurrent duplicates wait for one execution and get copies."""
+        flight = SingleFlight()
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"answer": "shared", "sources": []}
+
+        results = await asyncio.gather(*(flight.do("key", work) for _ in range(5)))
+
+        assert calls == 1
+        assert all(r == {"answer": "shared", "sources": []} for r in results)
+        assert len({id(r) for r in results}) == 5
+        assert flight.stats() == {"executed": 1, "coalesced": 4, "in_flight": 0}
+
+    @pytest.mark.asyncio
+    async def test_leader_cancel_does_not_cancel_followers(self):
+        """Test a disconnected first caller leaves the shared work running."""
+        flight = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.02)
+            return "done"
+
+        leader = asyncio.ensure_future(flight.do("key", work))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.do("key", work))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        assert await follower == "done"
+
+    @pytest.mark.asyncio
+    async def test_errors_reach_every_waiter(self):
+        """Test a failed execution raises for all coalesced callers."""
+        flight = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("boom")
+
+        results = await asyncio.gather(
+            flight.do("key", work), flight.do("key", work), return_exceptions=True
+        )
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert flight.stats()["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_follower_timeout_leaves_leader_running(self):
+        """Test a follower gives up at its timeout while the leader gets the result."""
+        flight = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.05)
+            return "done"
+
+        leader = asyncio.ensure_future(flight.do("key", work, timeout=0.01))
+        await asyncio.sleep(0)
+
+        with pytest.raises(asyncio.TimeoutError):
+            await flight.do("key", work, timeout=0.01)
+        assert await leader == "done"
+
+    @pytest.mark.asyncio
+    @patch('app.graph.workflow.asemantic_rag_query', new_callable=AsyncMock)
+    async def test_follower_bounded_by_own_deadline(self, mock_query):
+        """Test a follower with a shorter deadline than the leader times out on its own."""
+        async def slow_query(*args):
+            await asyncio.sleep(0.1)
+            return {"answer": "Run docker build.", "sources": [], "confidence": 0.9}
+
+        mock_query.side_effect = slow_query
+
+        leader = asyncio.ensure_future(acoalesced_rag_query("How do I build?", deadline=time.monotonic() + 5))
+        await asyncio.sleep(0)
+        follower = await acoalesced_rag_query("How do I build?", deadline=time.monotonic() + 0.01)
+
+        assert DEADLINE_EXCEEDED in follower["degradations"]
+        assert follower["answer"] == ""
+        assert (await leader)["answer"] == "Run docker build."
+        assert mock_query.await_count == 1
+
+
 @pytest.fixture
 def sample_state() -> GraphState:
     """Provide a sample state for testing."""
@@ -0,0 +1,128 @@
+"""Tests for BM25 keyword search and hybrid retrieval."""
+
+import pytest
+from unittest.mock import patch
+from langchain.schema import Document as LCDocument
+from app.graph.nodes import retrieval_node
+from app.retrieval import vector_store
+from app.retrieval.bm25 import BM25Index, tokenize
+from app.retrieval.hash_embeddings import HashEmbeddings
+from app.retrieval.hybrid import hybrid_search, weighted_fusion
+
+CHUNKS = [
+    "Use docker build to create an image from a Dockerfile.",
+    "Pass --no-cache to docker build to ignore the layer cache.",
+    "The gateway returns ERR_CONN_RESET when the upstream closes the connection.",
+    "Kubernetes restarts pods that fail their liveness probe.",
+    "Images are pushed to the registry with docker push."
+]
+
+
+def doc(content, source="docs.md"):
+    return LCDocument(page_content=content, metadata={"source": source})
+
+
+class TestTokenize:
+    """Tests for tokenize."""
+
+    def test_identifiers_kept_whole_and_split(self):
+        """Test flags and identifiers match exactly and by their parts."""
+        tokens = tokenize("Run docker-compose.yml with --no-cache after ERR_CONN_RESET")
+
+        assert {"docker-compose.yml", "--no-cache", "err_conn_reset"} <= set(tokens)
+        assert {"docker", "compose", "yml", "cache", "conn", "reset"} <= set(tokens)
+        assert "with" not in tokens
+
+    def test_words_stemmed(self):
+        """Test plain words are stemmed like the rest of retrieval."""
+        assert tokenize("building images") == ["build", "image"]
+
+
+class TestBM25Index:
+    """Tests for BM25Index."""
+
+    def test_rare_exact_term_ranks_first(self):
+        """Test a chunk with a rare identifier outranks chunks sharing common words."""
+        index = BM25Index()
+        index.add([f"id{i}" for i in range(len(CHUNKS))], CHUNKS)
+
+        results = index.search("docker build --no-cache", k=3)
+
+        assert results[0][0] == "id1"
+        assert [score for _, score in results] == sorted((score for _, score in results), reverse=True)
+
+    def test_unknown_terms(self):
+        """Test queries with no indexed terms (or an empty index) find nothing."""
+        index = BM25Index()
+        assert index.search("docker") == []
+
+        index.add(["id0"], CHUNKS[:1])
+        assert index.search("terraform") == []
+
+    def test_incremental_and_persisted(self, tmp_path):
+        """Test chunks added in batches are searchable and reloaded from the log."""
+        path = str(tmp_path / "bm25.log")
+        index = BM25Index(path)
+        index.add(["id0", "id1"], CHUNKS[:2])
+        index.add(["id2"], CHUNKS[2:3])
+
+        reloaded = BM25Index(path)
+
+        assert len(reloaded) == 3
+        assert reloaded.search("ERR_CONN_RESET", k=1) == index.search("ERR_CONN_RESET", k=1)
+        assert reloaded.search("ERR_CONN_RESET", k=1)[0][0] == "id2"
+
+
+class TestWeightedFusion:
+    """Tests for weighted_fusion."""
+
+    def test_weights_and_scores(self):
+        """Test the weighted sum orders chunks and the vector store's score is kept."""
+        semantic, both, keyword = doc("semantic only"), doc("in both"), doc("keyword only")
+
+        fused = weighted_fusion(
+            [(semantic, 0.2), (both, 0.3)],
+            [(keyword, 12.0, 0.6), (both, 6.0, 0.3)],
+            top_k=3,
+            keyword_weight=0.3,
+            semantic_weight=0.7
+        )
+
+        # similarity 1 - d/2: keyword 0.49 + 0.3, both 0.595 + 0.15, semantic 0.63
+        assert [(d.page_content, score) for d, score in fused] == [
+            ("keyword only", 0.6), ("in both", 0.3), ("semantic only", 0.2)
+        ]
+
+
+class TestHybridSearch:
+    """Tests for hybrid search over a real Chroma index."""
+
+    @pytest.fixture
+    def store(self, monkeypatch):
+        monkeypatch.setattr(vector_store, "get_embeddings", lambda: HashEmbeddings(dimensions=64))
+        monkeypatch.setattr(vector_store, "_vector_store", None)
+        vector_store.add_documents([doc(text, f"doc{i}.md") for i, text in enumerate(CHUNKS)])
+
+    def test_exact_identifier_found(self, store):
+        """Test an error code is retrieved first, scored as vector search would score it."""
+        results = hybrid_search("what does ERR_CONN_RESET mean", k=2)
+
+        top, score = results[0]
+        assert top.metadata["source"] == "doc2.md"
+
+        embedding = vector_store.embed_query("what does ERR_CONN_RESET mean")
+        dense = vector_store.similarity_search_by_vector_with_score(embedding, k=len(CHUNKS))
+        assert score == pytest.approx(dict((d.metadata["source"], s) for d, s in dense)["doc2.md"], abs=1e-4)
+
+    def test_cleared_with_store(self, store):
+        """Test clearing the vector store empties the keyword index."""
+        vector_store.clear_vector_store()
+
+        assert len(vector_store.get_bm25_index()) == 0
+
+    @patch('app.graph.nodes.HYBRID_SEARCH_ENABLED', True)
+    def test_retrieval_node(self, store):
+        """Test the retrieval node uses hybrid search when enabled."""
+        result = retrieval_node({"question": "How do I skip the cache with --no-cache?"})
+
+        assert result["retrieved_documents"][0].metadata["source"] == "doc1.md"
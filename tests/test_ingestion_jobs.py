@@ -0,0 +1,94 @@
+"""Tests for background ingestion jobs."""
+
+import threading
+import time
+import pytest
+from unittest.mock import patch
+from app.ingestion.jobs import (
+    IngestJobManager,
+    IngestJobConflict,
+    COMPLETED,
+    CANCELLED,
+    ACTIVE_STATUSES
+)
+
+
+def wait_for(job, timeout: float = 5.0):
+    """Wait until a job leaves the pending/running states."""
+    deadline = time.monotonic() + timeout
+    while job.status in ACTIVE_STATUSES and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return job
+
+
+@pytest.fixture
+def docs_dir(tmp_path):
+    """Directory with a few markdown files."""
+    for i in range(3):
+        (tmp_path / f"doc{i}.md").write_text(f"# Document {i}\n\n" + "Container content. " * 100)
+    return str(tmp_path)
+
+
+class TestIngestJobManager:
+    """Tests for IngestJobManager."""
+
+    @patch('app.retrieval.vector_store.add_documents')
+    def test_job_reports_progress(self, mock_add, docs_dir):
+        """Test a completed job reports files, chunks and embeddings."""
+        manager = IngestJobManager()
+
+        job = wait_for(manager.submit("docs", docs_dir))
+
+        assert job.status == COMPLETED
+        assert job.files_total == 3
+        assert job.files_scanned == 3
+        assert job.chunks_created > 3
+        assert job.embeddings_done == job.chunks_created
+        assert job.to_dict()["throughput_chunks_per_sec"] > 0
+        assert mock_add.called
+
+    @patch('app.retrieval.vector_store.add_documents')
+    def test_one_active_job_per_collection(self, mock_add, docs_dir):
+        """Test a second job for the same collection is rejected while one runs."""
+        release = threading.Event()
+        mock_add.side_effect = lambda docs: release.wait(5)
+        manager = IngestJobManager()
+
+        first = manager.submit("docs", docs_dir)
+        with pytest.raises(IngestJobConflict) as exc:
+            manager.submit("docs", docs_dir)
+        assert exc.value.job_id == first.job_id
+
+        # Other collections are independent
+        other = manager.submit("other", docs_dir)
+
+        release.set()
+        wait_for(first)
+        wait_for(other)
+
+        # Once finished, a new job can start
+        wait_for(manager.submit("docs", docs_dir))
+
+    @patch('app.retrieval.vector_store.add_documents')
+    def test_cancel_stops_between_batches(self, mock_add, docs_dir):
+        """Test cancellation stops the job before the next batch."""
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_add(docs):
+            started.set()
+            release.wait(5)
+
+        mock_add.side_effect = slow_add
+        manager = IngestJobManager()
+
+        with patch('app.ingestion.jobs.get_setting', return_value=1):
+            job = manager.submit("docs", docs_dir)
+            assert started.wait(5)
+            manager.cancel(job.job_id)
+            release.set()
+            wait_for(job)
+
+        assert job.status == CANCELLED
+        assert job.embeddings_done < job.chunks_created
+        assert manager.get(job.job_id) is job
@@ -0,0 +1,148 @@
+"""Tests for the local intent router."""
+
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+from app.graph.intent import CLOSING, FOLLOW_UP, GREETING, META, QUESTION, VAGUE, classify_intent
+from app.graph.nodes import query_analysis_node
+from app.graph.workflow import arun_rag_query, should_retrieve
+from app.retrieval import vector_store
+from app.retrieval.vocabulary import CorpusVocabulary
+
+HISTORY = [
+    {"role": "user", "content": "How do I build a docker image?"},
+    {"role": "assistant", "content": "Run docker build in the directory with the Dockerfile."}
+]
+
+
+@pytest.fixture
+def corpus():
+    vector_store.get_corpus_vocabulary().add_texts([
+        "Use docker build to create an image.",
+        "kubectl rollout restarts the deployment."
+    ])
+
+
+class TestClassifyIntent:
+    """Tests for classify_intent."""
+
+    @pytest.mark.parametrize("question, intent", [
+        ("hi", GREETING),
+        ("Hello there!", GREETING),
+        ("good morning", GREETING),
+        ("thanks!", CLOSING),
+        ("Great, thank you so much", CLOSING),
+        ("bye", CLOSING),
+        ("What can you do?", META),
+        ("help", META),
+        ("How do I use this?", META),
+    ])
+    def test_trivial_intents(self, question, intent):
+        """Test greetings, closings and meta questions are recognized."""
+        assert classify_intent(question) == intent
+
+    @pytest.mark.parametrize("question", [
+        "Hi, how do I build a docker image?",
+        "Thanks, and how do I push it to the registry?",
+        "What do you know about docker volumes?",
+        "How do I use environment variables in compose?",
+    ])
+    def test_questions_are_not_chit_chat(self, question):
+        """Test a greeting or meta phrase with a real question attached is still a question."""
+        assert classify_intent(question) == QUESTION
+
+    @pytest.mark.parametrize("question", ["Can you explain that more simply?", "tl;dr", "what do you mean?"])
+    def test_follow_up_needs_history(self, question):
+        """Test restating requests are follow-ups only when there is something to restate."""
+        assert classify_intent(question, HISTORY) == FOLLOW_UP
+        assert classify_intent(question) == VAGUE
+
+    def test_short_question_without_corpus_terms_is_vague(self, corpus):
+        """Test short questions about nothing in the corpus ask for clarification."""
+        assert classify_intent("something broken") == VAGUE
+
+    def test_short_question_with_corpus_terms(self, corpus):
+        """Test short questions naming something in the corpus are searched."""
+        assert classify_intent("kubectl rollout?") == QUESTION
+        assert classify_intent("docker images") == QUESTION
+
+    def test_short_follow_up_is_searched(self):
+        """Test short follow-ups ride on the previous question as before."""
+        assert classify_intent("and podman?", HISTORY) == QUESTION
+
+
+class TestCorpusVocabulary:
+    """Tests for CorpusVocabulary."""
+
+    def test_persisted(self, tmp_path):
+        """Test terms survive a restart and are only appended once."""
+        path = str(tmp_path / "vocabulary.txt")
+
+        assert CorpusVocabulary(path).add_texts(["Building images with docker"]) == 3
+        reloaded = CorpusVocabulary(path)
+
+        assert "build" in reloaded and "image" in reloaded and "with" not in reloaded
+        assert reloaded.add_texts(["docker builds"]) == 0
+
+    def test_tracks_index(self, monkeypatch):
+        """Test add_documents extends the vocabulary and clearing the store resets it."""
+        mock_store = Mock()
+        monkeypatch.setattr(vector_store, "_vector_store", mock_store)
+
+        vector_store.add_documents([Mock(page_content="Helm charts package deployments.")])
+        assert vector_store.get_corpus_vocabulary().mentions("helm?")
+
+        vector_store.clear_vector_store()
+        assert len(vector_store.get_corpus_vocabulary()) == 0
+
+
+class TestIntentRouting:
+    """Tests for routing on the classified intent."""
+
+    @patch('app.graph.nodes.INTENT_ROUTER_ENABLED', True)
+    def test_query_analysis(self):
+        """Test query analysis sets the intent and what it needs."""
+        greeting = query_analysis_node({"question": "hello"})
+        follow_up = query_analysis_node({"question": "Can you summarize that?", "chat_history": HISTORY})
+
+        assert greeting["intent"] == GREETING
+        assert greeting["needs_retrieval"] is False and greeting["needs_clarification"] is False
+        assert should_retrieve(greeting) == "canned_response"
+        assert follow_up["needs_retrieval"] is False
+        assert should_retrieve(follow_up) == "generation"
+
+    def test_disabled_by_default(self):
+        """Test query analysis keeps the word-count heuristic unless enabled in config."""
+        result = query_analysis_node({"question": "hello"})
+
+        assert "intent" not in result
+        assert result["needs_clarification"] is True
+
+    @pytest.mark.asyncio
+    @patch('app.graph.nodes.INTENT_ROUTER_ENABLED', True)
+    @patch('app.graph.nodes.get_llm')
+    @patch('app.retrieval.vector_store.asimilarity_search_with_score', new_callable=AsyncMock)
+    async def test_greeting_skips_retrieval_and_llm(self, mock_search, mock_llm):
+        """Test a greeting is answered without a search or a model call."""
+        result = await arun_rag_query("Hi there!")
+
+        assert result["steps_taken"] == ["query_analysis", "canned_response"]
+        assert result["answer"].startswith("Hello!")
+        mock_search.assert_not_called()
+        mock_llm.assert_not_called()
+
+    @pytest.mark.asyncio
+    @patch('app.graph.nodes.INTENT_ROUTER_ENABLED', True)
+    @patch('app.graph.nodes.get_llm')
+    @patch('app.retrieval.vector_store.asimilarity_search_with_score', new_callable=AsyncMock)
+    async def test_follow_up_generates_from_history(self, mock_search, mock_llm):
+        """Test a restating follow-up goes straight to generation with the conversation."""
+        mock_llm.return_value.ainvoke = AsyncMock(return_value=Mock(content="Use docker build."))
+
+        result = await arun_rag_query("Make it shorter please", chat_history=HISTORY)
+
+        assert result["answer"] == "Use docker build."
+        assert result["steps_taken"] == ["query_analysis", "generation", "source_attribution"]
+        mock_search.assert_not_called()
+        messages = mock_llm.return_value.ainvoke.call_args.args[0]
+        assert messages[1:3] == HISTORY
+        assert "Context:" not in messages[-1]["content"]
@@ -0,0 +1,45 @@
+"""Tests for the shared LLM client registry."""
+
+import pytest
+from app.llm import client
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry(monkeypatch):
+    """Start each test with an empty registry and a dummy API key."""
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(client, "_openai_clients", None)
+    monkeypatch.setattr(client, "_llms", {})
+
+
+class TestLLMRegistry:
+    """Tests for get_llm."""
+
+    def test_same_config_reuses_instance(self):
+        """Test repeated calls return one shared client."""
+        assert client.get_llm() is client.get_llm()
+
+    def test_defaults_from_config(self):
+        """Test model and sampling settings come from config.yaml."""
+        llm = client.get_llm()
+
+        assert llm.model_name == "gpt-4-turbo-preview"
+        assert llm.temperature == 0.1
+        assert llm.max_tokens == 1024
+
+    def test_configs_share_connection_pool(self):
+        """Test different settings get separate models over the same HTTP clients."""
+        default = client.get_llm()
+        creative = client.get_llm(temperature=0.9)
+
+        assert default is not creative
+        assert default.client is creative.client
+        assert default.async_client is creative.async_client
+
+    @pytest.mark.asyncio
+    async def test_close_resets_registry(self):
+        """Test shutdown closes pooled clients and later calls rebuild them."""
+        first = client.get_llm()
+        await client.aclose_llm_clients()
+
+        assert client.get_llm() is not first
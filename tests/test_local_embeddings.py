@@ -0,0 +1,94 @@
+"""Tests for the local sentence-transformers embedding backend."""
+
+import threading
+import time
+import numpy as np
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from app.retrieval import local_embeddings, vector_store
+from app.retrieval.local_embeddings import LocalEmbeddings
+
+
+class CountingModel:
+    """Stands in for a SentenceTransformer: one-hot vectors by text length, recording each encode."""
+
+    def __init__(self, delay=0.0, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.batches = []
+        self._lock = threading.Lock()
+
+    def encode(self, texts, batch_size=32, normalize_embeddings=False, convert_to_numpy=True, show_progress_bar=None):
+        with self._lock:
+            self.batches.append((len(texts), batch_size))
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("model failed")
+        vectors = np.zeros((len(texts), 64), dtype=np.float32)
+        vectors[np.arange(len(texts)), [len(text) % 64 for text in texts]] = 1.0
+        return vectors
+
+
+class TestLocalEmbeddings:
+    """Tests for LocalEmbeddings."""
+
+    def test_concurrent_queries_share_batches(self):
+        """Test queries arriving while the model is busy are encoded together."""
+        model = CountingModel(delay=0.05)
+        embeddings = LocalEmbeddings(model, max_batch=32, max_wait_ms=0)
+        questions = ["q" * i for i in range(1, 17)]
+
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            vectors = list(pool.map(embeddings.embed_query, questions))
+
+        assert [int(np.argmax(vector)) for vector in vectors] == list(range(1, 17))
+        assert sum(size for size, _ in model.batches) == 16
+        assert len(model.batches) < 16
+        assert all(size == batch_size for size, batch_size in model.batches)
+
+    def test_batch_size_capped(self):
+        """Test no more than max_batch queries go into one pass."""
+        model = CountingModel(delay=0.02)
+        embeddings = LocalEmbeddings(model, max_batch=4, max_wait_ms=50)
+
+        with ThreadPoolExecutor(max_workers=10) as pool:
+            list(pool.map(embeddings.embed_query, ["docker"] * 10))
+
+        assert max(size for size, _ in model.batches) <= 4
+
+    def test_documents_encoded_directly(self):
+        """Test document batches bypass the query worker and use batch_size."""
+        model = CountingModel()
+        embeddings = LocalEmbeddings(model, batch_size=8)
+
+        vectors = embeddings.embed_documents(["a", "bb", "ccc"])
+
+        assert len(vectors) == 3
+        assert model.batches == [(3, 8)]
+        assert embeddings._worker is None
+
+    def test_failure_reaches_every_caller(self):
+        """Test a failed pass raises in each waiting query and the worker keeps serving."""
+        model = CountingModel(fail=True)
+        embeddings = LocalEmbeddings(model, max_wait_ms=0)
+
+        with pytest.raises(RuntimeError):
+            embeddings.embed_query("docker")
+
+        model.fail = False
+        assert len(embeddings.embed_query("docker")) == 64
+
+
+class TestLocalBackend:
+    """Tests for selecting the local backend."""
+
+    def test_model_loaded_once(self, monkeypatch):
+        """Test get_embeddings reuses one model across vector store re-creations."""
+        local = LocalEmbeddings(CountingModel())
+        monkeypatch.setattr(local_embeddings, "_local_embeddings", local)
+        monkeypatch.setattr(
+            vector_store, "get_setting", lambda path, default=None: "local" if path == "embeddings.backend" else default
+        )
+
+        assert vector_store.get_embeddings().embeddings is local
+        assert vector_store.get_embeddings().embeddings is local
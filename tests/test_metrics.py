@@ -0,0 +1,79 @@
+"""Tests for Prometheus instrumentation."""
+
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+from httpx import AsyncClient
+from prometheus_client import REGISTRY
+from app.graph.workflow import arun_rag_query
+from app.main import app
+from app.metrics import InstrumentedEmbeddings, LLMTokenUsageHandler
+
+
+def sample(name, **labels):
+    """Read a sample from the default registry, treating missing as zero."""
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class TestWorkflowMetrics:
+    """Tests for node and routing metrics."""
+
+    @pytest.mark.asyncio
+    @patch('app.graph.nodes.get_llm')
+    @patch('app.retrieval.vector_store.asimilarity_search_with_score', new_callable=AsyncMock)
+    async def test_nodes_and_routes_recorded(self, mock_search, mock_llm):
+        """Test each executed node is timed and each branch counted."""
+        mock_doc = Mock()
+        mock_doc.page_content = "Use docker build to create an image."
+        mock_doc.metadata = {"source": "docker.md"}
+        mock_search.return_value = [(mock_doc, 0.9)]
+        mock_llm.return_value.ainvoke = AsyncMock(return_value=Mock(content="Run docker build."))
+
+        nodes = ("query_analysis", "retrieval", "relevance_check", "generation", "source_attribution")
+        before = {node: sample("rag_node_duration_seconds_count", node=node) for node in nodes}
+        routed = sample("rag_route_decisions_total", edge="should_generate", route="generation")
+
+        await arun_rag_query("How do I build a docker image?")
+
+        for node in nodes:
+            assert sample("rag_node_duration_seconds_count", node=node) == before[node] + 1
+        assert sample("rag_route_decisions_total", edge="should_generate", route="generation") == routed + 1
+
+
+class TestComponentMetrics:
+    """Tests for embedding and LLM token metrics."""
+
+    def test_embeddings_timed(self):
+        """Test wrapped embedding calls are counted per text."""
+        inner = Mock()
+        inner.embed_documents.return_value = [[0.1], [0.2]]
+        before = sample("rag_embedded_texts_total", operation="documents")
+
+        result = InstrumentedEmbeddings(inner).embed_documents(["a", "b"])
+
+        assert result == [[0.1], [0.2]]
+        assert sample("rag_embedded_texts_total", operation="documents") == before + 2
+
+    def test_token_usage_counted(self):
+        """Test reported prompt and completion tokens are added."""
+        before = sample("rag_llm_tokens_total", type="prompt")
+        response = Mock(llm_output={"token_usage": {"prompt_tokens": 120, "completion_tokens": 30}})
+
+        LLMTokenUsageHandler().on_llm_end(response)
+
+        assert sample("rag_llm_tokens_total", type="prompt") == before + 120
+
+
+class TestMetricsEndpoint:
+    """Tests for the /metrics route."""
+
+    @pytest.mark.asyncio
+    async def test_exposition_includes_request_and_serving_metrics(self):
+        """Test /metrics serves request metrics and bridged serving stats."""
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            await client.get("/health")
+            response = await client.get("/metrics")
+
+        assert response.status_code == 200
+        assert 'rag_http_requests_total{method="GET",route="/health",status="200"}' in response.text
+        assert "rag_admission_queue_depth" in response.text
+        assert "rag_coalescing_executed_total" in response.text
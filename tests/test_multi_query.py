@@ -0,0 +1,111 @@
+"""Tests for multi-query retrieval fan-out."""
+
+import asyncio
+import time
+import pytest
+from unittest.mock import AsyncMock, patch
+from langchain.schema import Document as LCDocument
+from app.graph.nodes import aretrieval_node
+from app.retrieval.multi_query import (
+    amulti_query_search,
+    generate_query_variants,
+    reciprocal_rank_fusion
+)
+
+
+def chunk(text, source="docs.md"):
+    return LCDocument(page_content=text, metadata={"source": source})
+
+
+class TestQueryVariants:
+    """Tests for generate_query_variants."""
+
+    def test_multi_part_question_split(self):
+        """Test each sub-question and a keyword form become variants."""
+        variants = generate_query_variants("How do I deploy with docker and how do I roll back a release?")
+
+        assert variants[0] == "How do I deploy with docker and how do I roll back a release?"
+        assert "How do I deploy with docker" in variants
+        assert "how do I roll back a release" in variants
+        assert "deploy docker roll back release" in variants
+
+    def test_compound_phrase_not_split(self):
+        """Test 'and' inside a single question is not treated as a boundary."""
+        variants = generate_query_variants("How do I build and push docker images?")
+
+        assert variants == ["How do I build and push docker images?", "build push docker images"]
+
+    def test_variant_cap(self):
+        """Test the number of variants is bounded."""
+        question = "What is a; what is b; what is c; what is d; what is e?"
+
+        assert len(generate_query_variants(question, max_variants=3)) == 3
+
+
+class TestReciprocalRankFusion:
+    """Tests for reciprocal_rank_fusion."""
+
+    def test_chunks_found_by_several_queries_rank_first(self):
+        """Test agreement across lists outranks a single top hit, keeping the nearest distance."""
+        a, b, c = chunk("a"), chunk("b"), chunk("c")
+
+        # Distances, nearest first in each list
+        fused = reciprocal_rank_fusion([
+            [(a, 0.2), (b, 0.5)],
+            [(c, 0.3), (b, 0.6)],
+            [(b, 0.4)]
+        ], top_k=2)
+
+        assert [doc.page_content for doc, _ in fused] == ["b", "a"]
+        assert fused[0][1] == 0.4
+
+
+class TestMultiQuerySearch:
+    """Tests for the async fan-out."""
+
+    @pytest.mark.asyncio
+    @patch('app.retrieval.multi_query.asimilarity_search_by_vector_with_score')
+    @patch('app.retrieval.multi_query.aembed_queries', new_callable=AsyncMock)
+    async def test_one_embedding_batch_and_concurrent_searches(self, mock_embed, mock_search):
+        """Test variants are embedded together and searched in parallel."""
+        mock_embed.side_effect = lambda texts: [[float(i)] for i in range(len(texts))]
+
+        async def slow_search(embedding, k):
+            await asyncio.sleep(0.05)
+            return [(chunk(f"hit {embedding[0]}"), 0.8)]
+
+        mock_search.side_effect = slow_search
+
+        start = time.perf_counter()
+        results = await amulti_query_search("How do I deploy with docker and how do I roll back a release?", k=5)
+        elapsed = time.perf_counter() - start
+
+        assert mock_embed.await_count == 1
+        assert mock_search.call_count == 4
+        assert elapsed < 0.15
+        assert len(results) == 4
+
+    @pytest.mark.asyncio
+    @patch('app.retrieval.multi_query.asimilarity_search_by_vector_with_score', new_callable=AsyncMock)
+    @patch('app.retrieval.multi_query.aembed_queries', new_callable=AsyncMock)
+    async def test_known_embedding_reused(self, mock_embed, mock_search):
+        """Test a precomputed question embedding is not recomputed."""
+        mock_embed.return_value = [[0.5]]
+        mock_search.return_value = [(chunk("docker build"), 0.9)]
+
+        await amulti_query_search("How do I build and push docker images?", k=5, query_embedding=[0.1])
+
+        mock_embed.assert_awaited_once_with(["build push docker images"])
+        assert mock_search.await_args_list[0].args[0] == [0.1]
+
+    @pytest.mark.asyncio
+    @patch('app.graph.nodes.MULTI_QUERY_ENABLED', True)
+    @patch('app.retrieval.multi_query.amulti_query_search', new_callable=AsyncMock)
+    async def test_retrieval_node_uses_fan_out_when_enabled(self, mock_fan_out):
+        """Test the retrieval node switches to fan-out by config."""
+        mock_fan_out.return_value = [(chunk("docker build"), 0.9)]
+
+        result = await aretrieval_node({"question": "How do I build a docker image?", "steps_taken": []})
+
+        mock_fan_out.assert_awaited_once()
+        assert result["retrieved_documents"][0].content == "docker build"
@@ -0,0 +1,106 @@
+"""Tests for the in-process NumPy vector index."""
+
+import os
+import numpy as np
+import pytest
+from langchain.schema import Document as LCDocument
+from langchain_community.vectorstores import Chroma
+from app.retrieval import vector_store
+from app.retrieval.hash_embeddings import HashEmbeddings
+from app.retrieval.hybrid import hybrid_search
+from app.retrieval.numpy_store import NumpyVectorStore
+from app.retrieval.topk import top_k_indices
+
+CHUNKS = [
+    "Use docker build to create an image from a Dockerfile.",
+    "Pass --no-cache to docker build to ignore the layer cache.",
+    "The gateway returns ERR_CONN_RESET when the upstream closes the connection.",
+    "Kubernetes restarts pods that fail their liveness probe.",
+    "Images are pushed to the registry with docker push."
+]
+
+
+def docs():
+    return [LCDocument(page_content=text, metadata={"source": f"doc{i}.md"}) for i, text in enumerate(CHUNKS)]
+
+
+class TestTopK:
+    """Tests for top_k_indices."""
+
+    @pytest.mark.parametrize("n", [3, 100, 50_000])
+    def test_matches_full_sort(self, n):
+        """Test the sampled threshold returns exactly the best k, best first."""
+        scores = np.random.default_rng(n).standard_normal(n).astype(np.float32)
+
+        assert list(top_k_indices(scores, 5)) == list(np.argsort(-scores)[:5])
+
+
+class TestNumpyVectorStore:
+    """Tests for NumpyVectorStore."""
+
+    def test_scores_match_chroma(self, tmp_path):
+        """Test results and distances match the Chroma collection's for the same vectors."""
+        embeddings = HashEmbeddings(dimensions=64)
+        store = NumpyVectorStore(str(tmp_path / "numpy"), embeddings)
+        chroma = Chroma(collection_name="parity", embedding_function=embeddings, persist_directory=str(tmp_path / "chroma"))
+        store.add_documents(docs())
+        chroma.add_documents(docs())
+
+        for question in ["how do I build a docker image", "what does ERR_CONN_RESET mean"]:
+            ours = store.similarity_search_with_score(question, k=3)
+            theirs = chroma.similarity_search_with_score(question, k=3)
+
+            assert [d.metadata["source"] for d, _ in ours] == [d.metadata["source"] for d, _ in theirs]
+            assert [s for _, s in ours] == pytest.approx([s for _, s in theirs], abs=1e-4)
+
+    def test_appends_persisted(self, tmp_path):
+        """Test batches are appended incrementally and reloaded from disk."""
+        path = str(tmp_path / "numpy")
+        store = NumpyVectorStore(path, HashEmbeddings(dimensions=64))
+        store.add_documents(docs()[:2], ids=["a", "b"])
+        store.add_documents(docs()[2:], ids=["c", "d", "e"])
+
+        reloaded = NumpyVectorStore(path, HashEmbeddings(dimensions=64))
+
+        assert reloaded.count() == 5
+        assert reloaded.similarity_search("the gateway returns ERR_CONN_RESET", k=1)[0].metadata == {"source": "doc2.md"}
+        found = reloaded.get(ids=["c", "missing"], include=["documents", "embeddings"])
+        assert found["ids"] == ["c"]
+        assert found["documents"] == [CHUNKS[2]]
+        assert found["embeddings"][0] == pytest.approx(HashEmbeddings(dimensions=64).embed_query(CHUNKS[2]))
+
+    def test_uncommitted_append_discarded(self, tmp_path):
+        """Test bytes from an append that never committed its header are dropped on open."""
+        path = str(tmp_path / "numpy")
+        NumpyVectorStore(path, HashEmbeddings(dimensions=64)).add_documents(docs()[:2])
+        with open(os.path.join(path, "vectors.f32"), "ab") as f:
+            f.write(b"\0" * 100)
+        with open(os.path.join(path, "documents.bin"), "ab") as f:
+            f.write(b"partial")
+
+        store = NumpyVectorStore(path, HashEmbeddings(dimensions=64))
+        store.add_documents(docs()[2:3])
+
+        assert store.count() == 3
+        assert NumpyVectorStore(path, HashEmbeddings(dimensions=64)).get()["documents"] == CHUNKS[:3]
+
+    def test_dimension_mismatch(self, tmp_path):
+        """Test vectors of another embedding model are rejected."""
+        store = NumpyVectorStore(str(tmp_path / "numpy"), HashEmbeddings(dimensions=64))
+        store.add_documents(docs()[:1])
+
+        with pytest.raises(ValueError):
+            store.similarity_search_by_vector_with_relevance_scores([0.0] * 32)
+
+    def test_selected_by_provider(self, monkeypatch):
+        """Test vector_store.provider: numpy serves ingestion, search and hybrid retrieval."""
+        monkeypatch.setattr(
+            vector_store, "get_setting", lambda path, default=None: "numpy" if path == "vector_store.provider" else default
+        )
+        monkeypatch.setattr(vector_store, "get_embeddings", lambda: HashEmbeddings(dimensions=64))
+        monkeypatch.setattr(vector_store, "_vector_store", None)
+
+        vector_store.add_documents(docs())
+
+        assert isinstance(vector_store.get_vector_store(), NumpyVectorStore)
+        assert hybrid_search("what does ERR_CONN_RESET mean", k=2)[0][0].metadata["source"] == "doc2.md"
@@ -0,0 +1,171 @@
+"""Tests for cross-encoder reranking."""
+
+import threading
+import time
+import pytest
+from unittest.mock import AsyncMock, patch
+from langchain.schema import Document as LCDocument
+from app.graph.nodes import arerank_node, rerank_node, retrieval_node
+from app.graph.state import Document
+from app.graph.workflow import _initial_state, create_workflow
+from app.retrieval.reranker import CrossEncoderReranker, RerankCache
+
+
+class OverlapModel:
+    """Stands in for a CrossEncoder: scores pairs by shared words, counting passes."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+
+    def predict(self, pairs, batch_size=32, show_progress_bar=None):
+        self.calls.append((len(pairs), batch_size))
+        time.sleep(self.delay)
+        return [len(set(query.lower().split()) & set(text.lower().split())) for query, text in pairs]
+
+
+def candidates(n=8):
+    return [
+        Document(content=f"chunk {i} about networking", metadata={"source": f"doc{i}.md"}, relevance_score=0.5)
+        for i in range(n - 1)
+    ] + [Document(content="rotate the registry credentials", metadata={"source": "creds.md"}, relevance_score=0.4)]
+
+
+class TestCrossEncoderReranker:
+    """Tests for CrossEncoderReranker."""
+
+    def test_one_batched_pass(self):
+        """Test all candidates are scored in a single forward pass."""
+        model = OverlapModel()
+        reranker = CrossEncoderReranker(model, RerankCache(100), "test-model")
+
+        scores = reranker.score("how do I rotate registry credentials", ["rotate credentials", "networking", "registry"])
+
+        assert scores == [2, 0, 1]
+        assert model.calls == [(3, 3)]
+
+    def test_cached_pairs_not_rescored(self):
+        """Test only pairs missing from the cache reach the model."""
+        model = OverlapModel()
+        cache = RerankCache(100)
+        reranker = CrossEncoderReranker(model, cache, "test-model")
+
+        reranker.score("rotate credentials", ["rotate credentials", "networking"])
+        scores = reranker.score("rotate credentials", ["networking", "rotate keys", "rotate credentials"])
+
+        assert scores == [0, 1, 2]
+        assert model.calls == [(2, 2), (1, 1)]
+        assert cache.stats()["hits"] == 2
+
+    def test_cache_bounded(self):
+        """Test the least recently used scores are evicted."""
+        cache = RerankCache(2)
+        cache.put_many({b"a": 1.0, b"b": 2.0})
+        cache.get_many([b"a"])
+        cache.put_many({b"c": 3.0})
+
+        assert set(cache.get_many([b"a", b"b", b"c"])) == {b"a", b"c"}
+
+
+class TestRerankNode:
+    """Tests for the rerank node."""
+
+    @patch('app.graph.nodes.RETRIEVAL_TOP_K', 2)
+    @patch('app.retrieval.reranker.get_reranker')
+    def test_reorders_and_keeps_top_k(self, mock_get_reranker):
+        """Test the best-scoring candidates are kept, with their retrieval scores."""
+        mock_get_reranker.return_value = CrossEncoderReranker(OverlapModel())
+
+        result = rerank_node({"question": "How do I rotate registry credentials?", "retrieved_documents": candidates()})
+
+        documents = result["retrieved_documents"]
+        assert [doc.metadata["source"] for doc in documents] == ["creds.md", "doc0.md"]
+        assert documents[0].relevance_score == 0.4
+        assert documents[0].rerank_score == 2
+        assert "degradations" not in result
+
+    @pytest.mark.asyncio
+    @patch('app.graph.nodes.RETRIEVAL_TOP_K', 2)
+    @patch('app.graph.nodes.RERANK_BUDGET_SECONDS', 0.05)
+    @patch('app.retrieval.reranker.get_reranker')
+    async def test_budget_keeps_retrieval_order(self, mock_get_reranker):
+        """Test a pass running past its budget leaves the retrieval order in place."""
+        mock_get_reranker.return_value = CrossEncoderReranker(OverlapModel(delay=0.5))
+
+        result = await arerank_node({"question": "rotate registry credentials", "retrieved_documents": candidates()})
+
+        assert [doc.metadata["source"] for doc in result["retrieved_documents"]] == ["doc0.md", "doc1.md"]
+        assert result["degradations"] == ["rerank_timeout"]
+
+    @pytest.mark.asyncio
+    @patch('app.graph.nodes.RETRIEVAL_TOP_K', 2)
+    @patch('app.retrieval.reranker.get_reranker')
+    async def test_model_loads_off_event_loop(self, mock_get_reranker):
+        """Test the reranker is resolved on the executor, not the event loop thread."""
+        loaded_on = []
+
+        def load():
+            loaded_on.append(threading.get_ident())
+            return CrossEncoderReranker(OverlapModel())
+
+        mock_get_reranker.side_effect = load
+
+        await arerank_node({"question": "rotate registry credentials", "retrieved_documents": candidates()})
+
+        assert loaded_on and loaded_on[0] != threading.get_ident()
+
+    @patch('app.graph.nodes.RETRIEVAL_TOP_K', 2)
+    @patch('app.retrieval.reranker.get_reranker')
+    def test_deadline_skips_rerank(self, mock_get_reranker):
+        """Test no pass starts when the deadline leaves no time for it."""
+        model = OverlapModel()
+        mock_get_reranker.return_value = CrossEncoderReranker(model)
+
+        result = rerank_node({
+            "question": "rotate registry credentials",
+            "retrieved_documents": candidates(),
+            "deadline": time.monotonic() + 1
+        })
+
+        assert len(result["retrieved_documents"]) == 2
+        assert result["degradations"] == ["rerank_timeout"]
+        assert model.calls == []
+
+    @patch('app.retrieval.vector_store.get_vector_store')
+    def test_retrieval_over_fetches(self, mock_get_store):
+        """Test retrieval fetches reranker.candidates chunks for the reranker."""
+        mock_get_store.return_value.similarity_search_with_score.return_value = []
+
+        retrieval_node({"question": "How do I build an image?"}, rerank=True)
+
+        mock_get_store.return_value.similarity_search_with_score.assert_called_once_with(
+            query="How do I build an image?", k=20
+        )
+
+    @pytest.mark.asyncio
+    @patch('app.graph.nodes.RETRIEVAL_TOP_K', 2)
+    @patch('app.retrieval.vector_store.asimilarity_search_with_score', new_callable=AsyncMock)
+    async def test_over_fetch_follows_graph(self, mock_search):
+        """Test only a graph with the rerank node over-fetches."""
+        mock_search.return_value = []
+
+        await create_workflow(rerank=False).ainvoke(_initial_state("How do I build an image?", None))
+        await create_workflow(rerank=True).ainvoke(_initial_state("How do I build an image?", None))
+
+        assert [call.kwargs["k"] for call in mock_search.await_args_list] == [2, 20]
+
+    @pytest.mark.asyncio
+    @patch('app.graph.nodes.RETRIEVAL_TOP_K', 2)
+    @patch('app.retrieval.reranker.get_reranker')
+    @patch('app.retrieval.vector_store.asimilarity_search_with_score', new_callable=AsyncMock)
+    async def test_workflow_runs_rerank_before_relevance_check(self, mock_search, mock_get_reranker):
+        """Test the rerank node sits between retrieval and the relevance check."""
+        mock_search.return_value = [
+            (LCDocument(page_content=doc.content, metadata=doc.metadata), 0.1) for doc in candidates()
+        ]
+        mock_get_reranker.return_value = CrossEncoderReranker(OverlapModel())
+
+        result = await create_workflow(rerank=True).ainvoke(_initial_state("How do I rotate registry credentials?", None))
+
+        assert result["steps_taken"] == ["query_analysis", "retrieval", "rerank", "relevance_check", "fallback"]
+        assert result["retrieved_documents"][0].metadata["source"] == "creds.md"
@@ -0,0 +1,160 @@
+"""Tests for per-session conversation memory."""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+from app.graph import context
+from app.graph.context import count_tokens
+from app.graph.workflow import aanswer_query
+from app.memory.session_store import SessionStore, SQLiteSessionBackend
+
+
+@pytest.fixture(autouse=True)
+def estimated_tokens(monkeypatch):
+    """Use the character-based token estimate."""
+    monkeypatch.setattr(context, "_get_encoding", lambda: None)
+    count_tokens.cache_clear()
+    yield
+    count_tokens.cache_clear()
+
+
+def make_store(**overrides):
+    settings = dict(
+        max_turns=3,
+        max_history_tokens=1000,
+        max_summary_tokens=50,
+        max_sessions=100,
+        max_bytes=1_000_000,
+        idle_ttl_seconds=3600,
+        summarize_with_llm=False
+    )
+    settings.update(overrides)
+    return SessionStore(**settings)
+
+
+class TestSessionStore:
+    """Tests for SessionStore."""
+
+    def test_history_in_order(self):
+        """Test turns come back as alternating user/assistant messages."""
+        store = make_store()
+        store.add_turn("s1", "What is Docker?", "A container platform.")
+        store.add_turn("s1", "How do I install it?", "Use the installer.")
+
+        history = store.get_history("s1")
+
+        assert [m["role"] for m in history] == ["user", "assistant", "user", "assistant"]
+        assert history[2]["content"] == "How do I install it?"
+        assert store.get_history("other") == []
+
+    def test_old_turns_summarized_past_turn_cap(self):
+        """Test turns beyond max_turns are folded into the summary."""
+        store = make_store(max_turns=2)
+        for i in range(4):
+            store.add_turn("s1", f"question {i}", f"answer {i}")
+
+        history = store.get_history("s1")
+
+        assert history[0]["role"] == "system"
+        assert "question 1" in history[0]["content"]
+        assert [m["content"] for m in history if m["role"] == "user"] == ["question 2", "question 3"]
+        assert store.stats()["summaries"] >= 1
+
+    def test_token_cap_bounds_verbatim_turns(self):
+        """Test long turns are pushed out by the token cap and the summary is capped."""
+        store = make_store(max_turns=10, max_history_tokens=100, max_summary_tokens=20)
+        for i in range(5):
+            store.add_turn("s1", f"question {i}", "x" * 200)
+
+        history = store.get_history("s1")
+
+        assert len([m for m in history if m["role"] == "user"]) == 1
+        assert count_tokens(store._sessions["s1"].summary) <= 20
+
+    def test_lru_eviction_of_idle_sessions(self):
+        """Test the least recently used session is evicted past max_sessions."""
+        store = make_store(max_sessions=2)
+        store.add_turn("a", "q", "a")
+        store.add_turn("b", "q", "a")
+        store.get_history("a")
+        store.add_turn("c", "q", "a")
+
+        assert store.get_history("b") == []
+        assert store.get_history("a") != []
+        assert store.stats()["evictions"] == 1
+
+    def test_byte_cap(self):
+        """Test total footprint stays under max_bytes."""
+        store = make_store(max_bytes=3000)
+        for i in range(20):
+            store.add_turn(f"s{i}", "question", "y" * 500)
+
+        assert store.stats()["size_bytes"] <= 3000
+
+    def test_sqlite_backend_reloads_evicted_session(self, tmp_path):
+        """Test evicted sessions come back from disk on their next use."""
+        backend = SQLiteSessionBackend(str(tmp_path / "sessions.sqlite"))
+        store = make_store(max_sessions=1, backend=backend)
+        store.add_turn("a", "What is Docker?", "A container platform.")
+        store.add_turn("b", "q", "a")
+
+        history = store.get_history("a")
+
+        assert history[0]["content"] == "What is Docker?"
+
+    @pytest.mark.asyncio
+    async def test_llm_summary_runs_in_background(self):
+        """Test overflow is summarized by the LLM without blocking add_turn."""
+        store = make_store(max_turns=1, summarize_with_llm=True)
+        llm = Mock()
+        llm.ainvoke = AsyncMock(return_value=Mock(content="User asked about Docker."))
+
+        with patch('app.llm.client.get_llm', return_value=llm):
+            store.add_turn("s1", "What is Docker?", "A container platform.")
+            store.add_turn("s1", "How do I install it?", "Use the installer.")
+            assert store.get_history("s1")[0]["content"] == "What is Docker?"
+            await asyncio.gather(*store._tasks)
+
+        history = store.get_history("s1")
+        assert history[0] == {"role": "system", "content": "Summary of the earlier conversation:\nUser asked about Docker."}
+        assert len(history) == 3
+
+
+class TestConversationQueries:
+    """Tests for memory in the query path."""
+
+    @pytest.mark.asyncio
+    @patch('app.graph.workflow.get_session_store')
+    @patch('app.graph.workflow.acached_rag_query', new_callable=AsyncMock)
+    @patch('app.graph.workflow.arun_rag_query', new_callable=AsyncMock)
+    async def test_follow_up_bypasses_caches_with_history(self, mock_run, mock_cached, mock_store):
+        """Test the first turn is cacheable and follow-ups carry history."""
+        mock_store.return_value = make_store()
+        mock_cached.return_value = {"answer": "A container platform.", "sources": []}
+        mock_run.return_value = {"answer": "Use the installer.", "sources": []}
+
+        await aanswer_query("What is Docker?", session_id="s1")
+        await aanswer_query("How do I install it?", session_id="s1")
+
+        assert mock_cached.await_count == 1
+        chat_history = mock_run.await_args.args[3]
+        assert chat_history[0] == {"role": "user", "content": "What is Docker?"}
+        assert len(mock_store.return_value.get_history("s1")) == 4
+
+    def test_short_follow_up_uses_previous_question_for_retrieval(self):
+        """Test a terse follow-up is not sent to clarification when there is history."""
+        from app.graph.nodes import query_analysis_node
+
+        state = {
+            "question": "Install it?",
+            "chat_history": [
+                {"role": "user", "content": "What is Docker?"},
+                {"role": "assistant", "content": "A container platform."}
+            ],
+            "steps_taken": []
+        }
+
+        result = query_analysis_node(state)
+
+        assert result["needs_clarification"] is False
+        assert result["retrieval_query"] == "What is Docker? Install it?"
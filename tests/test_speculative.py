@@ -0,0 +1,123 @@
+"""Tests for speculative generation overlapped with the relevance check."""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+from app.graph import workflow
+from app.graph.workflow import _initial_state, create_workflow
+from app.metrics import SPECULATIVE_GENERATIONS, SPECULATIVE_TOKENS
+
+STEPS = ["query_analysis", "retrieval", "relevance_check", "generation", "source_attribution"]
+
+
+class StreamingLLM:
+    """Chat model streaming a fixed answer one word at a time."""
+
+    def __init__(self, answer="Run docker build .", delay=0.01):
+        self.words = answer.split(" ")
+        self.delay = delay
+        self.streamed = 0
+
+    async def astream(self, messages):
+        for i, word in enumerate(self.words):
+            await asyncio.sleep(self.delay)
+            self.streamed += 1
+            yield Mock(content=word if i == 0 else f" {word}")
+
+
+def search_result(score):
+    mock_doc = Mock()
+    mock_doc.page_content = "Use docker build to create an image."
+    mock_doc.metadata = {"source": "docker.md"}
+    return [(mock_doc, score)]
+
+
+def counter(metric, outcome):
+    return metric.labels(outcome=outcome)._value.get()
+
+
+@pytest.fixture
+def speculative_graph():
+    return create_workflow(speculative=True)
+
+
+class TestSpeculativeGeneration:
+    """Tests for the speculative_generation node."""
+
+    @pytest.mark.asyncio
+    @patch('app.graph.nodes.get_llm')
+    @patch('app.retrieval.vector_store.asimilarity_search_with_score', new_callable=AsyncMock)
+    async def test_relevant_answer_kept(self, mock_search, mock_llm, speculative_graph):
+        """Test a speculative answer is used when the check passes."""
+        mock_search.return_value = search_result(0.9)
+        mock_llm.return_value = StreamingLLM()
+        used = counter(SPECULATIVE_GENERATIONS, "used")
+
+        result = await speculative_graph.ainvoke(_initial_state("How do I build a docker image?", None))
+
+        assert result["answer"] == "Run docker build ."
+        assert result["steps_taken"] == STEPS
+        assert result["sources"][0]["document"] == "docker.md"
+        assert counter(SPECULATIVE_GENERATIONS, "used") == used + 1
+
+    @pytest.mark.asyncio
+    @patch('app.graph.nodes.get_llm')
+    @patch('app.retrieval.vector_store.asimilarity_search_with_score', new_callable=AsyncMock)
+    async def test_irrelevant_generation_cancelled(self, mock_search, mock_llm, speculative_graph):
+        """Test generation is cancelled and its tokens counted when the check routes to fallback."""
+        mock_search.return_value = search_result(0.1)
+        llm = StreamingLLM(delay=0.0)
+        mock_llm.return_value = llm
+        cancelled = counter(SPECULATIVE_GENERATIONS, "cancelled")
+        wasted = counter(SPECULATIVE_TOKENS, "cancelled")
+
+        async def slow_check(state):
+            await asyncio.sleep(0.05)
+            return {"confidence": 0.1, "steps_taken": ["relevance_check"]}
+
+        with patch.object(workflow, "arelevance_check_node", slow_check):
+            result = await speculative_graph.ainvoke(_initial_state("How do I build a docker image?", None))
+
+        assert result["steps_taken"] == ["query_analysis", "retrieval", "relevance_check", "fallback"]
+        assert "couldn't find relevant information" in result["answer"]
+        assert counter(SPECULATIVE_GENERATIONS, "cancelled") == cancelled + 1
+        assert counter(SPECULATIVE_TOKENS, "cancelled") == wasted + llm.streamed
+
+    @pytest.mark.asyncio
+    @patch('app.graph.nodes.get_llm')
+    @patch('app.retrieval.vector_store.asimilarity_search_with_score', new_callable=AsyncMock)
+    async def test_tokens_held_until_check_passes(self, mock_search, mock_llm, speculative_graph):
+        """Test tokens produced before the check finishes are released in order afterwards."""
+        mock_search.return_value = search_result(0.9)
+        mock_llm.return_value = StreamingLLM(answer="one two three four", delay=0.0)
+        received = []
+        check_done = asyncio.Event()
+
+        async def slow_check(state):
+            await asyncio.sleep(0.02)
+            check_done.set()
+            return {"confidence": 0.9, "steps_taken": ["relevance_check"]}
+
+        async def on_token(token):
+            received.append((token, check_done.is_set()))
+
+        with patch.object(workflow, "arelevance_check_node", slow_check):
+            result = await speculative_graph.ainvoke(
+                _initial_state("How do I build a docker image?", None),
+                config={"configurable": {"on_token": on_token}}
+            )
+
+        assert "".join(token for token, _ in received) == result["answer"] == "one two three four"
+        assert all(after_check for _, after_check in received)
+
+    @patch('app.graph.nodes.get_llm')
+    @patch('app.retrieval.vector_store.get_vector_store')
+    def test_sync_invoke(self, mock_get_store, mock_llm, speculative_graph):
+        """Test the sync workflow runs the check then generation."""
+        mock_get_store.return_value.similarity_search_with_score.return_value = search_result(0.9)
+        mock_llm.return_value.invoke.return_value = Mock(content="Run docker build.")
+
+        result = speculative_graph.invoke(_initial_state("How do I build a docker image?", None))
+
+        assert result["answer"] == "Run docker build."
+        assert result["steps_taken"] == STEPS